@@ -0,0 +1,32 @@
+"""Add document_chunks.start_char / end_char (source spans)
+
+Revision ID: 282a82678904
+Revises: 626608525012
+Create Date: 2026-10-16 09:40:00.000000
+
+Chunks stored before this have no span (NULL); re-process a document to
+fill them in.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "282a82678904"
+down_revision: str | None = "626608525012"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("document_chunks")}
+    for name in ("start_char", "end_char"):
+        if name not in columns:
+            op.add_column("document_chunks", sa.Column(name, sa.Integer()))
+
+
+def downgrade() -> None:
+    op.drop_column("document_chunks", "end_char")
+    op.drop_column("document_chunks", "start_char")
@@ -0,0 +1,54 @@
+"""Add ingestion_jobs (background ingestion queue)
+
+Revision ID: 346f56442ef1
+Revises: 56cf30859674
+Create Date: 2026-10-16 09:10:00.000000
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "346f56442ef1"
+down_revision: str | None = "56cf30859674"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Skipped if create_all already made it
+    if sa.inspect(op.get_bind()).has_table("ingestion_jobs"):
+        return
+
+    op.create_table(
+        "ingestion_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "document_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("documents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("stage", sa.String(50)),
+        sa.Column("progress", sa.Float(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text()),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("lease_expires_at", sa.DateTime()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index(op.f("ix_ingestion_jobs_document_id"), "ingestion_jobs", ["document_id"])
+    op.create_index(op.f("ix_ingestion_jobs_status"), "ingestion_jobs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_ingestion_jobs_status"), table_name="ingestion_jobs")
+    op.drop_index(op.f("ix_ingestion_jobs_document_id"), table_name="ingestion_jobs")
+    op.drop_table("ingestion_jobs")
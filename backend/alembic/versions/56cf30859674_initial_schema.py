@@ -0,0 +1,111 @@
+"""Initial schema
+
+Revision ID: 56cf30859674
+Revises:
+Create Date: 2026-10-16 09:00:00.000000
+
+Databases created before migrations existed (scripts/create_admin.py runs
+create_all) already have these tables; they are only created if missing,
+so `alembic upgrade head` works on both fresh and existing databases.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "56cf30859674"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False, unique=True),
+            sa.Column("hashed_password", sa.Text(), nullable=False),
+            sa.Column("role", sa.String(20), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+    if "documents" not in existing:
+        op.create_table(
+            "documents",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("filename", sa.String(255), nullable=False),
+            sa.Column("file_size_bytes", sa.Integer(), nullable=False),
+            sa.Column("file_type", sa.String(10), nullable=False),
+            sa.Column(
+                "uploaded_by",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("users.id"),
+                nullable=False,
+            ),
+            sa.Column("uploaded_at", sa.DateTime()),
+            sa.Column("processing_status", sa.String(20), nullable=False),
+            sa.Column("num_pages", sa.Integer()),
+            sa.Column("storage_path", sa.Text(), nullable=False),
+        )
+    if "document_chunks" not in existing:
+        op.create_table(
+            "document_chunks",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "document_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("documents.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("chunk_index", sa.Integer(), nullable=False),
+            sa.Column("page_number", sa.Integer()),
+            sa.Column("text_content", sa.Text(), nullable=False),
+            sa.Column("token_count", sa.Integer(), nullable=False),
+            sa.Column("embedding_id", sa.String(255), nullable=False),
+            sa.Column("created_at", sa.DateTime()),
+        )
+    if "queries" not in existing:
+        op.create_table(
+            "queries",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=False
+            ),
+            sa.Column("query_text", sa.Text(), nullable=False),
+            sa.Column("answer_text", sa.Text()),
+            sa.Column("confidence_level", sa.String(10)),
+            sa.Column("num_chunks_retrieved", sa.Integer()),
+            sa.Column("avg_similarity_score", sa.Float()),
+            sa.Column("processing_time_ms", sa.Integer()),
+            sa.Column("created_at", sa.DateTime()),
+        )
+    if "query_sources" not in existing:
+        op.create_table(
+            "query_sources",
+            sa.Column(
+                "query_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("queries.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column(
+                "chunk_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("document_chunks.id", ondelete="CASCADE"),
+                primary_key=True,
+            ),
+            sa.Column("similarity_score", sa.Float(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("query_sources")
+    op.drop_table("queries")
+    op.drop_table("document_chunks")
+    op.drop_table("documents")
+    op.drop_table("users")
@@ -0,0 +1,36 @@
+"""Add document_chunks.embedding_key (embedding reuse)
+
+Revision ID: 626608525012
+Revises: ea7e948dc4d7
+Create Date: 2026-10-16 09:30:00.000000
+
+Chunks stored before this keep a NULL key, so their vectors are not
+reused; chunks ingested from now on are.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "626608525012"
+down_revision: str | None = "ea7e948dc4d7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "embedding_key" not in {c["name"] for c in inspector.get_columns("document_chunks")}:
+        op.add_column("document_chunks", sa.Column("embedding_key", sa.String(64)))
+    indexes = {i["name"] for i in inspector.get_indexes("document_chunks")}
+    if "ix_document_chunks_embedding_key" not in indexes:
+        op.create_index(
+            op.f("ix_document_chunks_embedding_key"), "document_chunks", ["embedding_key"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_document_chunks_embedding_key"), table_name="document_chunks")
+    op.drop_column("document_chunks", "embedding_key")
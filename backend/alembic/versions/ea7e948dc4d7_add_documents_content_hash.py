@@ -0,0 +1,33 @@
+"""Add documents.content_hash (duplicate upload detection)
+
+Revision ID: ea7e948dc4d7
+Revises: 346f56442ef1
+Create Date: 2026-10-16 09:20:00.000000
+
+Documents uploaded before this keep a NULL hash; re-uploads of them are
+processed normally instead of being linked.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "ea7e948dc4d7"
+down_revision: str | None = "346f56442ef1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "content_hash" not in {c["name"] for c in inspector.get_columns("documents")}:
+        op.add_column("documents", sa.Column("content_hash", sa.String(64)))
+    if "ix_documents_content_hash" not in {i["name"] for i in inspector.get_indexes("documents")}:
+        op.create_index(op.f("ix_documents_content_hash"), "documents", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_documents_content_hash"), table_name="documents")
+    op.drop_column("documents", "content_hash")
@@ -1,33 +1,83 @@
 """Document management API endpoints."""
 
+import hashlib
 import os
 import uuid
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_current_user
 from app.config import settings
-from app.core.database import get_db
-from app.core.vector_store import VectorStore
-from app.models.database import Document, DocumentChunk, User
+from app.core.database import get_db, run_db
+from app.core.vector_store import VectorStore, get_vector_store
+from app.models.database import Document, DocumentChunk, IngestionJob, User
 from app.models.schemas import (
     DocumentListResponse,
     DocumentResponse,
     DocumentUploadResponse,
+    IngestionStatusResponse,
 )
-from app.services.document_processor import DocumentProcessor
+from app.services.answer_cache import invalidate_answer_cache
+from app.services.chunk_store import get_chunk_store
+from app.services.ingestion import enqueue_document, get_ingestion_pool
+from app.services.lexical import invalidate_chunk_token_ids
+from app.services.reranker import invalidate_rerank_scores
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 ALLOWED_EXTENSIONS = {".pdf", ".docx", ".txt"}
 
 
-def get_vector_store() -> VectorStore:
-    """Get vector store instance."""
-    return VectorStore()
+async def _save_upload(
+    file: UploadFile, path: Path, max_bytes: int
+) -> tuple[int, str] | None:
+    """
+    Copy an upload to path chunk by chunk, returning (size, sha256 hex).
+
+    Memory use is one chunk regardless of file size. Returns None (and
+    removes the partial file) as soon as the upload exceeds max_bytes.
+    """
+    partial_path = path.with_name(path.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial_path, "wb") as f:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    break
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+        if size > max_bytes:
+            partial_path.unlink(missing_ok=True)
+            return None
+        # Only complete files ever appear under their final name
+        os.replace(partial_path, path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    return size, digest.hexdigest()
+
+
+def _get_document(db: Session, document_id: uuid.UUID) -> Document | None:
+    """Load a document by id."""
+    return db.query(Document).filter(Document.id == document_id).first()
+
+
+def _chunk_embedding_ids(db: Session, document_id: uuid.UUID) -> list[str]:
+    """Vector store point ids of a document's chunks."""
+    rows = db.query(DocumentChunk.embedding_id).filter(DocumentChunk.document_id == document_id)
+    return [embedding_id for (embedding_id,) in rows]
+
+
+def _delete_document_row(db: Session, document: Document) -> None:
+    """Delete a document row (cascades to its chunks and jobs)."""
+    db.delete(document)
+    db.commit()
 
 
 @router.post("/upload", response_model=DocumentUploadResponse)
@@ -35,9 +85,8 @@ async def upload_document(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    vector_store: VectorStore = Depends(get_vector_store),
 ) -> DocumentUploadResponse:
-    """Upload a document for processing."""
+    """Upload a document and queue it for background processing."""
     # Validate file extension
     file_ext = Path(file.filename).suffix.lower()
     if file_ext not in ALLOWED_EXTENSIONS:
@@ -46,51 +95,59 @@ async def upload_document(
             detail=f"File type {file_ext} not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
         )
     
-    # Check file size
-    contents = await file.read()
-    file_size = len(contents)
     max_size = settings.MAX_FILE_SIZE_MB * 1024 * 1024
-    if file_size > max_size:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE_MB}MB",
-        )
-    
+    too_large = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE_MB}MB",
+    )
+    if file.size is not None and file.size > max_size:
+        raise too_large
+
     # Create upload directory if not exists
     upload_dir = Path(settings.UPLOAD_DIR)
     upload_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Save file
+
+    # Stream to disk in bounded chunks, hashing as we go
     doc_id = uuid.uuid4()
     storage_path = upload_dir / f"{doc_id}{file_ext}"
-    with open(storage_path, "wb") as f:
-        f.write(contents)
-    
+    saved = await _save_upload(file, storage_path, max_size)
+    if saved is None:
+        raise too_large
+    file_size, content_hash = saved
+
+    # Exact re-upload: link to the existing document instead of ingesting it again
+    existing = (
+        db.query(Document)
+        .filter(Document.content_hash == content_hash, Document.processing_status != "failed")
+        .order_by(Document.uploaded_at)
+        .first()
+    )
+    if existing:
+        storage_path.unlink(missing_ok=True)
+        return DocumentUploadResponse(
+            document_id=existing.id, status=existing.processing_status, duplicate=True
+        )
+
     # Create document record
     document = Document(
         id=doc_id,
         filename=file.filename,
         file_size_bytes=file_size,
         file_type=file_ext.lstrip("."),
+        content_hash=content_hash,
         uploaded_by=current_user.id,
         processing_status="pending",
         storage_path=str(storage_path),
     )
     db.add(document)
+    # Document and its job are committed together, so no upload is left unqueued
+    job = enqueue_document(db, document)
     db.commit()
-    db.refresh(document)
-    
-    # Process document (inline for now)
-    try:
-        processor = DocumentProcessor(db=db, document=document, vector_store=vector_store)
-        await processor.process_document()
-        document.processing_status = "processed"
-        db.commit()
-    except Exception:
-        document.processing_status = "failed"
-        db.commit()
-    
-    return DocumentUploadResponse(document_id=document.id, status=document.processing_status)
+
+    # Processed by the ingestion workers; poll GET /documents/{id}/status
+    get_ingestion_pool().notify()
+
+    return DocumentUploadResponse(document_id=doc_id, status="pending", job_id=job.id)
 
 
 @router.get("", response_model=DocumentListResponse)
@@ -119,6 +176,48 @@ async def list_documents(
     )
 
 
+@router.get("/{document_id}/status", response_model=IngestionStatusResponse)
+async def get_document_status(
+    document_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> IngestionStatusResponse:
+    """Get a document's ingestion status and progress."""
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+
+    job = (
+        db.query(IngestionJob)
+        .filter(IngestionJob.document_id == document_id)
+        .order_by(IngestionJob.created_at.desc())
+        .first()
+    )
+    if job is None:
+        # Ingested inline, before the job queue existed
+        return IngestionStatusResponse(
+            document_id=document.id,
+            processing_status=document.processing_status,
+            progress=1.0 if document.processing_status == "processed" else 0.0,
+        )
+
+    return IngestionStatusResponse(
+        document_id=document.id,
+        processing_status=document.processing_status,
+        job_status=job.status,
+        stage=job.stage,
+        progress=job.progress,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        error=job.error,
+        next_attempt_at=job.run_after if job.status == "queued" else None,
+        updated_at=job.updated_at,
+    )
+
+
 @router.get("/{document_id}/download")
 async def download_document(
     document_id: uuid.UUID,
@@ -153,7 +252,7 @@ async def delete_document(
     vector_store: VectorStore = Depends(get_vector_store),
 ) -> None:
     """Delete a document and its chunks."""
-    document = db.query(Document).filter(Document.id == document_id).first()
+    document = await run_db(_get_document, db, document_id)
     if not document:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -161,23 +260,26 @@ async def delete_document(
         )
     
     # Get chunk embedding IDs for vector store deletion
-    chunks = db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).all()
-    embedding_ids = [chunk.embedding_id for chunk in chunks]
+    embedding_ids = await run_db(_chunk_embedding_ids, db, document_id)
     
     # Delete from vector store
     if embedding_ids:
         try:
-            vector_store.delete(embedding_ids)
+            await vector_store.delete(embedding_ids)
         except Exception:
             pass  # Best effort deletion
+        invalidate_rerank_scores(embedding_ids)
+        invalidate_chunk_token_ids(embedding_ids)
+        await run_in_threadpool(get_chunk_store().delete, embedding_ids)
     
     # Delete file from storage
     if document.storage_path and os.path.exists(document.storage_path):
         try:
-            os.remove(document.storage_path)
+            await run_in_threadpool(os.remove, document.storage_path)
         except OSError:
             pass  # Best effort deletion
     
     # Delete from database (cascades to chunks)
-    db.delete(document)
-    db.commit()
+    await run_db(_delete_document_row, db, document)
+
+    await run_in_threadpool(invalidate_answer_cache)
@@ -1,23 +1,45 @@
 """Query API endpoints."""
 
+import asyncio
 import time
 import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_current_user
-from app.core.database import get_db
-from app.models.database import Document, DocumentChunk, Query as QueryModel, QuerySource, User
+from app.config import settings
+from app.core.database import SessionLocal, get_db, run_db
+from app.core.vector_store import SearchFilter, VectorStore, get_vector_store
+from app.models.database import Document, DocumentChunk, QuerySource, User
+from app.models.database import Query as QueryModel
 from app.models.schemas import (
+    AnswerCacheStats,
+    BatchQueryRequest,
+    BatchQueryResponse,
+    BatchQueryResult,
     ConfidenceLevel,
+    LRUCacheStats,
+    QueryCacheStatsResponse,
     QueryRequest,
     QueryResponse,
+    QueryStreamDone,
+    QueryStreamError,
+    QueryStreamSources,
+    QueryStreamToken,
     SourceResponse,
 )
-from app.services.answer_generator import AnswerGenerator
-from app.services.reranker import rerank_chunks
-from app.services.retrieval import RetrieverService
+from app.services.answer_cache import AnswerCache, CachedAnswer, get_answer_cache
+from app.services.answer_generator import NO_ANSWER_FALLBACK, AnswerGenerator
+from app.services.embeddings import embed_queries_async, get_query_embedding_cache_stats
+from app.services.query_expander import get_expansion_cache_stats
+from app.services.reranker import get_rerank_cache_stats, rerank_chunks, rerank_chunks_batch
+from app.services.retrieval import RetrievedChunk, RetrieverService
 
 router = APIRouter(prefix="/query", tags=["query"])
 
@@ -25,101 +47,463 @@ router = APIRouter(prefix="/query", tags=["query"])
 # Larger pool = better recall for statistical/numerical queries
 CANDIDATE_POOL_SIZE = 30
 
+NO_SOURCES_ANSWER = "Not sure based on available information."
 
-@router.post("", response_model=QueryResponse)
-async def submit_query(
-    request: QueryRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> QueryResponse:
-    """Submit a query and get a grounded answer."""
-    start_time = time.time()
-    
-    # Retrieve larger candidate pool for reranking
-    retriever = RetrieverService()
-    candidates = await retriever.retrieve(
-        query=request.query, top_k=CANDIDATE_POOL_SIZE
-    )
-    
-    # Rerank with cross-encoder and take top results
-    chunks = rerank_chunks(
-        query=request.query, chunks=candidates, top_k=request.max_chunks
+
+def _add_query(
+    db: Session,
+    user_id: uuid.UUID,
+    query_text: str,
+    response: QueryResponse,
+    source_chunks: list[tuple[str, float]],
+) -> None:
+    """Add a query and the chunks it cited to the session (not committed)."""
+    # Convert numpy types to Python float
+    avg_similarity = (
+        float(sum(score for _, score in source_chunks) / len(source_chunks))
+        if source_chunks
+        else 0.0
     )
-    
-    if not chunks:
-        # No relevant documents found
-        processing_time_ms = int((time.time() - start_time) * 1000)
-        
-        # Store query in database
-        query_record = QueryModel(
-            id=uuid.uuid4(),
-            user_id=current_user.id,
-            query_text=request.query,
-            answer_text="Not sure based on available information.",
-            confidence_level=ConfidenceLevel.LOW.value,
-            num_chunks_retrieved=0,
-            avg_similarity_score=0.0,
-            processing_time_ms=processing_time_ms,
-        )
-        db.add(query_record)
-        db.commit()
-        
-        return QueryResponse(
-            answer="Not sure based on available information.",
-            confidence=ConfidenceLevel.LOW,
-            sources=[],
-            processing_time_ms=processing_time_ms,
-        )
-    
-    # Generate answer
-    generator = AnswerGenerator()
-    generated = await generator.generate(query=request.query, chunks=chunks)
-    
-    processing_time_ms = int((time.time() - start_time) * 1000)
-    
-    # Calculate average similarity (convert numpy types to Python float)
-    avg_similarity = float(sum(c.similarity for c in chunks) / len(chunks))
-    
-    # Store query in database
+
     query_record = QueryModel(
         id=uuid.uuid4(),
-        user_id=current_user.id,
-        query_text=request.query,
-        answer_text=generated.answer,
-        confidence_level=generated.confidence.value,
-        num_chunks_retrieved=len(chunks),
+        user_id=user_id,
+        query_text=query_text,
+        answer_text=response.answer,
+        confidence_level=response.confidence.value,
+        num_chunks_retrieved=len(source_chunks),
         avg_similarity_score=avg_similarity,
-        processing_time_ms=processing_time_ms,
+        processing_time_ms=response.processing_time_ms,
     )
     db.add(query_record)
-    db.flush()
-    
-    # Store query sources
-    for chunk in chunks:
+
+    # Store query sources (the unit of work inserts them after their query)
+    for chunk_id, score in source_chunks:
         source = QuerySource(
             query_id=query_record.id,
-            chunk_id=uuid.UUID(chunk.chunk_id),
-            similarity_score=float(chunk.similarity),
+            chunk_id=uuid.UUID(chunk_id),
+            similarity_score=float(score),
         )
         db.add(source)
-    
+
+
+def _save_query(
+    db: Session,
+    user_id: uuid.UUID,
+    query_text: str,
+    response: QueryResponse,
+    source_chunks: list[tuple[str, float]],
+) -> None:
+    """Persist a query and the chunks it cited."""
+    _add_query(db, user_id, query_text, response, source_chunks)
     db.commit()
-    
-    # Build source responses
-    sources = [
+
+
+def _save_queries(
+    db: Session,
+    user_id: uuid.UUID,
+    queries: list[tuple[str, QueryResponse, list[tuple[str, float]]]],
+) -> None:
+    """Persist many (query text, response, source chunks) in one commit."""
+    for query_text, response, source_chunks in queries:
+        _add_query(db, user_id, query_text, response, source_chunks)
+    db.commit()
+
+
+def _save_query_in_own_session(
+    user_id: uuid.UUID,
+    query_text: str,
+    response: QueryResponse,
+    source_chunks: list[tuple[str, float]],
+) -> None:
+    """_save_query with a short session of its own, for work outliving the request's."""
+    db = SessionLocal()
+    try:
+        _save_query(db, user_id, query_text, response, source_chunks)
+    finally:
+        db.close()
+
+
+def _build_sources(chunks: list[RetrievedChunk]) -> list[SourceResponse]:
+    """Build source responses for the chunks an answer is grounded on."""
+    return [
         SourceResponse(
             document_id=uuid.UUID(chunk.document_id),
             document_name=chunk.document_name,
             page_number=chunk.page_number,
-            excerpt=chunk.text_content[:200] + "..." if len(chunk.text_content) > 200 else chunk.text_content,
+            excerpt=(
+                chunk.text_content[:200] + "..."
+                if len(chunk.text_content) > 200
+                else chunk.text_content
+            ),
             similarity_score=chunk.similarity,
+            start_char=chunk.start_char,
+            end_char=chunk.end_char,
         )
         for chunk in chunks
     ]
-    
-    return QueryResponse(
+
+
+def _search_filter(request: QueryRequest) -> SearchFilter | None:
+    """Translate a request's optional scope fields into a vector search filter."""
+    search_filter = SearchFilter(
+        document_ids=[str(doc_id) for doc_id in request.document_ids or []] or None,
+        file_types=[t.lower().lstrip(".") for t in request.file_types or []] or None,
+        uploaded_after=request.uploaded_after,
+        uploaded_before=request.uploaded_before,
+    )
+    return search_filter if search_filter.to_qdrant() is not None else None
+
+
+def _answer_cache_for(request: QueryRequest) -> AnswerCache | None:
+    """The answer cache, unless the query is scoped (entries are not keyed by scope)."""
+    return get_answer_cache() if _search_filter(request) is None else None
+
+
+async def _retrieve_and_rerank(
+    request: QueryRequest, vector_store: VectorStore
+) -> list[RetrievedChunk]:
+    """Retrieve a candidate pool and narrow it down with the cross-encoder."""
+    # Retrieve larger candidate pool for reranking
+    retriever = RetrieverService(vector_store)
+    candidates = await retriever.retrieve(
+        query=request.query,
+        top_k=CANDIDATE_POOL_SIZE,
+        search_filter=_search_filter(request),
+    )
+
+    # Rerank with cross-encoder and take top results
+    return await rerank_chunks(
+        query=request.query, chunks=candidates, top_k=request.max_chunks
+    )
+
+
+def _sse_event(event: str, data: BaseModel) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {data.model_dump_json()}\n\n"
+
+
+@router.post("", response_model=QueryResponse)
+async def submit_query(
+    request: QueryRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    vector_store: VectorStore = Depends(get_vector_store),
+) -> QueryResponse:
+    """Submit a query and get a grounded answer."""
+    start_time = time.time()
+    user_id = uuid.UUID(str(current_user.id))
+
+    # Serve semantically equivalent questions from the answer cache
+    answer_cache = _answer_cache_for(request)
+    query_embedding: list[float] | None = None
+    if answer_cache is not None:
+        query_embedding = (await embed_queries_async([request.query]))[0]
+        cached = await run_in_threadpool(
+            answer_cache.lookup, query_embedding, request.max_chunks
+        )
+        if cached is not None:
+            response = cached.response.model_copy(
+                update={"processing_time_ms": int((time.time() - start_time) * 1000)}
+            )
+            await run_db(_save_query, db, user_id, request.query, response, cached.source_chunks)
+            return response
+
+    chunks = await _retrieve_and_rerank(request, vector_store)
+
+    if not chunks:
+        # No relevant documents found
+        response = QueryResponse(
+            answer=NO_SOURCES_ANSWER,
+            confidence=ConfidenceLevel.LOW,
+            sources=[],
+            processing_time_ms=int((time.time() - start_time) * 1000),
+        )
+        await run_db(_save_query, db, user_id, request.query, response, [])
+        if answer_cache is not None and query_embedding is not None:
+            await run_in_threadpool(
+                answer_cache.store, query_embedding, request.max_chunks, CachedAnswer(response, [])
+            )
+        return response
+
+    # Generate answer
+    generator = AnswerGenerator()
+    generated = await generator.generate(query=request.query, chunks=chunks)
+
+    processing_time_ms = int((time.time() - start_time) * 1000)
+
+    response = QueryResponse(
         answer=generated.answer,
         confidence=generated.confidence,
-        sources=sources,
+        sources=_build_sources(chunks),
         processing_time_ms=processing_time_ms,
     )
+    source_chunks = [(chunk.chunk_id, float(chunk.similarity)) for chunk in chunks]
+    await run_db(_save_query, db, user_id, request.query, response, source_chunks)
+
+    if answer_cache is not None and query_embedding is not None:
+        await run_in_threadpool(
+            answer_cache.store,
+            query_embedding,
+            request.max_chunks,
+            CachedAnswer(response, source_chunks),
+        )
+
+    return response
+
+
+@router.post("/stream")
+async def stream_query(
+    request: QueryRequest,
+    current_user: User = Depends(get_current_user),
+    vector_store: VectorStore = Depends(get_vector_store),
+) -> StreamingResponse:
+    """
+    Submit a query and stream the answer as Server-Sent Events.
+
+    Events, in order:
+    - sources: the reranked sources, sent as soon as retrieval finishes
+    - token: answer text deltas as the LLM produces them
+    - done: final confidence and processing_time_ms
+    - error: instead of done, if the LLM fails partway through
+
+    The query is persisted once generation completes, or with the partial
+    answer and the error if it fails.
+    """
+    start_time = time.time()
+    user_id = uuid.UUID(str(current_user.id))
+
+    answer_cache = _answer_cache_for(request)
+    query_embedding: list[float] | None = None
+    cached: CachedAnswer | None = None
+    if answer_cache is not None:
+        query_embedding = (await embed_queries_async([request.query]))[0]
+        cached = await run_in_threadpool(
+            answer_cache.lookup, query_embedding, request.max_chunks
+        )
+
+    # Retrieval runs before the response starts, so its errors are still HTTP errors
+    chunks = [] if cached is not None else await _retrieve_and_rerank(request, vector_store)
+
+    async def events() -> AsyncIterator[str]:
+        if cached is not None:
+            sources = cached.response.sources
+            source_chunks = cached.source_chunks
+        else:
+            sources = _build_sources(chunks)
+            source_chunks = [(chunk.chunk_id, float(chunk.similarity)) for chunk in chunks]
+
+        avg_similarity = (
+            sum(score for _, score in source_chunks) / len(source_chunks)
+            if source_chunks
+            else 0.0
+        )
+        yield _sse_event(
+            "sources", QueryStreamSources(sources=sources, avg_similarity=avg_similarity)
+        )
+
+        if cached is not None:
+            answer = cached.response.answer
+            confidence = cached.response.confidence
+            yield _sse_event("token", QueryStreamToken(text=answer))
+        elif not chunks:
+            answer = NO_SOURCES_ANSWER
+            confidence = ConfidenceLevel.LOW
+            yield _sse_event("token", QueryStreamToken(text=answer))
+        else:
+            generator = AnswerGenerator()
+            parts: list[str] = []
+            try:
+                async for delta in generator.stream(query=request.query, chunks=chunks):
+                    parts.append(delta)
+                    yield _sse_event("token", QueryStreamToken(text=delta))
+            except Exception as e:
+                print(f"[QUERY] Streamed answer failed for {request.query[:50]!r}: {e}")
+                error = f"Answer generation failed: {type(e).__name__}"
+                partial = "".join(parts)
+                failed = QueryResponse(
+                    answer=f"{partial}\n\n[{error}]" if partial else f"[{error}]",
+                    confidence=ConfidenceLevel.LOW,
+                    sources=sources,
+                    processing_time_ms=int((time.time() - start_time) * 1000),
+                )
+                await run_db(
+                    _save_query_in_own_session, user_id, request.query, failed, source_chunks
+                )
+                yield _sse_event(
+                    "error",
+                    QueryStreamError(error=error, processing_time_ms=failed.processing_time_ms),
+                )
+                return
+            answer = "".join(parts)
+            if not answer:
+                answer = NO_ANSWER_FALLBACK
+                yield _sse_event("token", QueryStreamToken(text=answer))
+            confidence = generator.score_answer(answer, chunks)
+
+        response = QueryResponse(
+            answer=answer,
+            confidence=confidence,
+            sources=sources,
+            processing_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+        # The request-scoped session is closed once streaming starts, so use our own
+        await run_db(_save_query_in_own_session, user_id, request.query, response, source_chunks)
+
+        if answer_cache is not None and query_embedding is not None and cached is None:
+            await run_in_threadpool(
+                answer_cache.store,
+                query_embedding,
+                request.max_chunks,
+                CachedAnswer(response, source_chunks),
+            )
+
+        yield _sse_event(
+            "done",
+            QueryStreamDone(
+                confidence=response.confidence,
+                processing_time_ms=response.processing_time_ms,
+            ),
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop reverse proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch", response_model=BatchQueryResponse)
+async def submit_query_batch(
+    request: BatchQueryRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    vector_store: VectorStore = Depends(get_vector_store),
+) -> BatchQueryResponse:
+    """
+    Answer many queries in one request (bulk evaluation, offline workloads).
+
+    Embedding, vector search and reranking run as large batches across all
+    queries; LLM calls run with BATCH_QUERY_LLM_CONCURRENCY. With
+    retrieval_only, generation is skipped and only sources are returned.
+    The answer cache is bypassed so results reflect the current pipeline.
+    A failed LLM call only fails its own result (error set, answer unset);
+    the other answers are still returned and saved.
+    """
+    if len(request.queries) > settings.BATCH_QUERY_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_QUERY_MAX_SIZE} queries per batch",
+        )
+
+    start_time = time.time()
+    query_texts = [q.query for q in request.queries]
+
+    retriever = RetrieverService(vector_store)
+    candidates = await retriever.retrieve_batch(
+        query_texts,
+        top_k=CANDIDATE_POOL_SIZE,
+        max_concurrent_expansions=settings.BATCH_QUERY_LLM_CONCURRENCY,
+        search_filters=[_search_filter(q) for q in request.queries],
+    )
+
+    # Rerank each max_chunks group as one batch; groups share the cross-encoder batcher
+    groups: dict[int, list[int]] = defaultdict(list)
+    for i, q in enumerate(request.queries):
+        groups[q.max_chunks].append(i)
+    group_results = await asyncio.gather(
+        *(
+            rerank_chunks_batch(
+                [query_texts[i] for i in indices],
+                [candidates[i] for i in indices],
+                top_k=max_chunks,
+            )
+            for max_chunks, indices in groups.items()
+        )
+    )
+    reranked: list[list[RetrievedChunk]] = [[] for _ in query_texts]
+    for indices, results in zip(groups.values(), group_results, strict=True):
+        for i, chunks in zip(indices, results, strict=True):
+            reranked[i] = chunks
+
+    if request.retrieval_only:
+        return BatchQueryResponse(
+            results=[
+                BatchQueryResult(query=text, sources=_build_sources(chunks))
+                for text, chunks in zip(query_texts, reranked, strict=True)
+            ],
+            processing_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+    generator = AnswerGenerator()
+    semaphore = asyncio.Semaphore(settings.BATCH_QUERY_LLM_CONCURRENCY)
+
+    async def answer(text: str, chunks: list[RetrievedChunk]) -> QueryResponse | str:
+        """Answer one query, or return an error message if generation failed."""
+        if not chunks:
+            answer_text, confidence = NO_SOURCES_ANSWER, ConfidenceLevel.LOW
+        else:
+            try:
+                async with semaphore:
+                    generated = await generator.generate(query=text, chunks=chunks)
+            except Exception as e:
+                print(f"[QUERY] Batch answer failed for {text[:50]!r}: {e}")
+                return f"Answer generation failed: {type(e).__name__}"
+            answer_text, confidence = generated.answer, generated.confidence
+        return QueryResponse(
+            answer=answer_text,
+            confidence=confidence,
+            sources=_build_sources(chunks),
+            processing_time_ms=int((time.time() - start_time) * 1000),
+        )
+
+    responses = await asyncio.gather(
+        *(answer(text, chunks) for text, chunks in zip(query_texts, reranked, strict=True))
+    )
+
+    await run_db(
+        _save_queries,
+        db,
+        uuid.UUID(str(current_user.id)),
+        [
+            (text, response, [(chunk.chunk_id, float(chunk.similarity)) for chunk in chunks])
+            for text, chunks, response in zip(query_texts, reranked, responses, strict=True)
+            if not isinstance(response, str)
+        ],
+    )
+
+    return BatchQueryResponse(
+        results=[
+            BatchQueryResult(query=text, sources=_build_sources(chunks), error=response)
+            if isinstance(response, str)
+            else BatchQueryResult(
+                query=text,
+                answer=response.answer,
+                confidence=response.confidence,
+                sources=response.sources,
+            )
+            for text, chunks, response in zip(query_texts, reranked, responses, strict=True)
+        ],
+        processing_time_ms=int((time.time() - start_time) * 1000),
+    )
+
+
+@router.get("/cache/stats", response_model=QueryCacheStatsResponse)
+async def get_cache_stats(
+    current_user: User = Depends(get_current_user),
+) -> QueryCacheStatsResponse:
+    """Get hit/miss counters for the query pipeline caches."""
+    answer_cache = get_answer_cache()
+    answers = (
+        AnswerCacheStats.model_validate({"enabled": True, **answer_cache.stats()})
+        if answer_cache is not None
+        else AnswerCacheStats(enabled=False)
+    )
+    return QueryCacheStatsResponse(
+        answers=answers,
+        expansions=LRUCacheStats.model_validate(get_expansion_cache_stats()),
+        embeddings=LRUCacheStats.model_validate(get_query_embedding_cache_stats()),
+        rerank_scores=LRUCacheStats.model_validate(get_rerank_cache_stats()),
+    )
@@ -1,5 +1,7 @@
 """Application configuration using Pydantic BaseSettings."""
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -16,8 +18,40 @@ class Settings(BaseSettings):
     # Vector DB
     VECTOR_DB_HOST: str = "localhost"
     VECTOR_DB_PORT: int = 6333
+    VECTOR_DB_GRPC_PORT: int = 6334
+    VECTOR_DB_PREFER_GRPC: bool = False  # gRPC transport instead of HTTP/JSON
     COLLECTION_NAME: str = "office_of_research_docs"
 
+    # Vector index - memory vs latency trade-offs (apply to an existing
+    # collection with scripts/apply_vector_settings.py)
+    VECTOR_QUANTIZATION: Literal["none", "scalar", "binary"] = "none"  # "scalar" = int8
+    VECTOR_QUANTIZATION_ALWAYS_RAM: bool = True  # Keep quantized vectors in RAM
+    VECTOR_QUANTIZATION_RESCORE: bool = True  # Re-rank quantized hits with original vectors
+    VECTOR_QUANTIZATION_OVERSAMPLING: float = 2.0  # Quantized candidates fetched per result
+    VECTORS_ON_DISK: bool = False  # Original vectors on disk (memory-mapped)
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCT: int = 100
+    HNSW_EF_SEARCH: int | None = None  # None = Qdrant default
+
+    # Ingestion writes
+    VECTOR_UPSERT_BATCH_SIZE: int = 256  # Points per Qdrant upsert request
+    VECTOR_UPSERT_WAIT: bool = True  # False = return once Qdrant has logged the write
+
+    # Background ingestion - uploads are queued in Postgres and processed by a worker pool
+    INGESTION_WORKERS: int = 2  # Concurrent ingestion jobs per API process
+    INGESTION_POLL_INTERVAL_S: float = 1.0  # Idle workers check the queue this often
+    INGESTION_MAX_ATTEMPTS: int = 3
+    INGESTION_RETRY_BACKOFF_S: float = 30.0  # Doubles after each failed attempt
+    INGESTION_RETRY_MAX_BACKOFF_S: float = 900.0
+    INGESTION_JOB_LEASE_S: float = 600.0  # Jobs whose worker stops heartbeating are reclaimed
+    INGESTION_EMBED_BATCH_SIZE: int = 64  # Chunks per embedding call (queries run in between)
+    INGESTION_INFERENCE_SLOTS: int = 1  # Inference pool threads ingestion may hold at once
+    # PDF page workers, shared by all ingestion workers (0 = min(4, cores // 2), 1 = in-process).
+    # Together with INFERENCE_WORKERS this should stay below the core count, or PDF parsing
+    # starves the query inference that INGESTION_INFERENCE_SLOTS reserves threads for.
+    PDF_EXTRACTION_PROCESSES: int = 0
+    PDF_PARALLEL_MIN_PAGES: int = 8  # Smaller PDFs aren't worth the process hand-off
+
     # LLM (Groq)
     GROQ_API_KEY: str = ""
     LLM_MODEL: str = "llama-3.3-70b-versatile"
@@ -26,11 +60,58 @@ class Settings(BaseSettings):
     # Embeddings - Using mpnet for better quality (768 dims vs 384)
     EMBEDDING_MODEL: str = "sentence-transformers/all-mpnet-base-v2"
 
+    # Inference - threads for CPU-bound model calls (keeps the event loop free)
+    INFERENCE_WORKERS: int = 2
+    # "torch" (sentence-transformers) or "onnx" (int8 models from scripts/export_onnx_models.py)
+    INFERENCE_BACKEND: Literal["torch", "onnx"] = "torch"
+    ONNX_MODEL_DIR: str = "./models/onnx"
+    INFERENCE_THREADS: int = 4  # ONNX Runtime intra-op threads per model call
+    # Micro-batching - concurrent query-time model calls are coalesced into one forward pass
+    INFERENCE_MAX_BATCH_SIZE: int = 64
+    INFERENCE_BATCH_WAIT_MS: float = 5.0
+
     # Retrieval - More chunks for complex queries
     TOP_K_CHUNKS: int = 10
     SIMILARITY_THRESHOLD: float = 0.55
     CHUNK_SIZE: int = 400
     CHUNK_OVERLAP: int = 100
+    # "chars" (CHUNK_SIZE/CHUNK_OVERLAP) or "tokens" - sized with the embedding tokenizer
+    # to fill its window (CHUNK_MAX_TOKENS, 0 = max_seq_length minus special tokens)
+    CHUNKING_MODE: Literal["chars", "tokens"] = "chars"
+    CHUNK_MAX_TOKENS: int = 0
+    CHUNK_OVERLAP_TOKENS: int = 64
+    QUERY_EXPANSION_TIMEOUT_S: float = 3.0  # Past this, retrieve with the original query only
+
+    # Lexical retrieval - BM25 weights stored as Qdrant sparse vectors (IDF applied by Qdrant)
+    BM25_K1: float = 1.5
+    BM25_B: float = 0.75
+    BM25_AVG_DOC_LENGTH: float = 65.0  # ~CHUNK_SIZE chars in words
+
+    # Reranking cascade - L-6 scores the whole pool, L-12 only the top N
+    RERANK_CASCADE_ENABLED: bool = False
+    RERANK_CASCADE_TOP_N: int = 12
+
+    # Batch queries - bulk evaluation / offline workloads
+    BATCH_QUERY_MAX_SIZE: int = 500
+    BATCH_QUERY_LLM_CONCURRENCY: int = 4  # Concurrent Groq calls (expansion and generation)
+
+    # Query-side caches (per worker) - repeat queries skip the LLM and the embedding model
+    EXPANSION_CACHE_SIZE: int = 1024
+    EXPANSION_CACHE_TTL_SECONDS: int = 3600
+    EMBEDDING_CACHE_SIZE: int = 4096
+    EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    RERANK_CACHE_SIZE: int = 20000  # (query, chunk) cross-encoder scores
+    RERANK_CACHE_TTL_SECONDS: int = 86400
+    CHUNK_TOKEN_CACHE_SIZE: int = 50000  # BM25 token ids per chunk (legacy collections)
+
+    # Semantic answer cache - "memory" (per worker), "sqlite" (shared on host) or "none".
+    # A "memory" cache is only invalidated in the worker that ingested or deleted the
+    # document, so run several workers with "sqlite" or other workers serve stale answers.
+    ANSWER_CACHE_BACKEND: Literal["memory", "sqlite", "none"] = "memory"
+    ANSWER_CACHE_PATH: str = "./cache/answer_cache.sqlite3"
+    ANSWER_CACHE_MAX_ENTRIES: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: int = 86400
+    ANSWER_CACHE_SIMILARITY: float = 0.95  # Min cosine between queries to reuse an answer
 
     # Security
     SECRET_KEY: str = "change-this-in-production"
@@ -39,7 +120,9 @@ class Settings(BaseSettings):
 
     # File Storage
     UPLOAD_DIR: str = "./uploads"
+    CHUNK_STORE_DIR: str = "./chunk_store"  # Chunk texts (Qdrant payloads hold ids only)
     MAX_FILE_SIZE_MB: int = 50
+    UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024  # Uploads are streamed to disk this much at a time
 
     class Config:
         env_file = ".env"
@@ -1,12 +1,17 @@
 """Database connection and session management."""
 
-from collections.abc import Generator
+import asyncio
+from collections.abc import Callable, Generator
+from typing import Any, TypeVar
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
 
+T = TypeVar("T")
+
 engine = create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -20,4 +25,19 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking session work in the threadpool without blocking the event loop.
 
+    If the caller is cancelled, the call still finishes before the
+    cancellation propagates, so a session is never used by two threads
+    at once (e.g. a rollback racing an in-flight INSERT).
+    """
+    call = asyncio.ensure_future(run_in_threadpool(func, *args, **kwargs))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        await asyncio.wait({call})
+        if not call.cancelled():
+            call.exception()  # Retrieved here; the cancellation is what propagates
+        raise
@@ -0,0 +1,144 @@
+"""Bounded executors and micro-batching for CPU-bound inference and ingestion work."""
+
+import asyncio
+import functools
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Generic, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+# Shared pool - bounded so concurrent queries queue instead of oversubscribing cores
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Get or create the shared inference thread pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.INFERENCE_WORKERS,
+            thread_name_prefix="inference",
+        )
+    return _executor
+
+
+async def run_inference(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking model call on the inference pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_inference_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+# Ingestion shares the inference pool but never holds all of it, so queries keep a thread
+_ingestion_slots: asyncio.Semaphore | None = None
+
+# Separate pool for document parsing, sized to the number of ingestion workers
+_ingestion_executor: ThreadPoolExecutor | None = None
+
+
+async def run_ingestion_inference(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a model call for ingestion on the inference pool, within INGESTION_INFERENCE_SLOTS."""
+    global _ingestion_slots
+    if _ingestion_slots is None:
+        _ingestion_slots = asyncio.Semaphore(settings.INGESTION_INFERENCE_SLOTS)
+    async with _ingestion_slots:
+        return await run_inference(func, *args, **kwargs)
+
+
+def get_ingestion_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool for blocking ingestion work (parsing files)."""
+    global _ingestion_executor
+    if _ingestion_executor is None:
+        _ingestion_executor = ThreadPoolExecutor(
+            max_workers=settings.INGESTION_WORKERS,
+            thread_name_prefix="ingestion",
+        )
+    return _ingestion_executor
+
+
+async def run_ingestion_task(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run blocking ingestion work off the event loop, away from the inference pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_ingestion_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+class MicroBatcher(Generic[ItemT, ResultT]):
+    """
+    Coalesces concurrent inference requests into shared forward passes.
+
+    Requests arriving within max_wait_ms of the first pending one (or until
+    max_batch_size items are pending) are concatenated, run through
+    batch_fn once on the inference pool, and each caller gets back exactly
+    the slice of results for its own items, in order.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[ItemT]], Sequence[ResultT]],
+        max_batch_size: int,
+        max_wait_ms: float,
+    ) -> None:
+        """Initialize with the batched model call and the batching window."""
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: list[tuple[list[ItemT], asyncio.Future[list[ResultT]]]] = []
+        self._pending_items = 0
+        self._timer: asyncio.TimerHandle | None = None
+        # The loop only keeps weak references to tasks; hold running batches until they finish
+        self._running: set[asyncio.Task[None]] = set()
+
+    async def submit(self, items: list[ItemT]) -> list[ResultT]:
+        """Queue items for the next batch and wait for their results."""
+        if not items:
+            return []
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[ResultT]] = loop.create_future()
+        self._pending.append((items, future))
+        self._pending_items += len(items)
+
+        if self._pending_items >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything pending as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending, self._pending_items = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[list[ItemT], asyncio.Future[list[ResultT]]]]) -> None:
+        """Run one forward pass and hand each caller its own results."""
+        items = [item for request_items, _ in batch for item in request_items]
+        try:
+            outputs = await run_inference(self.batch_fn, items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for request_items, future in batch:
+            if not future.done():
+                future.set_result(list(outputs[offset:offset + len(request_items)]))
+            offset += len(request_items)
@@ -0,0 +1,16 @@
+"""Shared async Groq client."""
+
+from groq import AsyncGroq
+
+from app.config import settings
+
+# Lazy-loaded Groq client (one connection pool per worker)
+_client: AsyncGroq | None = None
+
+
+def get_groq_client() -> AsyncGroq:
+    """Get or initialize the async Groq client (singleton)."""
+    global _client
+    if _client is None:
+        _client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+    return _client
@@ -1,10 +1,103 @@
 """Vector store client for Qdrant."""
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, cast
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Condition,
+    DatetimeRange,
+    Disabled,
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    Fusion,
+    FusionQuery,
+    HnswConfigDiff,
+    MatchAny,
+    MatchValue,
+    Modifier,
+    PayloadSchemaType,
+    PayloadSelectorExclude,
+    PointStruct,
+    Prefetch,
+    QuantizationSearchParams,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SparseVector,
+    SparseVectorParams,
+    Vector,
+    VectorParams,
+    VectorParamsDiff,
+)
 
 from app.config import settings
 
+# Named vectors in the collection: dense embeddings + BM25 sparse vectors
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "lexical"
+
+# Qdrant's RRF scores a hit 1 / (2 + rank) in each prefetch; a point ranked
+# first by both the dense and the sparse search gets the maximum
+RRF_MAX_SCORE = 1 / 2 + 1 / 2
+
+# Chunk texts live in the local chunk store; older points may still carry them
+TEXT_PAYLOAD_FIELD = "text_content"
+SEARCH_PAYLOAD = PayloadSelectorExclude(exclude=[TEXT_PAYLOAD_FIELD])
+
+# Indexed payload fields - filtered searches use these instead of scanning
+PAYLOAD_INDEXES = {
+    "document_id": PayloadSchemaType.KEYWORD,
+    "file_type": PayloadSchemaType.KEYWORD,
+    "uploaded_at": PayloadSchemaType.DATETIME,
+}
+
+
+def payload_timestamp(value: datetime) -> str:
+    """Format a datetime for the uploaded_at payload field (RFC 3339, naive = UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return value.isoformat()
+
+
+@dataclass
+class SearchFilter:
+    """Restricts a search to matching documents; unset fields don't filter."""
+
+    document_ids: list[str] | None = None
+    file_types: list[str] | None = None
+    uploaded_after: datetime | None = None
+    uploaded_before: datetime | None = None
+
+    def to_qdrant(self) -> Filter | None:
+        """Build the Qdrant payload filter, or None if nothing is set."""
+        conditions: list[Condition] = []
+        if self.document_ids:
+            conditions.append(
+                FieldCondition(key="document_id", match=MatchAny(any=self.document_ids))
+            )
+        if self.file_types:
+            conditions.append(
+                FieldCondition(key="file_type", match=MatchAny(any=self.file_types))
+            )
+        if self.uploaded_after is not None or self.uploaded_before is not None:
+            conditions.append(
+                FieldCondition(
+                    key="uploaded_at",
+                    range=DatetimeRange(gte=self.uploaded_after, lte=self.uploaded_before),
+                )
+            )
+        return Filter(must=conditions) if conditions else None
+
 
 class VectorStore:
     """Qdrant vector store client."""
@@ -17,58 +110,382 @@ class VectorStore:
     }
 
     def __init__(self) -> None:
-        """Initialize Qdrant client."""
-        self.client = QdrantClient(
+        """Initialize async Qdrant client (call _ensure_collection before use)."""
+        self.client = AsyncQdrantClient(
             host=settings.VECTOR_DB_HOST,
             port=settings.VECTOR_DB_PORT,
+            grpc_port=settings.VECTOR_DB_GRPC_PORT,
+            prefer_grpc=settings.VECTOR_DB_PREFER_GRPC,
         )
         self.collection_name = settings.COLLECTION_NAME
         self.vector_size = self.EMBEDDING_DIMS.get(settings.EMBEDDING_MODEL, 768)
-        self._ensure_collection()
+        # True when the collection has named dense + sparse vectors (server-side hybrid)
+        self.hybrid_enabled = False
 
-    def _ensure_collection(self) -> None:
-        """Ensure the collection exists with correct dimensions."""
+    async def _ensure_collection(self) -> None:
+        """Ensure the collection exists with correct dimensions and sparse vectors."""
         try:
-            collections = self.client.get_collections().collections
+            collections = (await self.client.get_collections()).collections
             exists = any(c.name == self.collection_name for c in collections)
-            
+
             if not exists:
-                self.client.create_collection(
+                await self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.vector_size,
-                        distance=Distance.COSINE,
-                    ),
+                    vectors_config={
+                        DENSE_VECTOR_NAME: VectorParams(
+                            size=self.vector_size,
+                            distance=Distance.COSINE,
+                            on_disk=settings.VECTORS_ON_DISK,
+                        ),
+                    },
+                    sparse_vectors_config={
+                        SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF),
+                    },
+                    hnsw_config=self._hnsw_config(),
+                    quantization_config=self._quantization_config(),
                 )
+                self.hybrid_enabled = True
                 print(f"[VECTOR_STORE] Created collection '{self.collection_name}' with {self.vector_size} dimensions")
+                await self._ensure_payload_indexes({})
             else:
+                info = await self.client.get_collection(self.collection_name)
+                params = info.config.params
+                self.hybrid_enabled = (
+                    isinstance(params.vectors, dict)
+                    and DENSE_VECTOR_NAME in params.vectors
+                    and SPARSE_VECTOR_NAME in (params.sparse_vectors or {})
+                )
                 print(f"[VECTOR_STORE] Using existing collection '{self.collection_name}'")
+                if not self.hybrid_enabled:
+                    # Collections created before sparse vectors keep working with
+                    # client-side BM25; re-create and re-upload to enable hybrid search
+                    print(
+                        "[VECTOR_STORE] Collection has no sparse vectors, "
+                        "using legacy dense-only search"
+                    )
+                await self._ensure_payload_indexes(info.payload_schema or {})
         except Exception as e:
             print(f"[VECTOR_STORE] Error ensuring collection: {e}")
+            raise
+
+    async def apply_index_settings(self) -> None:
+        """
+        Apply the configured on-disk, HNSW and quantization settings to the existing collection.
 
-    def upsert(self, point_id: str, vector: list[float], payload: dict) -> None:
-        """Insert or update a vector."""
-        self.client.upsert(
+        Qdrant rebuilds the index and quantized vectors in the background;
+        searches keep working while it does.
+        """
+        dense_name = DENSE_VECTOR_NAME if self.hybrid_enabled else ""
+        await self.client.update_collection(
             collection_name=self.collection_name,
-            points=[PointStruct(id=point_id, vector=vector, payload=payload)],
+            vectors_config={dense_name: VectorParamsDiff(on_disk=settings.VECTORS_ON_DISK)},
+            hnsw_config=self._hnsw_config(),
+            quantization_config=self._quantization_config() or Disabled.DISABLED,
+        )
+        print(
+            f"[VECTOR_STORE] Applied index settings: quantization={settings.VECTOR_QUANTIZATION}, "
+            f"on_disk={settings.VECTORS_ON_DISK}, m={settings.HNSW_M}, "
+            f"ef_construct={settings.HNSW_EF_CONSTRUCT}"
         )
 
-    def search(self, query_vector: list[float], top_k: int = 5) -> list[dict]:
-        """Search for similar vectors."""
-        results = self.client.query_points(
-            collection_name=self.collection_name,
+    @staticmethod
+    def _hnsw_config() -> HnswConfigDiff:
+        """HNSW graph parameters from settings."""
+        return HnswConfigDiff(m=settings.HNSW_M, ef_construct=settings.HNSW_EF_CONSTRUCT)
+
+    @staticmethod
+    def _quantization_config() -> ScalarQuantization | BinaryQuantization | None:
+        """Quantization config from settings (None = full-precision vectors only)."""
+        mode = settings.VECTOR_QUANTIZATION
+        if mode == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    always_ram=settings.VECTOR_QUANTIZATION_ALWAYS_RAM,
+                )
+            )
+        if mode == "binary":
+            return BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=settings.VECTOR_QUANTIZATION_ALWAYS_RAM)
+            )
+        if mode != "none":
+            raise ValueError(f"Unknown vector quantization: {mode}")
+        return None
+
+    @staticmethod
+    def _search_params(exact: bool = False) -> SearchParams | None:
+        """Dense search parameters (HNSW ef, quantization rescoring) from settings."""
+        if exact:
+            return SearchParams(exact=True)
+        quantization = (
+            QuantizationSearchParams(
+                rescore=settings.VECTOR_QUANTIZATION_RESCORE,
+                oversampling=settings.VECTOR_QUANTIZATION_OVERSAMPLING,
+            )
+            if settings.VECTOR_QUANTIZATION != "none"
+            else None
+        )
+        if settings.HNSW_EF_SEARCH is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=settings.HNSW_EF_SEARCH, quantization=quantization)
+
+    async def _ensure_payload_indexes(self, existing: Mapping[str, Any]) -> None:
+        """Create any missing payload indexes used by filtered search."""
+        for field_name, schema in PAYLOAD_INDEXES.items():
+            if field_name in existing:
+                continue
+            await self.client.create_payload_index(
+                collection_name=self.collection_name,
+                field_name=field_name,
+                field_schema=schema,
+            )
+            print(f"[VECTOR_STORE] Created payload index on '{field_name}'")
+
+    async def upsert(
+        self,
+        point_id: str,
+        vector: list[float],
+        payload: dict[str, Any],
+        sparse_vector: SparseVector | None = None,
+    ) -> None:
+        """Insert or update a vector (with its lexical sparse vector if supported)."""
+        await self.upsert_many(
+            [point_id], [vector], [payload], [sparse_vector] if sparse_vector is not None else None
+        )
+
+    async def upsert_many(
+        self,
+        point_ids: list[str],
+        vectors: list[list[float]],
+        payloads: list[dict[str, Any]],
+        sparse_vectors: list[SparseVector] | None = None,
+        batch_size: int | None = None,
+        wait: bool | None = None,
+    ) -> None:
+        """
+        Insert or update many vectors, batch_size points per request.
+
+        With wait=False, Qdrant acknowledges each batch once it is in its
+        write-ahead log instead of after indexing. Batches are not atomic
+        together: on failure, callers should delete point_ids to undo the
+        batches already written. Defaults come from VECTOR_UPSERT_BATCH_SIZE
+        and VECTOR_UPSERT_WAIT.
+        """
+        batch_size = batch_size or settings.VECTOR_UPSERT_BATCH_SIZE
+        wait = settings.VECTOR_UPSERT_WAIT if wait is None else wait
+
+        points = []
+        rows = zip(point_ids, vectors, payloads, strict=True)
+        for i, (point_id, vector, payload) in enumerate(rows):
+            point_vector: list[float] | dict[str, Vector]
+            if self.hybrid_enabled:
+                named_vectors: dict[str, Vector] = {DENSE_VECTOR_NAME: vector}
+                if sparse_vectors is not None:
+                    named_vectors[SPARSE_VECTOR_NAME] = sparse_vectors[i]
+                point_vector = named_vectors
+            else:
+                point_vector = vector
+            points.append(PointStruct(id=point_id, vector=point_vector, payload=payload))
+
+        for start in range(0, len(points), batch_size):
+            await self.client.upsert(
+                collection_name=self.collection_name,
+                points=points[start:start + batch_size],
+                wait=wait,
+            )
+
+    def _build_query(
+        self,
+        query_vector: list[float],
+        top_k: int,
+        sparse_vector: SparseVector | None,
+        score_threshold: float | None,
+        search_filter: SearchFilter | None = None,
+        exact: bool = False,
+    ) -> QueryRequest:
+        """Build a dense or hybrid (dense + sparse RRF) query request."""
+        query_filter = search_filter.to_qdrant() if search_filter is not None else None
+        params = self._search_params(exact)
+        if self.hybrid_enabled and sparse_vector is not None:
+            # Filters go into each prefetch so both searches only visit matching points
+            return QueryRequest(
+                prefetch=[
+                    Prefetch(
+                        query=query_vector,
+                        using=DENSE_VECTOR_NAME,
+                        filter=query_filter,
+                        params=params,
+                        limit=top_k,
+                        score_threshold=score_threshold,
+                    ),
+                    Prefetch(
+                        query=sparse_vector,
+                        using=SPARSE_VECTOR_NAME,
+                        filter=query_filter,
+                        limit=top_k,
+                    ),
+                ],
+                query=FusionQuery(fusion=Fusion.RRF),
+                limit=top_k,
+                with_payload=SEARCH_PAYLOAD,
+            )
+        return QueryRequest(
             query=query_vector,
+            using=DENSE_VECTOR_NAME if self.hybrid_enabled else None,
+            filter=query_filter,
+            params=params,
+            limit=top_k,
+            score_threshold=score_threshold,
+            with_payload=SEARCH_PAYLOAD,
+        )
+
+    async def search(
+        self,
+        query_vector: list[float],
+        top_k: int = 5,
+        sparse_vector: SparseVector | None = None,
+        score_threshold: float | None = None,
+        search_filter: SearchFilter | None = None,
+        exact: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Search for similar vectors.
+
+        With a sparse vector on a hybrid collection, dense and lexical
+        candidates are prefetched and fused server-side with RRF, so the
+        returned scores are fused scores in [0, 1]. score_threshold only
+        applies to the dense (cosine) side. search_filter is applied inside
+        the search (indexed payload fields), not to the results. exact=True
+        bypasses HNSW and quantization (full scan; for recall measurements).
+        """
+        request = self._build_query(
+            query_vector, top_k, sparse_vector, score_threshold, search_filter, exact
+        )
+        results = await self.client.query_points(
+            collection_name=self.collection_name,
+            prefetch=request.prefetch,
+            query=request.query,
+            using=request.using,
+            query_filter=request.filter,
+            search_params=request.params,
             limit=top_k,
+            score_threshold=request.score_threshold,
+            with_payload=SEARCH_PAYLOAD,
         )
         return [{"id": r.id, "score": r.score, "payload": r.payload} for r in results.points]
 
-    def delete(self, point_ids: list[str]) -> None:
+    async def search_batch(
+        self,
+        query_vectors: list[list[float]],
+        top_k: int = 5,
+        sparse_vectors: list[SparseVector] | None = None,
+        score_threshold: float | None = None,
+        search_filters: list[SearchFilter | None] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """
+        Run several searches in one round trip (Qdrant batch query endpoint).
+
+        Returns one result list per query vector, in input order. Each query
+        behaves exactly like search() with the same arguments (search_filters
+        holds one optional filter per query vector).
+        """
+        if not query_vectors:
+            return []
+
+        requests = [
+            self._build_query(
+                query_vector,
+                top_k,
+                sparse_vectors[i] if sparse_vectors is not None else None,
+                score_threshold,
+                search_filters[i] if search_filters is not None else None,
+            )
+            for i, query_vector in enumerate(query_vectors)
+        ]
+        responses = await self.client.query_batch_points(
+            collection_name=self.collection_name,
+            requests=requests,
+        )
+        return [
+            [{"id": r.id, "score": r.score, "payload": r.payload} for r in response.points]
+            for response in responses
+        ]
+
+    async def fetch_payloads(
+        self, point_ids: list[str], fields: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        """Selected payload fields for points by ID (missing points are left out)."""
+        if not point_ids:
+            return {}
+        records = await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=fields,
+            with_vectors=False,
+        )
+        return {str(r.id): r.payload or {} for r in records}
+
+    async def fetch_vectors(self, point_ids: list[str]) -> dict[str, list[float]]:
+        """Stored dense vectors for points by ID (missing points are left out)."""
+        if not point_ids:
+            return {}
+        records = await self.client.retrieve(
+            collection_name=self.collection_name,
+            ids=point_ids,
+            with_payload=False,
+            with_vectors=[DENSE_VECTOR_NAME] if self.hybrid_enabled else True,
+        )
+        # Dense vectors are flat float lists, unnamed in legacy collections
+        return {
+            str(r.id): cast(
+                list[float],
+                r.vector[DENSE_VECTOR_NAME] if isinstance(r.vector, dict) else r.vector,
+            )
+            for r in records
+        }
+
+    async def delete(self, point_ids: list[str]) -> None:
         """Delete vectors by ID."""
         from qdrant_client.models import PointIdsList
-        self.client.delete(
+        await self.client.delete(
             collection_name=self.collection_name,
-            points_selector=PointIdsList(points=point_ids),
+            points_selector=PointIdsList(points=list(point_ids)),
         )
 
+    async def delete_document(self, document_id: str) -> None:
+        """Delete every point belonging to a document (by payload, not ids)."""
+        await self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(
+                filter=Filter(
+                    must=[FieldCondition(key="document_id", match=MatchValue(value=document_id))]
+                )
+            ),
+        )
+
+
+# Shared instance - one async connection pool per worker
+_vector_store: VectorStore | None = None
+_vector_store_lock = asyncio.Lock()
+
 
+async def get_vector_store() -> VectorStore:
+    """
+    Get the shared vector store, ensuring the collection on first use.
 
+    Concurrent first requests wait on one initialization; if it fails the
+    error propagates and the next call tries again.
+    """
+    global _vector_store
+    if _vector_store is not None:
+        return _vector_store
+    async with _vector_store_lock:
+        if _vector_store is None:
+            store = VectorStore()
+            try:
+                await store._ensure_collection()
+            except Exception:
+                await store.client.close()
+                raise
+            _vector_store = store
+    return _vector_store
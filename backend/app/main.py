@@ -5,6 +5,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import auth, documents, query
 from app.config import settings
+from app.services.ingestion import get_ingestion_pool
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -34,6 +35,18 @@ app.include_router(documents.router, prefix="/api/v1")
 app.include_router(query.router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+async def start_ingestion_workers() -> None:
+    """Start the background ingestion workers."""
+    get_ingestion_pool().start()
+
+
+@app.on_event("shutdown")
+async def stop_ingestion_workers() -> None:
+    """Stop the ingestion workers (running jobs are requeued)."""
+    await get_ingestion_pool().stop()
+
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     """Health check endpoint."""
@@ -5,7 +5,7 @@ from datetime import datetime
 
 from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
 class Base(DeclarativeBase):
@@ -38,6 +38,7 @@ class Document(Base):
     filename = Column(String(255), nullable=False)
     file_size_bytes = Column(Integer, nullable=False)
     file_type = Column(String(10), nullable=False)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the file, hex
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     processing_status = Column(String(20), nullable=False, default="pending")
@@ -46,6 +47,9 @@ class Document(Base):
 
     uploader = relationship("User", back_populates="documents")
     chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan")
+    ingestion_jobs = relationship(
+        "IngestionJob", back_populates="document", cascade="all, delete-orphan"
+    )
 
 
 class DocumentChunk(Base):
@@ -57,14 +61,45 @@ class DocumentChunk(Base):
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
     page_number = Column(Integer)
+    start_char = Column(Integer)  # Span in the extracted document text, end exclusive
+    end_char = Column(Integer)
     text_content = Column(Text, nullable=False)
     token_count = Column(Integer, nullable=False)
     embedding_id = Column(String(255), nullable=False)
+    embedding_key = Column(String(64), index=True)  # Model, backend + text hash (vector reuse)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     document = relationship("Document", back_populates="chunks")
 
 
+class IngestionJob(Base):
+    """Background ingestion job - the persistent queue behind document uploads."""
+
+    __tablename__ = "ingestion_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        index=True,
+    )
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    stage: Mapped[str | None] = mapped_column(String(50))
+    progress: Mapped[float] = mapped_column(Float, default=0.0)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer)
+    error: Mapped[str | None] = mapped_column(Text)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # Retry backoff
+    # Set while running, renewed by a heartbeat
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime)
+    created_at: Mapped[datetime | None] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    document = relationship("Document", back_populates="ingestion_jobs")
+
+
 class Query(Base):
     """Query model."""
 
@@ -19,6 +19,7 @@ class ProcessingStatus(str, Enum):
     """Document processing status."""
 
     PENDING = "pending"
+    PROCESSING = "processing"
     PROCESSED = "processed"
     FAILED = "failed"
 
@@ -85,7 +86,24 @@ class DocumentUploadResponse(BaseModel):
     """Document upload response schema."""
 
     document_id: UUID
-    status: str = "processing"
+    status: str = "pending"
+    job_id: UUID | None = None
+    duplicate: bool = False  # Same file already uploaded - document_id is the existing one
+
+
+class IngestionStatusResponse(BaseModel):
+    """Ingestion progress for a document (polled after upload)."""
+
+    document_id: UUID
+    processing_status: ProcessingStatus
+    job_status: str | None = None  # queued, running, succeeded or failed
+    stage: str | None = None
+    progress: float = 0.0  # 0-1
+    attempts: int = 0
+    max_attempts: int = 0
+    error: str | None = None
+    next_attempt_at: datetime | None = None
+    updated_at: datetime | None = None
 
 
 # Query schemas
@@ -95,6 +113,12 @@ class QueryRequest(BaseModel):
     query: str = Field(..., max_length=500, min_length=1)
     max_chunks: int = Field(default=5, ge=1, le=10)
 
+    # Optional scope - applied inside the vector search
+    document_ids: list[UUID] | None = None
+    file_types: list[str] | None = None  # e.g. ["pdf", "docx"]
+    uploaded_after: datetime | None = None
+    uploaded_before: datetime | None = None
+
 
 class SourceResponse(BaseModel):
     """Source response schema."""
@@ -104,6 +128,8 @@ class SourceResponse(BaseModel):
     page_number: int | None
     excerpt: str
     similarity_score: float
+    start_char: int | None = None  # Chunk span in the extracted document text
+    end_char: int | None = None
 
 
 class QueryResponse(BaseModel):
@@ -115,6 +141,87 @@ class QueryResponse(BaseModel):
     processing_time_ms: int
 
 
+class BatchQueryRequest(BaseModel):
+    """Batch query request schema."""
+
+    queries: list[QueryRequest] = Field(..., min_length=1)
+    retrieval_only: bool = False
+
+
+class BatchQueryResult(BaseModel):
+    """Result for one query in a batch (answer and confidence unset when retrieval_only)."""
+
+    query: str
+    answer: str | None = None
+    confidence: ConfidenceLevel | None = None
+    sources: list[SourceResponse]
+    error: str | None = None  # Set when this query's answer could not be generated
+
+
+class BatchQueryResponse(BaseModel):
+    """Batch query response schema."""
+
+    results: list[BatchQueryResult]
+    processing_time_ms: int
+
+
+class QueryStreamSources(BaseModel):
+    """First event of a streamed answer: the sources the answer is grounded on."""
+
+    sources: list[SourceResponse]
+    avg_similarity: float
+
+
+class QueryStreamToken(BaseModel):
+    """Incremental answer text."""
+
+    text: str
+
+
+class QueryStreamDone(BaseModel):
+    """Final event of a streamed answer."""
+
+    confidence: ConfidenceLevel
+    processing_time_ms: int
+
+
+class QueryStreamError(BaseModel):
+    """Final event of a streamed answer whose generation failed partway."""
+
+    error: str
+    processing_time_ms: int
+
+
+class AnswerCacheStats(BaseModel):
+    """Answer cache statistics schema."""
+
+    enabled: bool
+    hits: int = 0
+    misses: int = 0
+    hit_rate: float = 0.0
+    size: int = 0
+    corpus_version: int = 0
+
+
+class LRUCacheStats(BaseModel):
+    """LRU cache statistics schema."""
+
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int
+    max_size: int
+
+
+class QueryCacheStatsResponse(BaseModel):
+    """Query pipeline cache statistics schema."""
+
+    answers: AnswerCacheStats
+    expansions: LRUCacheStats
+    embeddings: LRUCacheStats
+    rerank_scores: LRUCacheStats
+
+
 class QueryHistoryItem(BaseModel):
     """Query history item schema."""
 
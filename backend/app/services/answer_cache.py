@@ -0,0 +1,330 @@
+"""Semantic answer cache keyed by query embedding and corpus version."""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from app.config import settings
+from app.models.schemas import QueryResponse
+from app.utils.cache import LRUCache
+
+
+@dataclass
+class CachedAnswer:
+    """A previously generated response and the chunks it cited."""
+
+    response: QueryResponse
+    source_chunks: list[tuple[str, float]]  # (chunk_id, similarity) for QuerySource rows
+
+
+@dataclass
+class _Entry:
+    """Stored cache entry (in-memory backend)."""
+
+    embedding: npt.NDArray[np.float32]
+    max_chunks: int
+    corpus_version: int
+    answer: CachedAnswer
+
+
+def _unit(embedding: list[float]) -> npt.NDArray[np.float32]:
+    """Normalize an embedding so a dot product is cosine similarity."""
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache(ABC):
+    """
+    Base class for answer cache backends.
+
+    A lookup hits when a stored query for the same max_chunks and the current
+    corpus version has cosine similarity >= the configured threshold.
+    Uploading or deleting a document bumps the corpus version, which makes
+    every older entry unreachable.
+    """
+
+    def __init__(self, similarity_threshold: float) -> None:
+        """Initialize hit/miss counters."""
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def corpus_version(self) -> int:
+        """Current corpus version."""
+
+    @abstractmethod
+    def bump_corpus_version(self) -> int:
+        """Invalidate all entries by moving to a new corpus version."""
+
+    @abstractmethod
+    def _find(self, embedding: npt.NDArray[np.float32], max_chunks: int) -> CachedAnswer | None:
+        """Return the closest entry above the threshold, if any."""
+
+    @abstractmethod
+    def _store(
+        self, embedding: npt.NDArray[np.float32], max_chunks: int, answer: CachedAnswer
+    ) -> None:
+        """Store an entry for the current corpus version."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored entries."""
+
+    def lookup(self, embedding: list[float], max_chunks: int) -> CachedAnswer | None:
+        """Find a cached answer for a semantically equivalent query."""
+        answer = self._find(_unit(embedding), max_chunks)
+        if answer is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return answer
+
+    def store(self, embedding: list[float], max_chunks: int, answer: CachedAnswer) -> None:
+        """Cache an answer for this query embedding."""
+        self._store(_unit(embedding), max_chunks, answer)
+
+    def stats(self) -> dict[str, float]:
+        """Hit/miss counters, size and corpus version."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self),
+            "corpus_version": self.corpus_version(),
+        }
+
+
+class InMemoryAnswerCache(AnswerCache):
+    """Process-local backend (LRU + TTL). Each worker invalidates independently."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity_threshold: float) -> None:
+        """Initialize in-memory entry store."""
+        super().__init__(similarity_threshold)
+        self._entries: LRUCache[str, _Entry] = LRUCache(max_entries, ttl_seconds)
+        self._version = 0
+
+    def corpus_version(self) -> int:
+        """Current corpus version."""
+        return self._version
+
+    def bump_corpus_version(self) -> int:
+        """Invalidate all entries (they are unreachable, so drop them too)."""
+        self._version += 1
+        self._entries.clear()
+        return self._version
+
+    def _find(self, embedding: npt.NDArray[np.float32], max_chunks: int) -> CachedAnswer | None:
+        candidates = [
+            (key, entry)
+            for key, entry in self._entries.items()
+            if entry.max_chunks == max_chunks and entry.corpus_version == self._version
+        ]
+        if not candidates:
+            return None
+
+        matrix = np.stack([entry.embedding for _, entry in candidates])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        key, entry = candidates[best]
+        self._entries.touch(key)
+        return entry.answer
+
+    def _store(
+        self, embedding: npt.NDArray[np.float32], max_chunks: int, answer: CachedAnswer
+    ) -> None:
+        self._entries.set(
+            uuid.uuid4().hex,
+            _Entry(
+                embedding=embedding,
+                max_chunks=max_chunks,
+                corpus_version=self._version,
+                answer=answer,
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteAnswerCache(AnswerCache):
+    """
+    Local SQLite backend shared by all workers on a host.
+
+    The corpus version lives in the same file, so an upload handled by one
+    worker invalidates the cache for every worker.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        ttl_seconds: float,
+        similarity_threshold: float,
+    ) -> None:
+        """Open (or create) the cache database."""
+        super().__init__(similarity_threshold)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('corpus_version', 0)"
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS entries (
+                    id TEXT PRIMARY KEY,
+                    corpus_version INTEGER NOT NULL,
+                    max_chunks INTEGER NOT NULL,
+                    embedding BLOB NOT NULL,
+                    answer TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_entries_lookup "
+                "ON entries (corpus_version, max_chunks)"
+            )
+
+    def corpus_version(self) -> int:
+        """Current corpus version."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'corpus_version'"
+            ).fetchone()
+        return int(row[0])
+
+    def bump_corpus_version(self) -> int:
+        """Invalidate all entries and drop the stale rows."""
+        with self._lock:
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'corpus_version'")
+            self._conn.execute(
+                "DELETE FROM entries WHERE corpus_version < "
+                "(SELECT value FROM meta WHERE key = 'corpus_version')"
+            )
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'corpus_version'"
+            ).fetchone()
+        return int(row[0])
+
+    def _find(self, embedding: npt.NDArray[np.float32], max_chunks: int) -> CachedAnswer | None:
+        version = self.corpus_version()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, embedding, answer FROM entries "
+                "WHERE corpus_version = ? AND max_chunks = ? AND created_at >= ?",
+                (version, max_chunks, time.time() - self.ttl_seconds),
+            ).fetchall()
+        if not rows:
+            return None
+
+        matrix = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+
+        entry_id, _, answer_json = rows[best]
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET last_used_at = ? WHERE id = ?", (time.time(), entry_id)
+            )
+        data = json.loads(answer_json)
+        return CachedAnswer(
+            response=QueryResponse.model_validate(data["response"]),
+            # JSON arrays back to (chunk_id, score) tuples
+            source_chunks=[tuple(pair) for pair in data["source_chunks"]],
+        )
+
+    def _store(
+        self, embedding: npt.NDArray[np.float32], max_chunks: int, answer: CachedAnswer
+    ) -> None:
+        version = self.corpus_version()
+        now = time.time()
+        answer_json = json.dumps(
+            {
+                "response": answer.response.model_dump(mode="json"),
+                "source_chunks": answer.source_chunks,
+            }
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    uuid.uuid4().hex,
+                    version,
+                    max_chunks,
+                    embedding.astype(np.float32).tobytes(),
+                    answer_json,
+                    now,
+                    now,
+                ),
+            )
+            # TTL expiry, then LRU eviction beyond max_entries
+            self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                "DELETE FROM entries WHERE id IN ("
+                "SELECT id FROM entries ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+
+
+# Lazy-loaded cache backend (None when disabled)
+_answer_cache: AnswerCache | None = None
+
+
+def get_answer_cache() -> AnswerCache | None:
+    """Get the configured answer cache backend (singleton), or None if disabled."""
+    global _answer_cache
+    if _answer_cache is None:
+        backend = settings.ANSWER_CACHE_BACKEND
+        if backend == "memory":
+            _answer_cache = InMemoryAnswerCache(
+                max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+                similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+            )
+        elif backend == "sqlite":
+            _answer_cache = SQLiteAnswerCache(
+                path=settings.ANSWER_CACHE_PATH,
+                max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+                similarity_threshold=settings.ANSWER_CACHE_SIMILARITY,
+            )
+        elif backend != "none":
+            raise ValueError(f"Unknown answer cache backend: {backend}")
+    return _answer_cache
+
+
+def invalidate_answer_cache() -> None:
+    """Bump the corpus version after the document set changes."""
+    cache = get_answer_cache()
+    if cache is not None:
+        version = cache.bump_corpus_version()
+        print(f"[ANSWER_CACHE] Corpus version bumped to {version}")
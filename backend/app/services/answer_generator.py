@@ -1,10 +1,12 @@
 """Answer generation service."""
 
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 
-from groq import Groq
+from groq.types.chat.completion_create_params import Message
 
 from app.config import settings
+from app.core.llm import get_groq_client
 from app.models.schemas import ConfidenceLevel
 from app.services.retrieval import RetrievedChunk
 
@@ -112,6 +114,8 @@ Before responding, verify:
 ☑ Uncertainties are acknowledged
 ☑ Numbers are correctly matched to their descriptions"""
 
+NO_ANSWER_FALLBACK = "I don't have enough information to answer that."
+
 
 @dataclass
 class GeneratedAnswer:
@@ -124,8 +128,8 @@ class AnswerGenerator:
     """Generates grounded answers from retrieved chunks."""
 
     def __init__(self) -> None:
-        """Initialize answer generator with Groq client."""
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
+        """Initialize answer generator with the shared async Groq client."""
+        self.client = get_groq_client()
 
     async def generate(
         self,
@@ -133,6 +137,38 @@ class AnswerGenerator:
         chunks: list[RetrievedChunk],
     ) -> GeneratedAnswer:
         """Generate a grounded answer from retrieved chunks."""
+        response = await self.client.chat.completions.create(
+            model=settings.LLM_MODEL,
+            messages=self.build_messages(query, chunks),
+            temperature=0.15,  # Low temperature for factual accuracy
+            max_tokens=1500,
+        )
+        
+        answer = response.choices[0].message.content or NO_ANSWER_FALLBACK
+        return GeneratedAnswer(answer=answer, confidence=self.score_answer(answer, chunks))
+
+    async def stream(
+        self,
+        query: str,
+        chunks: list[RetrievedChunk],
+    ) -> AsyncIterator[str]:
+        """Generate a grounded answer, yielding text deltas as Groq produces them."""
+        stream = await self.client.chat.completions.create(
+            model=settings.LLM_MODEL,
+            messages=self.build_messages(query, chunks),
+            temperature=0.15,  # Low temperature for factual accuracy
+            max_tokens=1500,
+            stream=True,
+        )
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+    def build_messages(self, query: str, chunks: list[RetrievedChunk]) -> list[Message]:
+        """Build the system + user chat messages for a query."""
         context = self.build_context(chunks)
         
         user_message = f"""DOCUMENT EXCERPTS (ranked by relevance):
@@ -144,29 +180,21 @@ USER QUESTION: {query}
 
 Provide a grounded answer using only the excerpts above. Cite sources with [1], [2], etc."""
 
-        response = self.client.chat.completions.create(
-            model=settings.LLM_MODEL,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_message},
-            ],
-            temperature=0.15,  # Low temperature for factual accuracy
-            max_tokens=1500,
-        )
-        
-        answer = response.choices[0].message.content or "I don't have enough information to answer that."
-        
-        # Calculate confidence
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_message},
+        ]
+
+    def score_answer(self, answer: str, chunks: list[RetrievedChunk]) -> ConfidenceLevel:
+        """Calculate confidence for a finished answer."""
         avg_similarity = sum(c.similarity for c in chunks) / len(chunks) if chunks else 0
         contains_citation = "[" in answer and "]" in answer
-        confidence = self.calculate_confidence(
+        return self.calculate_confidence(
             avg_similarity=avg_similarity,
             num_chunks=len(chunks),
             answer_length=len(answer),
             contains_citation=contains_citation,
         )
-        
-        return GeneratedAnswer(answer=answer, confidence=confidence)
 
     def calculate_confidence(
         self,
@@ -0,0 +1,243 @@
+"""Local chunk text store, so Qdrant payloads only carry ids and filter fields."""
+
+import mmap
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from app.config import settings
+
+TEXTS_FILE = "texts.bin"
+INDEX_FILE = "index.sqlite3"
+
+
+def texts_file_name(generation: int) -> str:
+    """Data file for a generation (each compaction writes the next one)."""
+    return TEXTS_FILE if generation == 0 else f"texts.{generation}.bin"
+
+
+class ChunkStore:
+    """
+    Append-only, memory-mapped chunk texts keyed by chunk (point) id.
+
+    Texts are UTF-8 bytes appended to texts.bin; a SQLite index maps each
+    chunk id to its (offset, length). Reads slice the memory map, so a
+    lookup is one indexed SELECT plus a memcpy. Deleting drops index rows
+    only; compact() rewrites the live texts into a new data file and frees
+    the rest. Appends take a SQLite write lock, so several workers on a
+    host can share one store.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Open (or create) the store in a directory."""
+        self._root = Path(directory)
+        self._root.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            str(self._root / INDEX_FILE), check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.Lock()
+        self._map: mmap.mmap | None = None
+        self._map_generation = -1
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS chunks (
+                    chunk_id TEXT PRIMARY KEY,
+                    byte_offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0)")
+            self._texts_path(self._generation()).touch(exist_ok=True)
+
+    def put_many(self, items: list[tuple[str, str]]) -> None:
+        """Store (chunk_id, text) pairs; re-putting an id points it at the new text."""
+        if not items:
+            return
+
+        encoded = [(chunk_id, text.encode("utf-8")) for chunk_id, text in items]
+        with self._lock:
+            # BEGIN IMMEDIATE serializes appends across processes sharing the store
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                with open(self._texts_path(self._generation()), "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    rows = []
+                    for chunk_id, data in encoded:
+                        rows.append((chunk_id, offset, len(data)))
+                        offset += len(data)
+                    f.write(b"".join(data for _, data in encoded))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO chunks (chunk_id, byte_offset, length) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_many(self, chunk_ids: list[str]) -> dict[str, str]:
+        """Texts for the given ids; ids not in the store are left out."""
+        if not chunk_ids:
+            return {}
+
+        with self._lock:
+            while True:
+                generation, rows = self._lookup(chunk_ids)
+                if not rows:
+                    return {}
+
+                end = max(offset + length for _, offset, length in rows)
+                if end == 0:
+                    return {chunk_id: "" for chunk_id, _, _ in rows}
+                try:
+                    data = self._mapped(generation, end)
+                except FileNotFoundError:
+                    # Another process compacted the store after our read; look up again
+                    continue
+                return {
+                    chunk_id: data[offset:offset + length].decode("utf-8")
+                    for chunk_id, offset, length in rows
+                }
+
+    def delete(self, chunk_ids: list[str]) -> int:
+        """Remove ids from the index; returns how many were present."""
+        if not chunk_ids:
+            return 0
+        with self._lock:
+            cursor = self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?", [(chunk_id,) for chunk_id in chunk_ids]
+            )
+            return cursor.rowcount
+
+    def compact(self) -> tuple[int, int]:
+        """
+        Rewrite the live texts into a new data file; returns (bytes before, after).
+
+        Live texts are copied without blocking appends, then texts appended
+        meanwhile are copied under the write lock, the index is repointed
+        and the new file becomes current in one transaction. Other processes
+        sharing the store switch to it on their next lookup.
+        """
+        with self._lock:
+            generation = self._generation()
+            rows = self._conn.execute(
+                "SELECT chunk_id, byte_offset, length FROM chunks ORDER BY byte_offset"
+            ).fetchall()
+        old_path = self._texts_path(generation)
+        new_path = self._texts_path(generation + 1)
+
+        try:
+            with open(old_path, "rb") as src, open(new_path, "wb") as dst:
+                moved = {}  # (chunk_id, old offset) -> new offset
+                for chunk_id, offset, length in rows:
+                    src.seek(offset)
+                    moved[(chunk_id, offset)] = dst.tell()
+                    dst.write(src.read(length))
+
+                with self._lock:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        if self._generation() != generation:
+                            raise RuntimeError("Chunk store was compacted by another process")
+                        updates = []
+                        for chunk_id, offset, length in self._conn.execute(
+                            "SELECT chunk_id, byte_offset, length FROM chunks"
+                        ).fetchall():
+                            new_offset = moved.get((chunk_id, offset))
+                            if new_offset is None:
+                                # Appended (or re-put) while the live texts were copied
+                                src.seek(offset)
+                                new_offset = dst.tell()
+                                dst.write(src.read(length))
+                            updates.append((new_offset, chunk_id))
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                        self._conn.executemany(
+                            "UPDATE chunks SET byte_offset = ? WHERE chunk_id = ?", updates
+                        )
+                        self._conn.execute(
+                            "UPDATE meta SET value = ? WHERE key = 'generation'", (generation + 1,)
+                        )
+                        self._conn.execute("COMMIT")
+                    except BaseException:
+                        self._conn.execute("ROLLBACK")
+                        raise
+                    size_after = dst.tell()
+        except BaseException:
+            new_path.unlink(missing_ok=True)
+            raise
+
+        # Open maps (here or in other processes) keep the old bytes readable until closed
+        size_before = old_path.stat().st_size
+        old_path.unlink()
+        return size_before, size_after
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0])
+
+    def _texts_path(self, generation: int) -> Path:
+        """Path of a generation's data file."""
+        return self._root / texts_file_name(generation)
+
+    def _generation(self) -> int:
+        """Current data file generation (bumped by compact)."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+        return int(row[0])
+
+    def _lookup(self, chunk_ids: list[str]) -> tuple[int, list[tuple[str, int, int]]]:
+        """Generation and index rows for ids, read from one consistent snapshot."""
+        rows = []
+        self._conn.execute("BEGIN")
+        try:
+            generation = self._generation()
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows.extend(
+                    self._conn.execute(
+                        "SELECT chunk_id, byte_offset, length FROM chunks "
+                        f"WHERE chunk_id IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                )
+        finally:
+            self._conn.execute("COMMIT")
+        return generation, rows
+
+    def _mapped(self, generation: int, min_size: int) -> mmap.mmap:
+        """Memory map of a generation covering min_size bytes (remapped after appends)."""
+        if (
+            self._map is None
+            or self._map_generation != generation
+            or len(self._map) < min_size
+        ):
+            with open(self._texts_path(generation), "rb") as f:
+                new_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map is not None:
+                self._map.close()
+            self._map = new_map
+            self._map_generation = generation
+        return self._map
+
+
+# Lazy-loaded shared store
+_chunk_store: ChunkStore | None = None
+
+
+def get_chunk_store() -> ChunkStore:
+    """Get the chunk text store (singleton)."""
+    global _chunk_store
+    if _chunk_store is None:
+        _chunk_store = ChunkStore(settings.CHUNK_STORE_DIR)
+    return _chunk_store
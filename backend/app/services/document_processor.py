@@ -1,17 +1,37 @@
 """Document processing service."""
 
+import bisect
 import re
 import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
 from pathlib import Path
 
-import pdfplumber
 from docx import Document as DocxDocument
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from transformers import PreTrainedTokenizerBase
 
 from app.config import settings
-from app.core.vector_store import VectorStore
+from app.core.database import run_db
+from app.core.inference import run_ingestion_task
+from app.core.vector_store import VectorStore, payload_timestamp
 from app.models.database import Document, DocumentChunk
-from app.services.embeddings import embed_texts
+from app.services.chunk_store import get_chunk_store
+from app.services.embeddings import (
+    embed_texts_async,
+    embedding_key,
+    embedding_token_limit,
+    get_embedding_tokenizer,
+)
+from app.services.lexical import (
+    build_document_sparse_vector,
+    cache_chunk_token_ids,
+    invalidate_chunk_token_ids,
+)
+from app.services.pdf_extraction import extract_pdf_text, extraction_processes
+from app.services.reranker import invalidate_rerank_scores
 
 
 # Common abbreviations that shouldn't trigger sentence splits
@@ -20,51 +40,96 @@ ABBREVIATIONS = frozenset([
     "corp", "co", "no", "vol", "pg", "pp", "fig", "al", "ed", "rev",
 ])
 
+# Candidate sentence ends; is_sentence_boundary decides which are real
+SENTENCE_END_RE = re.compile(r"[.!?]")
+
 
 def is_sentence_boundary(text: str, pos: int) -> bool:
-    """Check if position after punctuation is a real sentence boundary."""
-    if pos >= len(text):
+    """
+    Check if position after punctuation is a real sentence boundary.
+
+    Works on indexes only (no slicing), so each call costs the length of the
+    surrounding whitespace and word, not the rest of the document.
+    """
+    length = len(text)
+    if pos >= length:
         return True
-    
+
     # Must be followed by whitespace then uppercase or digit
-    remaining = text[pos:]
-    if not remaining or not remaining[0].isspace():
+    if not text[pos].isspace():
         return False
-    
+
     # Find next non-space character
-    next_char_idx = 0
-    for i, c in enumerate(remaining):
-        if not c.isspace():
-            next_char_idx = i
-            break
-    else:
+    next_pos = pos + 1
+    while next_pos < length and text[next_pos].isspace():
+        next_pos += 1
+    if next_pos == length:
         return False
-    
-    next_char = remaining[next_char_idx]
+
+    next_char = text[next_pos]
     if not (next_char.isupper() or next_char.isdigit() or next_char in '"\'(['):
         return False
-    
+
     # Check if preceded by abbreviation
     # Look backwards for the word before the punctuation
     word_end = pos - 1  # Position of the punctuation
     if word_end < 0:
         return True
-    
+
     word_start = word_end
     while word_start > 0 and text[word_start - 1].isalpha():
         word_start -= 1
-    
+
     word = text[word_start:word_end].lower()
     if word in ABBREVIATIONS:
         return False
-    
+
     # Single capital letter followed by period (like initials "J.")
     if len(word) == 1 and word.isalpha():
         return False
-    
+
     return True
 
 
+@dataclass
+class TextChunk:
+    """A chunk and where it came from in the extracted document text."""
+
+    text: str
+    start_char: int  # Offsets in the extracted text, end exclusive
+    end_char: int
+    token_count: int | None = None  # Embedding tokenizer tokens, without special tokens
+
+
+class NormalizedText:
+    """
+    Text with whitespace runs collapsed to single spaces, mapping positions back to the source.
+
+    Only runs longer than one character shift positions, so the map stores
+    one entry per such run and lookups are a binary search.
+    """
+
+    def __init__(self, source: str) -> None:
+        """Normalize source and record where it shrank."""
+        stripped = source.strip()
+        self._lead = len(source) - len(source.lstrip())
+        self.text = re.sub(r"\s+", " ", stripped)
+
+        # Normalized position of each collapsed run's space, and chars removed up to it
+        self._positions: list[int] = []
+        self._removed: list[int] = []
+        removed = 0
+        for match in re.finditer(r"\s{2,}", stripped):
+            self._positions.append(match.start() - removed)
+            removed += match.end() - match.start() - 1
+            self._removed.append(removed)
+
+    def to_source(self, position: int) -> int:
+        """Offset in the source text of a position in the normalized text."""
+        run = bisect.bisect_left(self._positions, position) - 1
+        return self._lead + position + (self._removed[run] if run >= 0 else 0)
+
+
 class DocumentProcessor:
     """Handles document text extraction and chunking."""
 
@@ -73,18 +138,144 @@ class DocumentProcessor:
         db: Session,
         document: Document,
         vector_store: VectorStore,
+        on_progress: Callable[[float, str], Awaitable[None]] | None = None,
     ) -> None:
-        """Initialize document processor with dependencies."""
+        """Initialize document processor with dependencies and an optional progress callback."""
         self.db = db
         self.document = document
         self.vector_store = vector_store
+        self.on_progress = on_progress
+
+    async def _report(self, progress: float, stage: str) -> None:
+        """Tell the caller how far along we are (0-1)."""
+        if self.on_progress is not None:
+            await self.on_progress(progress, stage)
 
     async def process_document(self) -> None:
         """Process uploaded document - extract text and create chunks."""
         file_path = self.document.storage_path
         file_ext = Path(file_path).suffix.lower()
 
-        # Extract text based on file type
+        # Parsing and chunking are blocking; keep them off the event loop
+        await self._report(0.0, "extracting")
+        page_breaks, text_chunks = await run_ingestion_task(self._extract_and_chunk, file_path)
+
+        if not text_chunks:
+            return
+        chunks = [chunk.text for chunk in text_chunks]
+
+        # Chunks already embedded (e.g. in an earlier version of this file) reuse their vectors
+        embedding_keys = [embedding_key(chunk) for chunk in chunks]
+        vectors_by_key = await self._stored_embeddings(set(embedding_keys))
+        new_texts = {
+            key: chunk
+            for key, chunk in zip(embedding_keys, chunks, strict=True)
+            if key not in vectors_by_key
+        }
+        reused = len(chunks) - len(new_texts)
+        print(f"[PROCESSOR] Reusing {reused} of {len(chunks)} chunk embeddings")
+
+        # Embed in slices so query-time model calls can run in between
+        new_keys = list(new_texts)
+        batch_size = settings.INGESTION_EMBED_BATCH_SIZE
+        for start in range(0, len(new_keys), batch_size):
+            await self._report(0.2 + 0.6 * start / len(new_keys), "embedding")
+            batch_keys = new_keys[start:start + batch_size]
+            batch_vectors = await embed_texts_async([new_texts[key] for key in batch_keys])
+            vectors_by_key.update(zip(batch_keys, batch_vectors, strict=True))
+        embeddings = [vectors_by_key[key] for key in embedding_keys]
+        await self._report(0.8, "storing")
+
+        # Texts go to the local chunk store first, so no point ever lacks its text
+        chunk_ids = [uuid.uuid4() for _ in chunks]
+        embedding_ids = [str(chunk_id) for chunk_id in chunk_ids]
+        chunk_texts = list(zip(embedding_ids, chunks, strict=True))
+        await run_in_threadpool(get_chunk_store().put_many, chunk_texts)
+
+        chunk_rows = []
+        payloads = []
+        for i, (chunk_id, chunk) in enumerate(zip(chunk_ids, text_chunks, strict=True)):
+            # Page where the chunk starts in the extracted text
+            page_number = self._get_page_for_position(chunk.start_char, page_breaks)
+
+            chunk_rows.append(
+                {
+                    "id": chunk_id,
+                    "document_id": self.document.id,
+                    "chunk_index": i,
+                    "page_number": page_number,
+                    "start_char": chunk.start_char,
+                    "end_char": chunk.end_char,
+                    "text_content": chunk.text,
+                    "token_count": chunk.token_count,  # Embedding tokenizer tokens
+                    "embedding_id": str(chunk_id),
+                    "embedding_key": embedding_keys[i],
+                }
+            )
+            # Qdrant payload has no text (see chunk store)
+            payloads.append(
+                {
+                    "document_id": str(self.document.id),
+                    "document_name": self.document.filename,
+                    "file_type": self.document.file_type,
+                    "uploaded_at": payload_timestamp(self.document.uploaded_at),
+                    "chunk_index": i,
+                    "page_number": page_number,
+                    "start_char": chunk.start_char,
+                    "end_char": chunk.end_char,
+                }
+            )
+
+        # Update document with page count if PDF
+        if file_ext == ".pdf" and page_breaks:
+            self.document.num_pages = len(page_breaks)
+
+        # Postgres rows go in with one bulk INSERT but are only committed once
+        # Qdrant has every point; any failure undoes both sides
+        try:
+            await run_db(self.db.execute, insert(DocumentChunk), chunk_rows)
+            await self.vector_store.upsert_many(
+                point_ids=embedding_ids,
+                vectors=embeddings,
+                payloads=payloads,
+                sparse_vectors=[build_document_sparse_vector(chunk) for chunk in chunks],
+            )
+            await run_db(self.db.commit)
+        except BaseException:
+            # Also on cancellation (worker shutdown), so a retry starts clean
+            await run_db(self.db.rollback)
+            await self._discard_chunks(embedding_ids)
+            raise
+
+        # Collections without sparse vectors score BM25 in-process; tokenize once here
+        if not self.vector_store.hybrid_enabled:
+            for embedding_id, chunk_text in zip(embedding_ids, chunks, strict=True):
+                cache_chunk_token_ids(embedding_id, chunk_text)
+
+    async def _stored_embeddings(self, keys: set[str]) -> dict[str, list[float]]:
+        """Vectors already in Qdrant for these embedding keys (any document)."""
+        point_ids = await run_db(self._stored_point_ids, list(keys))
+        vectors = await self.vector_store.fetch_vectors(list(point_ids.values()))
+        return {
+            key: vectors[point_id] for key, point_id in point_ids.items() if point_id in vectors
+        }
+
+    def _stored_point_ids(self, keys: list[str]) -> dict[str, str]:
+        """One existing point id per embedding key that has chunk rows."""
+        point_ids: dict[str, str] = {}
+        for start in range(0, len(keys), 1000):
+            rows = (
+                self.db.query(DocumentChunk.embedding_key, DocumentChunk.embedding_id)
+                .filter(DocumentChunk.embedding_key.in_(keys[start:start + 1000]))
+                .all()
+            )
+            for key, point_id in rows:
+                point_ids.setdefault(key, point_id)
+        return point_ids
+
+    def _extract_and_chunk(self, file_path: str) -> tuple[list[int], list[TextChunk]]:
+        """Extract text based on file type and split it into chunks with their spans."""
+        file_ext = Path(file_path).suffix.lower()
         if file_ext == ".pdf":
             text, page_breaks = self.extract_text_from_pdf(file_path)
         elif file_ext == ".docx":
@@ -96,186 +287,84 @@ class DocumentProcessor:
         else:
             raise ValueError(f"Unsupported file type: {file_ext}")
 
-        # Chunk the text using sentence-aware chunking
-        chunks = self.chunk_text_by_sentences(
-            text, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP
-        )
-
-        if not chunks:
-            return
-
-        # Generate embeddings for all chunks at once (batched)
-        embeddings = embed_texts(chunks)
-
-        # Store chunks in DB and vector store
-        for i, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)):
-            chunk_id = uuid.uuid4()
-            embedding_id = str(chunk_id)
-
-            # Determine page number for this chunk
-            page_number = self._get_page_for_position(i * (settings.CHUNK_SIZE - settings.CHUNK_OVERLAP), page_breaks)
-
-            # Store in PostgreSQL
-            db_chunk = DocumentChunk(
-                id=chunk_id,
-                document_id=self.document.id,
-                chunk_index=i,
-                page_number=page_number,
-                text_content=chunk_text,
-                token_count=len(chunk_text.split()),  # Approximate token count
-                embedding_id=embedding_id,
+        tokenizer = get_embedding_tokenizer()
+        window = embedding_token_limit()
+        if settings.CHUNKING_MODE == "tokens":
+            # Sized by the model's own tokenizer to fill (not overflow) its window
+            max_tokens = min(settings.CHUNK_MAX_TOKENS or window, window)
+            chunks = self.chunk_text_by_tokens(
+                text, tokenizer, max_tokens, settings.CHUNK_OVERLAP_TOKENS
             )
-            self.db.add(db_chunk)
-
-            # Store in Qdrant
-            self.vector_store.upsert(
-                point_id=embedding_id,
-                vector=embedding,
-                payload={
-                    "document_id": str(self.document.id),
-                    "document_name": self.document.filename,
-                    "chunk_index": i,
-                    "page_number": page_number,
-                    "text_content": chunk_text,
-                },
+        else:
+            # Chunk the text using sentence-aware chunking
+            chunks = self.chunk_text_with_spans(
+                text, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP
             )
+            if chunks:
+                encodings = tokenizer([chunk.text for chunk in chunks], add_special_tokens=False)
+                for chunk, ids in zip(chunks, encodings["input_ids"], strict=True):
+                    chunk.token_count = len(ids)
 
-        # Update document with page count if PDF
-        if file_ext == ".pdf" and page_breaks:
-            self.document.num_pages = len(page_breaks) + 1
+        truncated = sum(
+            1 for chunk in chunks if chunk.token_count is not None and chunk.token_count > window
+        )
+        if truncated:
+            print(
+                f"[PROCESSOR] {truncated} of {len(chunks)} chunks exceed "
+                f"the {window}-token embedding window"
+            )
+        return page_breaks, chunks
+
+    async def discard_existing_chunks(self) -> None:
+        """Remove chunks left by an earlier, interrupted attempt at this document."""
+        embedding_ids = await run_db(self._existing_embedding_ids)
+        # By payload, so points written before a crash (without committed rows) go too
+        await self.vector_store.delete_document(str(self.document.id))
+        if embedding_ids:
+            invalidate_rerank_scores(embedding_ids)
+            invalidate_chunk_token_ids(embedding_ids)
+            await run_in_threadpool(get_chunk_store().delete, embedding_ids)
+            await run_db(self._delete_chunk_rows)
+
+    def _existing_embedding_ids(self) -> list[str]:
+        """Point ids of the document's committed chunk rows."""
+        rows = (
+            self.db.query(DocumentChunk.embedding_id)
+            .filter(DocumentChunk.document_id == self.document.id)
+            .all()
+        )
+        return [embedding_id for (embedding_id,) in rows]
 
+    def _delete_chunk_rows(self) -> None:
+        """Delete the document's chunk rows and commit."""
+        self.db.query(DocumentChunk).filter(
+            DocumentChunk.document_id == self.document.id
+        ).delete(synchronize_session=False)
         self.db.commit()
 
+    async def _discard_chunks(self, embedding_ids: list[str]) -> None:
+        """Undo a failed ingestion: remove any written points and stored texts."""
+        try:
+            await self.vector_store.delete(embedding_ids)
+        except Exception as e:
+            print(f"[PROCESSOR] Failed to remove {len(embedding_ids)} points after error: {e}")
+        await run_in_threadpool(get_chunk_store().delete, embedding_ids)
+
     def extract_text_from_pdf(self, file_path: str) -> tuple[str, list[int]]:
         """
         Extract text from PDF file using pdfplumber.
 
         Handles both regular text and tables, converting tables to readable
-        markdown-style format for better semantic understanding.
+        markdown-style format for better semantic understanding. Large PDFs
+        are split into page ranges across PDF_EXTRACTION_PROCESSES workers.
 
         Returns (full_text, page_break_positions).
         """
-        text_parts = []
-        page_breaks = []
-        current_pos = 0
-
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = self._extract_page_content(page)
-                text_parts.append(page_text)
-                current_pos += len(page_text)
-                page_breaks.append(current_pos)
-
-        return "\n\n".join(text_parts), page_breaks
-
-    def _extract_page_content(self, page) -> str:
-        """
-        Extract content from a single PDF page, handling tables specially.
-
-        Strategy:
-        1. Detect tables on the page
-        2. Extract tables as structured text
-        3. Extract remaining text (outside tables)
-        4. Combine in reading order
-        """
-        tables = page.find_tables()
-
-        if not tables:
-            # No tables - just extract text normally
-            text = page.extract_text() or ""
-            return text.strip()
-
-        # Get table bounding boxes to exclude from text extraction
-        table_bboxes = [table.bbox for table in tables]
-
-        # Extract text outside tables
-        # Filter out characters that fall within table regions
-        chars_outside_tables = []
-        for char in page.chars:
-            char_center_y = (char["top"] + char["bottom"]) / 2
-            char_center_x = (char["x0"] + char["x1"]) / 2
-            in_table = False
-            for bbox in table_bboxes:
-                # bbox is (x0, top, x1, bottom)
-                if (bbox[0] <= char_center_x <= bbox[2] and
-                    bbox[1] <= char_center_y <= bbox[3]):
-                    in_table = True
-                    break
-            if not in_table:
-                chars_outside_tables.append(char)
-
-        # Build text from chars outside tables (simplified approach)
-        # Group chars by approximate y position (line)
-        if chars_outside_tables:
-            # Use pdfplumber's text extraction on filtered chars
-            filtered_page = page.filter(
-                lambda obj: obj["object_type"] != "char" or any(
-                    abs(obj["x0"] - c["x0"]) < 1 and abs(obj["top"] - c["top"]) < 1
-                    for c in chars_outside_tables
-                )
-            )
-            outside_text = filtered_page.extract_text() or ""
-        else:
-            outside_text = ""
-
-        # Extract tables and convert to readable format
-        table_texts = []
-        for table in tables:
-            table_data = table.extract()
-            if table_data:
-                formatted = self._format_table(table_data)
-                if formatted:
-                    table_texts.append(formatted)
-
-        # Combine text and tables (tables after main text for simplicity)
-        # In a more sophisticated version, we'd interleave by y-position
-        parts = []
-        if outside_text.strip():
-            parts.append(outside_text.strip())
-        for tt in table_texts:
-            parts.append(tt)
-
-        return "\n\n".join(parts)
-
-    def _format_table(self, table_data: list[list]) -> str:
-        """
-        Convert table data to readable text format.
-
-        Uses a simple markdown-like format that preserves structure
-        while being easy for embeddings/LLM to understand.
-        """
-        if not table_data or not table_data[0]:
-            return ""
-
-        # Clean up cells (remove None, strip whitespace)
-        cleaned = []
-        for row in table_data:
-            cleaned_row = [
-                (cell.strip() if isinstance(cell, str) else str(cell) if cell else "")
-                for cell in row
-            ]
-            # Skip completely empty rows
-            if any(cleaned_row):
-                cleaned.append(cleaned_row)
-
-        if not cleaned:
-            return ""
-
-        # Format as pipe-separated table (markdown style)
-        lines = []
-
-        # Assume first row is header
-        header = cleaned[0]
-        lines.append("| " + " | ".join(header) + " |")
-        lines.append("|" + "|".join(["---"] * len(header)) + "|")
-
-        for row in cleaned[1:]:
-            # Pad row if needed
-            while len(row) < len(header):
-                row.append("")
-            lines.append("| " + " | ".join(row[:len(header)]) + " |")
-
-        return "\n".join(lines)
+        return extract_pdf_text(
+            file_path,
+            processes=extraction_processes(settings.PDF_EXTRACTION_PROCESSES),
+            min_parallel_pages=settings.PDF_PARALLEL_MIN_PAGES,
+        )
 
     def extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX file."""
@@ -285,39 +374,33 @@ class DocumentProcessor:
 
     def split_into_sentences(self, text: str) -> list[str]:
         """Split text into sentences using boundary detection."""
-        # Normalize whitespace first
-        text = re.sub(r"\s+", " ", text.strip())
+        normalized = NormalizedText(text)
+        return [normalized.text[start:end] for start, end in self._sentence_spans(normalized.text)]
+
+    def _sentence_spans(self, text: str) -> list[tuple[int, int]]:
+        """(start, end) of each sentence in whitespace-normalized text."""
         if not text:
             return []
 
-        sentences = []
+        spans = []
         current_start = 0
 
         # Find sentence-ending punctuation and check if it's a real boundary
-        for i, char in enumerate(text):
-            if char in ".!?":
-                if is_sentence_boundary(text, i + 1):
-                    sentence = text[current_start:i + 1].strip()
-                    if sentence:
-                        sentences.append(sentence)
-                    # Skip whitespace to find start of next sentence
-                    current_start = i + 1
-                    while current_start < len(text) and text[current_start].isspace():
-                        current_start += 1
+        for match in SENTENCE_END_RE.finditer(text):
+            end = match.end()
+            if is_sentence_boundary(text, end):
+                if end > current_start:
+                    spans.append((current_start, end))
+                # Skip whitespace to find start of next sentence
+                current_start = end
+                while current_start < len(text) and text[current_start].isspace():
+                    current_start += 1
 
         # Don't forget the last part
         if current_start < len(text):
-            remaining = text[current_start:].strip()
-            if remaining:
-                sentences.append(remaining)
+            spans.append((current_start, len(text)))
 
-        # If no splits occurred, fall back to paragraph splitting
-        if len(sentences) <= 1 and len(text) > 200:
-            paragraphs = re.split(r"\n\s*\n", text)
-            if len(paragraphs) > 1:
-                sentences = [p.strip() for p in paragraphs if p.strip()]
-
-        return sentences if sentences else [text]
+        return spans
 
     def chunk_text_by_sentences(
         self,
@@ -325,87 +408,181 @@ class DocumentProcessor:
         target_chunk_size: int = 512,
         overlap_size: int = 128,
     ) -> list[str]:
+        """Split text into overlapping chunks at sentence boundaries."""
+        chunks = self.chunk_text_with_spans(text, target_chunk_size, overlap_size)
+        return [chunk.text for chunk in chunks]
+
+    def chunk_text_with_spans(
+        self,
+        text: str,
+        target_chunk_size: int = 512,
+        overlap_size: int = 128,
+    ) -> list[TextChunk]:
         """
-        Split text into overlapping chunks at sentence boundaries.
+        Split text into overlapping chunks at sentence boundaries, with source spans.
+
+        Each chunk's start_char/end_char (end exclusive) locate it in `text`
+        as given, before whitespace normalization.
 
         Strategy:
         1. Split text into sentences
         2. Greedily combine sentences until we exceed target_chunk_size
         3. For overlap, include sentences from end of previous chunk that fit in overlap_size
         """
-        sentences = self.split_into_sentences(text)
-        if not sentences:
+        normalized = NormalizedText(text)
+        spans = self._sentence_spans(normalized.text)
+        if not spans:
             return []
 
-        # If total text is small enough, return as single chunk
-        total_len = sum(len(s) for s in sentences) + len(sentences) - 1
-        if total_len <= target_chunk_size:
-            return [" ".join(sentences)]
+        # Sentences are separated by exactly one space after normalization,
+        # so a run of sentences is one contiguous slice of the normalized text
+        lengths = [end - start for start, end in spans]
+        groups = self._group_sentences(lengths, target_chunk_size, overlap_size, separator=1)
+        return [
+            self._slice_chunk(normalized, spans[first][0], spans[last][1])
+            for first, last in groups
+        ]
 
-        chunks = []
-        current_chunk_sentences: list[str] = []
-        current_length = 0
+    def chunk_text_by_tokens(
+        self,
+        text: str,
+        tokenizer: PreTrainedTokenizerBase,
+        max_tokens: int,
+        overlap_tokens: int,
+    ) -> list[TextChunk]:
+        """
+        Split text into chunks that fill, but never exceed, max_tokens of the embedding tokenizer.
 
-        for sentence in sentences:
-            sentence_len = len(sentence)
+        Same sentence grouping as chunk_text_with_spans, measured in tokens.
+        Each sentence is tokenized once and its count reused by every chunk
+        (and overlap) it lands in. A sentence longer than max_tokens is cut
+        into windows at word starts, so the model never truncates a chunk.
+        """
+        normalized = NormalizedText(text)
+        spans = self._sentence_spans(normalized.text)
+        if not spans:
+            return []
 
-            # If single sentence exceeds target, it becomes its own chunk
-            # (we never split mid-sentence)
-            if sentence_len > target_chunk_size:
-                # Flush current chunk first
-                if current_chunk_sentences:
-                    chunks.append(" ".join(current_chunk_sentences))
-                chunks.append(sentence)
-                current_chunk_sentences = []
-                current_length = 0
+        encodings = tokenizer(
+            [normalized.text[start:end] for start, end in spans],
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+        )
+
+        pieces: list[tuple[int, int]] = []
+        lengths: list[int] = []
+        for (start, end), offsets in zip(spans, encodings["offset_mapping"], strict=True):
+            if len(offsets) <= max_tokens:
+                pieces.append((start, end))
+                lengths.append(len(offsets))
                 continue
+            for first, last in self._token_windows(offsets, max_tokens):
+                pieces.append((start + offsets[first][0], start + offsets[last][1]))
+                lengths.append(last - first + 1)
 
-            # Check if adding this sentence would exceed target
-            new_length = current_length + sentence_len + (1 if current_chunk_sentences else 0)
+        # Pieces are contiguous slices too; the space between them adds no tokens
+        chunks = []
+        for first, last in self._group_sentences(
+            lengths, max_tokens, overlap_tokens, separator=0, strict=True
+        ):
+            chunk = self._slice_chunk(normalized, pieces[first][0], pieces[last][1])
+            chunk.token_count = sum(lengths[first:last + 1])
+            chunks.append(chunk)
+        return chunks
 
-            if new_length > target_chunk_size and current_chunk_sentences:
-                # Flush current chunk
-                chunks.append(" ".join(current_chunk_sentences))
+    @staticmethod
+    def _slice_chunk(normalized: NormalizedText, start: int, end: int) -> TextChunk:
+        """Chunk for normalized[start:end], with its span in the source text."""
+        return TextChunk(
+            text=normalized.text[start:end],
+            start_char=normalized.to_source(start),
+            end_char=normalized.to_source(end - 1) + 1,
+        )
 
-                # Build overlap from end of previous chunk
-                overlap_sentences = self._get_overlap_sentences(
-                    current_chunk_sentences, overlap_size
-                )
-                current_chunk_sentences = overlap_sentences + [sentence]
-                current_length = sum(len(s) for s in current_chunk_sentences) + len(
-                    current_chunk_sentences
-                ) - 1
-            else:
-                current_chunk_sentences.append(sentence)
-                current_length = new_length
+    @staticmethod
+    def _token_windows(offsets: list[tuple[int, int]], max_tokens: int) -> list[tuple[int, int]]:
+        """Split tokens into (first, last) windows of at most max_tokens, ending on word ends."""
+        windows = []
+        first = 0
+        while first < len(offsets):
+            last = min(first + max_tokens, len(offsets)) - 1
+            if last < len(offsets) - 1:
+                # Back off while the next token continues the same word (no gap between them)
+                cut = last
+                while cut > first and offsets[cut + 1][0] == offsets[cut][1]:
+                    cut -= 1
+                if cut > first:
+                    last = cut
+            windows.append((first, last))
+            first = last + 1
+        return windows
+
+    @staticmethod
+    def _group_sentences(
+        lengths: list[int],
+        target_size: int,
+        overlap_size: int,
+        separator: int,
+        strict: bool = False,
+    ) -> list[tuple[int, int]]:
+        """
+        Greedily group consecutive sentences into chunks of at most target_size.
+
+        Sizes are sum(lengths) plus `separator` between neighbours. A sentence
+        longer than target_size becomes its own chunk (we never split
+        mid-sentence); each new chunk starts with the trailing sentences of the
+        previous one that fit in overlap_size. With strict, the overlap is
+        also cut back so it plus the next sentence fits in target_size (by
+        default a chunk may run over by up to the overlap). Returns (first,
+        last) sentence indexes per chunk, inclusive.
+        """
+        # Prefix sums make any run's size O(1)
+        prefix = [0]
+        for length in lengths:
+            prefix.append(prefix[-1] + length)
 
-        # Don't forget the last chunk
-        if current_chunk_sentences:
-            chunks.append(" ".join(current_chunk_sentences))
+        def run_size(first: int, last: int) -> int:
+            return prefix[last + 1] - prefix[first] + separator * (last - first)
 
-        return chunks
+        # If total text is small enough, return as single chunk
+        if run_size(0, len(lengths) - 1) <= target_size:
+            return [(0, len(lengths) - 1)]
 
-    def _get_overlap_sentences(
-        self, sentences: list[str], max_overlap_chars: int
-    ) -> list[str]:
-        """Get sentences from end of list that fit within max_overlap_chars."""
-        overlap = []
-        total_len = 0
+        groups = []
+        first: int | None = None  # Current chunk is sentences first..i-1
+
+        for i, length in enumerate(lengths):
+            if length > target_size:
+                # Flush current chunk first
+                if first is not None:
+                    groups.append((first, i - 1))
+                groups.append((i, i))
+                first = None
+                continue
+
+            if first is None:
+                first = i
+            elif run_size(first, i) > target_size:
+                groups.append((first, i - 1))
 
-        for sentence in reversed(sentences):
-            sentence_len = len(sentence) + (1 if overlap else 0)
-            if total_len + sentence_len > max_overlap_chars:
-                break
-            overlap.insert(0, sentence)
-            total_len += sentence_len
+                # Build overlap from end of previous chunk
+                overlap_start = i
+                while (
+                    overlap_start > first
+                    and run_size(overlap_start - 1, i - 1) <= overlap_size
+                    and (not strict or run_size(overlap_start - 1, i) <= target_size)
+                ):
+                    overlap_start -= 1
+                first = overlap_start
+
+        # Don't forget the last chunk
+        if first is not None:
+            groups.append((first, len(lengths) - 1))
 
-        return overlap
+        return groups
 
     def _get_page_for_position(self, char_position: int, page_breaks: list[int]) -> int | None:
-        """Get page number (1-indexed) for a character position."""
+        """Get page number (1-indexed) for a character position (binary search)."""
         if not page_breaks:
             return None
-        for i, break_pos in enumerate(page_breaks):
-            if char_position < break_pos:
-                return i + 1
-        return len(page_breaks)
+        return min(bisect.bisect_right(page_breaks, char_position) + 1, len(page_breaks))
@@ -1,21 +1,71 @@
 """Shared embedding model for document processing and retrieval."""
 
+import copy
+import hashlib
+import threading
+
 from sentence_transformers import SentenceTransformer
+from transformers import PreTrainedTokenizerBase
 
 from app.config import settings
+from app.core.inference import MicroBatcher, run_ingestion_inference
+from app.utils.cache import LRUCache
 
 # Load model once at module level - avoids reloading 90MB model per request
-_model: SentenceTransformer | None = None
+_model: SentenceTransformer | None = None  # OnnxSentenceEncoder with INFERENCE_BACKEND=onnx
+_model_lock = threading.Lock()  # Inference threads may load the model at the same time
+
+# Shared batcher for query embeddings - concurrent requests share forward passes
+_query_batcher: MicroBatcher[str, list[float]] | None = None
+
+# Per-thread tokenizer copies for chunking; see get_embedding_tokenizer
+_thread_tokenizers = threading.local()
+
+# Query embeddings keyed by whitespace-normalized text (the model is case-sensitive)
+_query_embedding_cache: LRUCache[str, list[float]] = LRUCache(
+    settings.EMBEDDING_CACHE_SIZE, settings.EMBEDDING_CACHE_TTL_SECONDS
+)
 
 
 def get_embedding_model() -> SentenceTransformer:
-    """Get or create the shared embedding model."""
+    """Get or create the shared embedding model for the configured inference backend."""
     global _model
     if _model is None:
-        _model = SentenceTransformer(settings.EMBEDDING_MODEL)
+        with _model_lock:
+            if _model is None:
+                if settings.INFERENCE_BACKEND == "onnx":
+                    # Quantized int8 export; same encode() interface as SentenceTransformer
+                    from app.services.onnx_inference import OnnxSentenceEncoder
+
+                    _model = OnnxSentenceEncoder(settings.EMBEDDING_MODEL)
+                else:
+                    _model = SentenceTransformer(settings.EMBEDDING_MODEL)
     return _model
 
 
+def get_embedding_tokenizer() -> PreTrainedTokenizerBase:
+    """
+    Copy of the embedding model's tokenizer, private to the calling thread.
+
+    HF fast tokenizers rewrite their truncation/padding state on every call,
+    so using the model's own instance while encode() runs on the inference
+    pool fails with "RuntimeError: Already borrowed".
+    """
+    source = get_embedding_model().tokenizer
+    if getattr(_thread_tokenizers, "source", None) is not source:
+        _thread_tokenizers.tokenizer = copy.deepcopy(source)
+        _thread_tokenizers.source = source
+    tokenizer: PreTrainedTokenizerBase = _thread_tokenizers.tokenizer
+    return tokenizer
+
+
+def embedding_token_limit() -> int:
+    """Content tokens per embedding window: max_seq_length minus special tokens."""
+    special_tokens = get_embedding_tokenizer().num_special_tokens_to_add()
+    max_seq_length: int = get_embedding_model().max_seq_length
+    return max_seq_length - special_tokens
+
+
 def embed_text(text: str) -> list[float]:
     """Generate embedding for a single text."""
     model = get_embedding_model()
@@ -29,4 +79,74 @@ def embed_texts(texts: list[str]) -> list[list[float]]:
     return [emb.tolist() for emb in embeddings]
 
 
+def embedding_model_id() -> str:
+    """What produces the vectors: model, inference backend and, for ONNX, the int8 export."""
+    if settings.INFERENCE_BACKEND == "onnx":
+        from app.services.onnx_inference import ONNX_MODEL_FILE
+
+        return f"{settings.EMBEDDING_MODEL}|onnx|{ONNX_MODEL_FILE}"
+    return f"{settings.EMBEDDING_MODEL}|{settings.INFERENCE_BACKEND}"
+
+
+def embedding_key(text: str) -> str:
+    """
+    Content key for a text's embedding, for reusing stored vectors.
+
+    Covers the backend as well as the model: torch and quantized ONNX
+    vectors differ slightly, so one is never reused for the other.
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{embedding_model_id()}\n{normalized}".encode()).hexdigest()
+
+
+async def embed_texts_async(texts: list[str]) -> list[list[float]]:
+    """Embed document texts on the inference pool, leaving threads free for queries."""
+    return await run_ingestion_inference(embed_texts, texts)
+
+
+def _embed_batch(texts: list[str]) -> list[list[float]]:
+    """Embed a coalesced batch in one encode call sized to the whole batch."""
+    model = get_embedding_model()
+    embeddings = model.encode(
+        texts, convert_to_numpy=True, batch_size=settings.INFERENCE_MAX_BATCH_SIZE
+    )
+    return [emb.tolist() for emb in embeddings]
+
+
+def _get_query_batcher() -> MicroBatcher[str, list[float]]:
+    """Get or create the query embedding batcher."""
+    global _query_batcher
+    if _query_batcher is None:
+        _query_batcher = MicroBatcher(
+            _embed_batch,
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.INFERENCE_BATCH_WAIT_MS,
+        )
+    return _query_batcher
+
+
+async def embed_queries_async(texts: list[str]) -> list[list[float]]:
+    """
+    Embed query texts, reusing cached embeddings for repeated queries.
+
+    Cache misses go through the shared micro-batcher, so concurrent queries
+    are embedded together. Document chunks should use embed_texts_async so
+    they don't evict query entries or hold up query batches.
+    """
+    keys = [" ".join(text.split()) for text in texts]
+    cached = [_query_embedding_cache.get(key) for key in keys]
+
+    missing = [i for i, emb in enumerate(cached) if emb is None]
+    computed: dict[int, list[float]] = {}
+    if missing:
+        new_embeddings = await _get_query_batcher().submit([texts[i] for i in missing])
+        for i, emb in zip(missing, new_embeddings, strict=True):
+            computed[i] = emb
+            _query_embedding_cache.set(keys[i], emb)
+
+    return [emb if emb is not None else computed[i] for i, emb in enumerate(cached)]
+
 
+def get_query_embedding_cache_stats() -> dict[str, float]:
+    """Hit/miss counters for the query embedding cache."""
+    return _query_embedding_cache.stats()
@@ -0,0 +1,302 @@
+"""Background document ingestion: a Postgres-backed job queue and a bounded worker pool."""
+
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.database import SessionLocal, run_db
+from app.core.vector_store import get_vector_store
+from app.models.database import Document, IngestionJob
+from app.services.answer_cache import invalidate_answer_cache
+from app.services.document_processor import DocumentProcessor
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+def enqueue_document(db: Session, document: Document) -> IngestionJob:
+    """Add an ingestion job for a document (committed with the caller's transaction)."""
+    job = IngestionJob(
+        document_id=document.id,
+        status=JOB_QUEUED,
+        max_attempts=settings.INGESTION_MAX_ATTEMPTS,
+    )
+    db.add(job)
+    return job
+
+
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime, matching the DateTime columns."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def set_document_status(db: Session, document_id: uuid.UUID, status: str) -> None:
+    """Set a document's processing_status in the session's transaction."""
+    db.query(Document).filter(Document.id == document_id).update(
+        {Document.processing_status: status}
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff after the given number of failed attempts."""
+    delay = settings.INGESTION_RETRY_BACKOFF_S * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.INGESTION_RETRY_MAX_BACKOFF_S))
+
+
+class IngestionWorkerPool:
+    """
+    Processes queued uploads with a fixed number of asyncio workers.
+
+    Jobs live in the ingestion_jobs table, so they survive restarts and can
+    be shared by several API processes: a worker claims one with
+    SELECT ... FOR UPDATE SKIP LOCKED and holds a lease on it, renewed by a
+    heartbeat for as long as the job runs. A job whose lease runs out (its
+    process died) is claimed again. Failures are retried with exponential backoff until
+    max_attempts, then the document is marked failed. Database work runs
+    in the threadpool (run_db), never on the event loop.
+    """
+
+    def __init__(self, workers: int, poll_interval_s: float) -> None:
+        """Initialize with the pool size and how often idle workers poll."""
+        self.workers = workers
+        self.poll_interval_s = poll_interval_s
+        self._tasks: list[asyncio.Task[None]] = []
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(self.workers)
+        ]
+        print(f"[INGESTION] Started {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running go back on the queue."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers now instead of at their next poll (after an upload)."""
+        self._wakeup.set()
+
+    async def _worker(self) -> None:
+        """Claim and run jobs until cancelled."""
+        while True:
+            try:
+                job_id = await run_db(self._claim)
+            except Exception as e:
+                print(f"[INGESTION] Failed to claim a job: {e}")
+                job_id = None
+
+            if job_id is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_s)
+                except TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Bookkeeping failed (e.g. document deleted mid-run); the lease covers retries
+                print(f"[INGESTION] Job {job_id} errored outside processing: {e}")
+
+    def _claim(self) -> uuid.UUID | None:
+        """Mark the next due job as running and return its id."""
+        db = SessionLocal()
+        try:
+            now = utcnow()
+            job = (
+                db.query(IngestionJob)
+                .filter(
+                    or_(
+                        and_(IngestionJob.status == JOB_QUEUED, IngestionJob.run_after <= now),
+                        and_(
+                            IngestionJob.status == JOB_RUNNING,
+                            IngestionJob.lease_expires_at < now,
+                        ),
+                    )
+                )
+                .order_by(IngestionJob.run_after)
+                .with_for_update(skip_locked=True)
+                .first()
+            )
+            if job is None:
+                return None
+
+            if job.attempts >= job.max_attempts:
+                # Lease expired on the last attempt - its process died, don't loop forever
+                job.status = JOB_FAILED
+                job.error = job.error or "Worker stopped responding"
+                job.lease_expires_at = None
+                set_document_status(db, job.document_id, "failed")
+                db.commit()
+                return None
+
+            job.status = JOB_RUNNING
+            job.attempts += 1
+            job.error = None
+            job.lease_expires_at = now + timedelta(seconds=settings.INGESTION_JOB_LEASE_S)
+            set_document_status(db, job.document_id, "processing")
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def _update_job(self, job_id: uuid.UUID, **fields: Any) -> None:
+        """Write job fields from a short session of its own (progress, lease)."""
+        db = SessionLocal()
+        try:
+            values: dict[Any, Any] = {**fields, IngestionJob.updated_at: utcnow()}
+            db.query(IngestionJob).filter(IngestionJob.id == job_id).update(values)
+            db.commit()
+        finally:
+            db.close()
+
+    def _progress_reporter(self, job_id: uuid.UUID) -> Callable[[float, str], Awaitable[None]]:
+        """Progress callback for the processor."""
+
+        async def report(progress: float, stage: str) -> None:
+            await run_db(self._update_job, job_id, progress=round(progress, 3), stage=stage)
+
+        return report
+
+    async def _heartbeat(self, job_id: uuid.UUID) -> None:
+        """Renew a running job's lease until cancelled, also through steps without progress."""
+        lease_s = settings.INGESTION_JOB_LEASE_S
+        while True:
+            await asyncio.sleep(lease_s / 3)
+            try:
+                await run_db(
+                    self._update_job,
+                    job_id,
+                    lease_expires_at=utcnow() + timedelta(seconds=lease_s),
+                )
+            except Exception as e:
+                # Transient DB errors: the next beat retries well before the lease runs out
+                print(f"[INGESTION] Failed to renew the lease of job {job_id}: {e}")
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        """Process a claimed job's document and record the outcome."""
+        # Loaded attributes survive commits, so reading them on the loop never queries
+        db = SessionLocal(expire_on_commit=False)
+        try:
+            job, document = await run_db(self._load_job, db, job_id)
+            vector_store = await get_vector_store()
+            processor = DocumentProcessor(
+                db=db,
+                document=document,
+                vector_store=vector_store,
+                on_progress=self._progress_reporter(job_id),
+            )
+
+            heartbeat = asyncio.create_task(
+                self._heartbeat(job_id), name=f"ingestion-heartbeat-{job_id}"
+            )
+            try:
+                try:
+                    await processor.discard_existing_chunks()
+                    await processor.process_document()
+                finally:
+                    # Stopped before the outcome is written, so it never renews a finished job
+                    heartbeat.cancel()
+                    await asyncio.wait({heartbeat})
+            except asyncio.CancelledError:
+                # Shutting down: hand the job back without counting the attempt
+                await run_db(self._requeue, db, job)
+                raise
+            except Exception as e:
+                await run_db(self._record_failure, db, job, e)
+                return
+
+            await run_db(self._record_success, db, job)
+        finally:
+            await run_db(db.close)
+
+        # New content can change answers - invalidate cached responses
+        invalidate_answer_cache()
+
+    @staticmethod
+    def _load_job(db: Session, job_id: uuid.UUID) -> tuple[IngestionJob, Document]:
+        """Load a job and its document."""
+        job = db.get(IngestionJob, job_id)
+        if job is None:
+            raise LookupError(f"Ingestion job {job_id} no longer exists")
+        document = db.get(Document, job.document_id)
+        if document is None:
+            raise LookupError(f"Document {job.document_id} of job {job_id} no longer exists")
+        return job, document
+
+    @staticmethod
+    def _requeue(db: Session, job: IngestionJob) -> None:
+        """Put an interrupted job back on the queue without counting the attempt."""
+        db.rollback()
+        job.status = JOB_QUEUED
+        job.attempts = max(job.attempts - 1, 0)
+        job.lease_expires_at = None
+        set_document_status(db, job.document_id, "pending")
+        db.commit()
+
+    @staticmethod
+    def _record_success(db: Session, job: IngestionJob) -> None:
+        """Mark the job succeeded and the document processed."""
+        job.status = JOB_SUCCEEDED
+        job.stage = None
+        job.progress = 1.0
+        job.lease_expires_at = None
+        set_document_status(db, job.document_id, "processed")
+        db.commit()
+        print(f"[INGESTION] Processed document {job.document_id} (attempt {job.attempts})")
+
+    @staticmethod
+    def _record_failure(db: Session, job: IngestionJob, error: Exception) -> None:
+        """Schedule a retry with backoff, or fail the job once attempts are used up."""
+        db.rollback()
+        job.error = f"{type(error).__name__}: {error}"
+        job.lease_expires_at = None
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            job.status = JOB_QUEUED
+            job.run_after = utcnow() + delay
+            set_document_status(db, job.document_id, "pending")
+            print(
+                f"[INGESTION] Document {job.document_id} failed (attempt {job.attempts}/"
+                f"{job.max_attempts}), retrying in {delay.total_seconds():.0f}s: {job.error}"
+            )
+        else:
+            job.status = JOB_FAILED
+            set_document_status(db, job.document_id, "failed")
+            print(f"[INGESTION] Document {job.document_id} failed permanently: {job.error}")
+        db.commit()
+
+
+# Lazy-loaded pool (started with the app)
+_ingestion_pool: IngestionWorkerPool | None = None
+
+
+def get_ingestion_pool() -> IngestionWorkerPool:
+    """Get the ingestion worker pool (singleton)."""
+    global _ingestion_pool
+    if _ingestion_pool is None:
+        _ingestion_pool = IngestionWorkerPool(
+            workers=settings.INGESTION_WORKERS,
+            poll_interval_s=settings.INGESTION_POLL_INTERVAL_S,
+        )
+    return _ingestion_pool
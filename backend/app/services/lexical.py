@@ -0,0 +1,150 @@
+"""Lexical (BM25) term weighting shared by ingestion and retrieval."""
+
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+import numpy.typing as npt
+from qdrant_client.models import SparseVector
+from scipy.sparse import csr_matrix
+
+from app.config import settings
+from app.utils.cache import LRUCache
+
+# Token ids per chunk, keyed by chunk (point) id. Filled at ingestion and on first use.
+_chunk_token_cache: LRUCache[str, npt.NDArray[np.int64]] = LRUCache(settings.CHUNK_TOKEN_CACHE_SIZE)
+
+# rank_bm25's BM25Okapi floor for negative IDFs (fraction of the average IDF)
+BM25_IDF_EPSILON = 0.25
+
+
+def tokenize(text: str) -> list[str]:
+    """Simple tokenizer for BM25: lowercase, split on non-alphanumeric."""
+    text = text.lower()
+    tokens = re.findall(r"\b[a-z0-9]+\b", text)
+    return tokens
+
+
+def token_id(token: str) -> int:
+    """Map a token to a stable sparse-vector index (CRC32 fits Qdrant's uint32 indices)."""
+    return zlib.crc32(token.encode("utf-8"))
+
+
+def build_document_sparse_vector(text: str) -> SparseVector:
+    """
+    Build the BM25 document-side sparse vector for a chunk.
+
+    Values carry the saturated term frequency part of BM25. The IDF part is
+    applied by Qdrant at query time (collection uses the IDF modifier), so it
+    always reflects the whole corpus rather than the candidate pool.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return SparseVector(indices=[], values=[])
+
+    k1 = settings.BM25_K1
+    b = settings.BM25_B
+    length_norm = 1 - b + b * len(tokens) / settings.BM25_AVG_DOC_LENGTH
+
+    weights: dict[int, float] = {}
+    for token, tf in Counter(tokens).items():
+        weights[token_id(token)] = tf * (k1 + 1) / (tf + k1 * length_norm)
+
+    return SparseVector(indices=list(weights.keys()), values=list(weights.values()))
+
+
+def build_query_sparse_vector(text: str) -> SparseVector:
+    """Build the query-side sparse vector (term counts, IDF applied server-side)."""
+    counts = Counter(token_id(token) for token in tokenize(text))
+    return SparseVector(indices=list(counts.keys()), values=[float(v) for v in counts.values()])
+
+
+def token_ids(text: str) -> npt.NDArray[np.int64]:
+    """Tokenize text into token_id()s (in token order, repeats kept)."""
+    tokens = tokenize(text)
+    return np.fromiter((token_id(token) for token in tokens), dtype=np.int64, count=len(tokens))
+
+
+def cache_chunk_token_ids(chunk_id: str, text: str) -> npt.NDArray[np.int64]:
+    """Tokenize a chunk once and keep its token ids for later BM25 scoring."""
+    ids = token_ids(text)
+    _chunk_token_cache.set(chunk_id, ids)
+    return ids
+
+
+def lookup_chunk_token_ids(chunk_id: str) -> npt.NDArray[np.int64] | None:
+    """Cached token ids for a chunk, or None if it hasn't been tokenized yet."""
+    return _chunk_token_cache.get(chunk_id)
+
+
+def invalidate_chunk_token_ids(chunk_ids: list[str]) -> None:
+    """Drop cached token ids for deleted chunks."""
+    for chunk_id in chunk_ids:
+        _chunk_token_cache.pop(chunk_id)
+
+
+def get_chunk_token_cache_stats() -> dict[str, float]:
+    """Hit/miss counters for the chunk token cache."""
+    return _chunk_token_cache.stats()
+
+
+def bm25_scores(
+    documents: list[npt.NDArray[np.int64]],
+    queries: list[npt.NDArray[np.int64]],
+) -> npt.NDArray[np.float64]:
+    """
+    BM25 scores of every query against a candidate pool, shape (docs, queries).
+
+    Matches rank_bm25's BM25Okapi built over `documents` (IDF computed over
+    the pool, negative IDFs floored at epsilon * average IDF, repeated query
+    tokens counted each time), but scores all queries with one sparse
+    matrix product instead of a Python loop per query token. Tokens are
+    compared by their CRC32 ids, so two tokens that collide count as one.
+    """
+    num_docs = len(documents)
+    scores = np.zeros((num_docs, len(queries)))
+    doc_lengths = np.fromiter((len(d) for d in documents), dtype=np.float64, count=num_docs)
+    total_tokens = doc_lengths.sum()
+    if num_docs == 0 or not queries or total_tokens == 0:
+        return scores
+
+    # Distinct (doc, term) pairs with their counts, on a vocabulary local to the pool
+    all_tokens = np.concatenate(documents)
+    doc_index = np.repeat(np.arange(num_docs), doc_lengths.astype(np.int64))
+    vocab, term_index = np.unique(all_tokens, return_inverse=True)
+    pair_keys, term_freqs = np.unique(doc_index * len(vocab) + term_index, return_counts=True)
+    pair_docs, pair_terms = np.divmod(pair_keys, len(vocab))
+
+    # IDF over the pool, with BM25Okapi's epsilon floor for negative values
+    doc_freqs = np.bincount(pair_terms, minlength=len(vocab))
+    idf = np.log(num_docs - doc_freqs + 0.5) - np.log(doc_freqs + 0.5)
+    idf[idf < 0] = BM25_IDF_EPSILON * idf.mean()
+
+    # Saturated, length-normalized term frequencies
+    k1 = settings.BM25_K1
+    b = settings.BM25_B
+    length_norm = k1 * (1 - b + b * doc_lengths / (total_tokens / num_docs))
+    weights = term_freqs * (k1 + 1) / (term_freqs + length_norm[pair_docs])
+    tf_matrix = csr_matrix((weights, (pair_docs, pair_terms)), shape=(num_docs, len(vocab)))
+
+    # Query term counts times IDF; tokens outside the pool contribute nothing
+    query_rows: list[npt.NDArray[np.int64]] = []
+    query_cols: list[npt.NDArray[np.intp]] = []
+    for q, ids in enumerate(queries):
+        if len(ids) == 0:
+            continue
+        positions = np.searchsorted(vocab, ids)
+        positions = np.minimum(positions, len(vocab) - 1)
+        in_pool = vocab[positions] == ids
+        query_cols.append(positions[in_pool])
+        query_rows.append(np.full(int(in_pool.sum()), q, dtype=np.int64))
+    if not query_cols:
+        return scores
+    query_terms = np.concatenate(query_cols)
+    query_matrix = csr_matrix(
+        (idf[query_terms], (query_terms, np.concatenate(query_rows))),
+        shape=(len(vocab), len(queries)),
+    )  # Duplicate entries (repeated query tokens) are summed
+
+    return np.asarray((tf_matrix @ query_matrix).todense())
@@ -0,0 +1,161 @@
+"""ONNX Runtime inference for quantized (int8) embedding and cross-encoder models.
+
+Models are exported ahead of time with scripts/export_onnx_models.py into
+ONNX_MODEL_DIR/<model name with "/" replaced by "__">/. The classes here mirror
+the parts of the SentenceTransformer / CrossEncoder API the app uses, so they
+can be swapped in by the model getters without touching callers.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import onnxruntime as ort
+from transformers import AutoTokenizer
+
+from app.config import settings
+
+ONNX_MODEL_FILE = "model_quantized.onnx"
+
+
+def onnx_model_dir(model_name: str) -> Path:
+    """Directory holding the exported ONNX model and tokenizer for a model name."""
+    return Path(settings.ONNX_MODEL_DIR) / model_name.replace("/", "__")
+
+
+def _create_session(model_dir: Path) -> ort.InferenceSession:
+    """Create a CPU inference session using the configured thread count."""
+    model_path = model_dir / ONNX_MODEL_FILE
+    if not model_path.exists():
+        raise FileNotFoundError(
+            f"ONNX model not found at {model_path}. "
+            "Run scripts/export_onnx_models.py to export it."
+        )
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = settings.INFERENCE_THREADS
+    options.inter_op_num_threads = 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return ort.InferenceSession(
+        str(model_path), sess_options=options, providers=["CPUExecutionProvider"]
+    )
+
+
+def _read_json(path: Path) -> Any:
+    """Read a JSON config file if it exists (None if it doesn't)."""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class OnnxSentenceEncoder:
+    """Bi-encoder running on ONNX Runtime (drop-in for SentenceTransformer.encode)."""
+
+    def __init__(self, model_name: str) -> None:
+        """Load tokenizer, session and pooling config for an exported model."""
+        model_dir = onnx_model_dir(model_name)
+        self.session = _create_session(model_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(  # type: ignore[no-untyped-call]
+            str(model_dir)
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        # Sentence-transformers configs are copied next to the model on export
+        st_config = _read_json(model_dir / "sentence_bert_config.json") or {}
+        self.max_seq_length = int(st_config.get("max_seq_length", 384))
+
+        pooling = _read_json(model_dir / "1_Pooling" / "config.json") or {}
+        self._cls_pooling = bool(pooling.get("pooling_mode_cls_token", False))
+
+        modules = _read_json(model_dir / "modules.json")
+        self._normalize = (
+            any(m.get("type", "").endswith("Normalize") for m in modules)
+            if isinstance(modules, list)
+            else True
+        )
+
+    def encode(
+        self,
+        sentences: str | list[str],
+        convert_to_numpy: bool = True,
+        batch_size: int = 32,
+        **kwargs: Any,
+    ) -> npt.NDArray[np.float32]:
+        """Encode sentences into embeddings (same pooling/normalization as the ST model)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        batches: list[npt.NDArray[np.float32]] = []
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            encoded = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            inputs = {k: v for k, v in encoded.items() if k in self._input_names}
+            token_embeddings = self.session.run(None, inputs)[0]
+
+            if self._cls_pooling:
+                pooled = token_embeddings[:, 0]
+            else:
+                mask = encoded["attention_mask"][..., None].astype(np.float32)
+                pooled = (token_embeddings * mask).sum(axis=1) / np.clip(
+                    mask.sum(axis=1), 1e-9, None
+                )
+
+            if self._normalize:
+                pooled = pooled / np.clip(
+                    np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None
+                )
+            batches.append(pooled.astype(np.float32))
+
+        embeddings = np.concatenate(batches)
+        return embeddings[0] if single else embeddings
+
+
+class OnnxCrossEncoder:
+    """Cross-encoder running on ONNX Runtime (drop-in for CrossEncoder.predict)."""
+
+    def __init__(self, model_name: str, max_length: int = 512) -> None:
+        """Load tokenizer and session for an exported model."""
+        model_dir = onnx_model_dir(model_name)
+        self.session = _create_session(model_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(  # type: ignore[no-untyped-call]
+            str(model_dir)
+        )
+        self.max_length = max_length
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def predict(
+        self,
+        sentences: list[tuple[str, str]],
+        batch_size: int = 32,
+        **kwargs: Any,
+    ) -> npt.NDArray[np.float32]:
+        """Score (query, document) pairs; returns raw logits like the ms-marco CrossEncoder."""
+        if not sentences:
+            return np.zeros(0, dtype=np.float32)
+
+        scores: list[npt.NDArray[np.float32]] = []
+        for start in range(0, len(sentences), batch_size):
+            batch = sentences[start:start + batch_size]
+            encoded = self.tokenizer(
+                [pair[0] for pair in batch],
+                [pair[1] for pair in batch],
+                padding=True,
+                truncation="longest_first",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            inputs = {k: v for k, v in encoded.items() if k in self._input_names}
+            logits = self.session.run(None, inputs)[0]
+            scores.append(logits[:, 0] if logits.ndim == 2 else logits)
+
+        return np.concatenate(scores).astype(np.float32)
@@ -0,0 +1,224 @@
+"""PDF text extraction with pdfplumber, optionally parallel across worker processes.
+
+Kept free of model and database imports so spawned workers start quickly.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pdfplumber
+from pdfplumber.page import Page
+
+PAGE_SEPARATOR = "\n\n"
+
+# Page objects that produce edges for the default "lines" table strategy
+TABLE_EDGE_OBJECTS = ("line", "rect", "curve")
+
+# Lazy-loaded process pools for large PDFs, one per size (the app only uses one)
+_extraction_pools: dict[int, ProcessPoolExecutor] = {}
+_extraction_pools_lock = threading.Lock()
+
+
+# Cap for the automatic pool size; the rest of the cores stay free for query inference
+MAX_AUTO_EXTRACTION_PROCESSES = 4
+
+
+def extraction_processes(requested: int) -> int:
+    """
+    Worker processes to use: 0 means min(4, half the CPU cores), at least 1.
+
+    The pool is shared by every ingestion worker, so this bounds all PDF
+    parsing in the API process. Leaving half the cores free keeps
+    INGESTION_INFERENCE_SLOTS meaningful: query inference still has CPU
+    to run on while large PDFs are being extracted.
+    """
+    if requested > 0:
+        return requested
+    return max(1, min(MAX_AUTO_EXTRACTION_PROCESSES, (os.cpu_count() or 1) // 2))
+
+
+def get_extraction_pool(processes: int) -> ProcessPoolExecutor:
+    """
+    Get or create the extraction process pool with this many workers.
+
+    Ingestion workers call this from several threads at once. Pools are
+    never shut down here, so a pool another thread is submitting to stays
+    usable.
+    """
+    with _extraction_pools_lock:
+        pool = _extraction_pools.get(processes)
+        if pool is None:
+            # spawn, not fork: the API process runs inference threads
+            pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+            )
+            _extraction_pools[processes] = pool
+        return pool
+
+
+def extract_pdf_text(
+    file_path: str, processes: int = 1, min_parallel_pages: int = 8
+) -> tuple[str, list[int]]:
+    """
+    Extract text from a PDF, handling tables specially.
+
+    With processes > 1 and at least min_parallel_pages pages, contiguous
+    page ranges are extracted in worker processes, each opening the file
+    itself; results are reassembled in page order, so the output is the
+    same as a serial pass.
+
+    Returns (full_text, page_break_positions), where page_breaks[i] is the
+    offset in full_text at which page i + 1 ends.
+    """
+    with pdfplumber.open(file_path) as pdf:
+        num_pages = len(pdf.pages)
+
+    if processes <= 1 or num_pages < min_parallel_pages:
+        page_texts = extract_page_range(file_path, 0, num_pages)
+    else:
+        # A few ranges per process so one slow (table-heavy) range doesn't dominate
+        range_size = max(1, math.ceil(num_pages / (processes * 4)))
+        ranges = [
+            (start, min(start + range_size, num_pages))
+            for start in range(0, num_pages, range_size)
+        ]
+        pool = get_extraction_pool(processes)
+        futures = [pool.submit(extract_page_range, file_path, start, end) for start, end in ranges]
+        page_texts = [text for future in futures for text in future.result()]
+
+    # End offset of each page in the joined text (counting the separators)
+    page_breaks = []
+    current_pos = 0
+    for i, page_text in enumerate(page_texts):
+        if i:
+            current_pos += len(PAGE_SEPARATOR)
+        current_pos += len(page_text)
+        page_breaks.append(current_pos)
+
+    return PAGE_SEPARATOR.join(page_texts), page_breaks
+
+
+def extract_page_range(file_path: str, start: int, end: int) -> list[str]:
+    """Extract pages [start, end) (0-indexed) of a PDF, in order."""
+    # pdfplumber numbers pages from 1
+    with pdfplumber.open(file_path, pages=list(range(start + 1, end + 1))) as pdf:
+        return [extract_page_content(page) for page in pdf.pages]
+
+
+def extract_page_content(page: Page) -> str:
+    """
+    Extract content from a single PDF page, handling tables specially.
+
+    Strategy:
+    1. Detect tables on the page
+    2. Extract tables as structured text
+    3. Extract remaining text (outside tables)
+    4. Combine in reading order
+    """
+    # Table detection only looks at ruling lines; without any there are no tables
+    if not any(page.objects.get(kind) for kind in TABLE_EDGE_OBJECTS):
+        tables = []
+    else:
+        tables = page.find_tables()
+
+    if not tables:
+        # No tables - just extract text normally
+        text = page.extract_text() or ""
+        return text.strip()
+
+    # Filter out characters whose center falls within a table region
+    in_table = chars_in_bboxes(page.chars, [table.bbox for table in tables])
+    outside_ids = {
+        id(char) for char, inside in zip(page.chars, in_table, strict=True) if not inside
+    }
+
+    if outside_ids:
+        # Use pdfplumber's text extraction on the remaining chars (same objects, by identity)
+        filtered_page = page.filter(
+            lambda obj: obj["object_type"] != "char" or id(obj) in outside_ids
+        )
+        outside_text = filtered_page.extract_text() or ""
+    else:
+        outside_text = ""
+
+    # Extract tables and convert to readable format
+    table_texts = []
+    for table in tables:
+        table_data = table.extract()
+        if table_data:
+            formatted = format_table(table_data)
+            if formatted:
+                table_texts.append(formatted)
+
+    # Combine text and tables (tables after main text for simplicity)
+    # In a more sophisticated version, we'd interleave by y-position
+    parts = []
+    if outside_text.strip():
+        parts.append(outside_text.strip())
+    for tt in table_texts:
+        parts.append(tt)
+
+    return "\n\n".join(parts)
+
+
+def chars_in_bboxes(
+    chars: list[dict[str, Any]], bboxes: list[tuple[float, float, float, float]]
+) -> npt.NDArray[np.bool_]:
+    """Boolean mask: whether each char's center lies in any (x0, top, x1, bottom) bbox."""
+    if not chars:
+        return np.zeros(0, dtype=bool)
+    coords = np.array([(c["x0"], c["x1"], c["top"], c["bottom"]) for c in chars], dtype=np.float64)
+    center_x = (coords[:, 0] + coords[:, 1]) / 2
+    center_y = (coords[:, 2] + coords[:, 3]) / 2
+
+    inside = np.zeros(len(chars), dtype=bool)
+    for x0, top, x1, bottom in bboxes:
+        inside |= (x0 <= center_x) & (center_x <= x1) & (top <= center_y) & (center_y <= bottom)
+    return inside
+
+
+def format_table(table_data: list[list[Any]]) -> str:
+    """
+    Convert table data to readable text format.
+
+    Uses a simple markdown-like format that preserves structure
+    while being easy for embeddings/LLM to understand.
+    """
+    if not table_data or not table_data[0]:
+        return ""
+
+    # Clean up cells (remove None, strip whitespace)
+    cleaned = []
+    for row in table_data:
+        cleaned_row = [
+            (cell.strip() if isinstance(cell, str) else str(cell) if cell else "")
+            for cell in row
+        ]
+        # Skip completely empty rows
+        if any(cleaned_row):
+            cleaned.append(cleaned_row)
+
+    if not cleaned:
+        return ""
+
+    # Format as pipe-separated table (markdown style)
+    lines = []
+
+    # Assume first row is header
+    header = cleaned[0]
+    lines.append("| " + " | ".join(header) + " |")
+    lines.append("|" + "|".join(["---"] * len(header)) + "|")
+
+    for row in cleaned[1:]:
+        # Pad row if needed
+        while len(row) < len(header):
+            row.append("")
+        lines.append("| " + " | ".join(row[:len(header)]) + " |")
+
+    return "\n".join(lines)
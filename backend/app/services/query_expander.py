@@ -3,21 +3,14 @@
 import json
 import re
 
-from groq import Groq
-
 from app.config import settings
+from app.core.llm import get_groq_client
+from app.utils.cache import LRUCache, normalize_cache_key
 
-# Lazy-loaded Groq client
-_client: Groq | None = None
-
-
-def get_groq_client() -> Groq:
-    """Get or initialize Groq client (singleton)."""
-    global _client
-    if _client is None:
-        _client = Groq(api_key=settings.GROQ_API_KEY)
-    return _client
-
+# Successful expansions keyed by normalized query text
+_expansion_cache: LRUCache[str, list[str]] = LRUCache(
+    settings.EXPANSION_CACHE_SIZE, settings.EXPANSION_CACHE_TTL_SECONDS
+)
 
 EXPANSION_PROMPT = """Generate 2 alternative phrasings of this search query that would help find relevant documents. Use synonyms and related terms.
 
@@ -27,17 +20,23 @@ Return ONLY a JSON array of 2 strings, no explanation:
 ["alternative 1", "alternative 2"]"""
 
 
-def expand_query(query: str) -> list[str]:
+async def expand_query(query: str) -> list[str]:
     """
     Generate query variations to improve search recall.
 
     Returns the original query plus 2 alternatives with synonyms/related terms.
     Falls back to original query only if expansion fails.
+    Repeated queries are served from a cache without calling the LLM.
     """
+    cache_key = normalize_cache_key(query)
+    cached = _expansion_cache.get(cache_key)
+    if cached is not None:
+        return [query] + cached
+
     client = get_groq_client()
 
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=settings.LLM_MODEL,  # Use same model as main LLM
             messages=[
                 {"role": "user", "content": EXPANSION_PROMPT.format(query=query)},
@@ -57,6 +56,7 @@ def expand_query(query: str) -> list[str]:
                 all_queries = [query] + [
                     alt for alt in alternatives[:2] if alt.lower() != query.lower()
                 ]
+                _expansion_cache.set(cache_key, all_queries[1:])
                 return all_queries
 
     except Exception:
@@ -65,3 +65,7 @@ def expand_query(query: str) -> list[str]:
 
     return [query]
 
+
+def get_expansion_cache_stats() -> dict[str, float]:
+    """Hit/miss counters for the query expansion cache."""
+    return _expansion_cache.stats()
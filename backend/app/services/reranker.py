@@ -1,26 +1,124 @@
 """Cross-encoder reranking service."""
 
+import threading
+from dataclasses import replace
+
 from sentence_transformers import CrossEncoder
 
+from app.config import settings
+from app.core.inference import MicroBatcher
 from app.services.retrieval import RetrievedChunk
+from app.utils.cache import LRUCache, normalize_cache_key
 
-# Lazy-loaded cross-encoder model
-_cross_encoder: CrossEncoder | None = None
+# Lazy-loaded cross-encoder models by name (OnnxCrossEncoder with INFERENCE_BACKEND=onnx)
+_cross_encoders: dict[str, CrossEncoder] = {}
+_cross_encoders_lock = threading.Lock()  # Inference threads may load a model at the same time
 
 # ms-marco-MiniLM-L-12-v2 is more accurate (12 layers vs 6)
 # Trade-off: ~2x slower but better relevance scoring
 CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-12-v2"
 
+# Cascade mode: the 6-layer model scores the whole pool, L-12 only the survivors
+PREFILTER_CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+# Per-model batchers - concurrent rerank requests share forward passes
+_batchers: dict[str, MicroBatcher[tuple[str, str], float]] = {}
+
+# Raw cross-encoder scores keyed by (model, normalized query, chunk_id).
+# The ms-marco models are uncased, so lowercasing the query is safe.
+_score_cache: LRUCache[tuple[str, str, str], float] = LRUCache(
+    settings.RERANK_CACHE_SIZE, settings.RERANK_CACHE_TTL_SECONDS
+)
+
 
-def get_cross_encoder() -> CrossEncoder:
-    """Get or initialize the cross-encoder model (singleton)."""
-    global _cross_encoder
-    if _cross_encoder is None:
-        _cross_encoder = CrossEncoder(CROSS_ENCODER_MODEL)
-    return _cross_encoder
+def get_cross_encoder(model_name: str = CROSS_ENCODER_MODEL) -> CrossEncoder:
+    """Get or initialize a cross-encoder model for the configured inference backend."""
+    if model_name not in _cross_encoders:
+        with _cross_encoders_lock:
+            if model_name not in _cross_encoders:
+                if settings.INFERENCE_BACKEND == "onnx":
+                    # Quantized int8 export; same predict() interface as CrossEncoder
+                    from app.services.onnx_inference import OnnxCrossEncoder
 
+                    _cross_encoders[model_name] = OnnxCrossEncoder(model_name)
+                else:
+                    _cross_encoders[model_name] = CrossEncoder(model_name)
+    return _cross_encoders[model_name]
 
-def rerank_chunks(
+
+def _get_batcher(model_name: str) -> MicroBatcher[tuple[str, str], float]:
+    """Get or create the micro-batcher for a cross-encoder model."""
+    if model_name not in _batchers:
+
+        def predict_batch(pairs: list[tuple[str, str]]) -> list[float]:
+            model = get_cross_encoder(model_name)
+            scores = model.predict(pairs, batch_size=settings.INFERENCE_MAX_BATCH_SIZE)
+            return [float(score) for score in scores]
+
+        _batchers[model_name] = MicroBatcher(
+            predict_batch,
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.INFERENCE_BATCH_WAIT_MS,
+        )
+    return _batchers[model_name]
+
+
+async def score_pairs(
+    model_name: str,
+    query: str,
+    chunks: list[RetrievedChunk],
+) -> list[float]:
+    """
+    Raw cross-encoder scores for (query, chunk) pairs, in chunk order.
+
+    Reuses cached scores; only uncached pairs go through the model.
+    """
+    return (await score_pairs_batch(model_name, [query], [chunks]))[0]
+
+
+async def score_pairs_batch(
+    model_name: str,
+    queries: list[str],
+    chunk_lists: list[list[RetrievedChunk]],
+) -> list[list[float]]:
+    """
+    Raw cross-encoder scores for several queries' candidates, one list per query.
+
+    Uncached pairs from every query are scored in a single submission, so
+    bulk workloads run the model on large batches.
+    """
+    keys: list[tuple[str, str, str]] = []
+    for query, chunks in zip(queries, chunk_lists, strict=True):
+        query_key = normalize_cache_key(query)
+        keys.extend((model_name, query_key, chunk.chunk_id) for chunk in chunks)
+    pairs = [
+        (query, chunk.text_content)
+        for query, chunks in zip(queries, chunk_lists, strict=True)
+        for chunk in chunks
+    ]
+
+    cached = [_score_cache.get(key) for key in keys]
+    missing = [i for i, score in enumerate(cached) if score is None]
+    computed: dict[int, float] = {}
+
+    if missing:
+        # Scored on the inference pool, batched with concurrent requests
+        new_scores = await _get_batcher(model_name).submit([pairs[i] for i in missing])
+        for i, score in zip(missing, new_scores, strict=True):
+            computed[i] = score
+            _score_cache.set(keys[i], score)
+    scores = [score if score is not None else computed[i] for i, score in enumerate(cached)]
+
+    # Split back into one list per query
+    results = []
+    offset = 0
+    for chunks in chunk_lists:
+        results.append(scores[offset:offset + len(chunks)])
+        offset += len(chunks)
+    return results
+
+
+async def rerank_chunks(
     query: str,
     chunks: list[RetrievedChunk],
     top_k: int = 8,
@@ -29,7 +127,12 @@ def rerank_chunks(
     Rerank retrieved chunks using a cross-encoder model.
 
     Cross-encoders jointly encode (query, document) pairs and produce
-    more accurate relevance scores than bi-encoder similarity.
+    more accurate relevance scores than bi-encoder similarity. Scores are
+    memoized per (query, chunk), so repeat questions only score new chunks.
+
+    With RERANK_CASCADE_ENABLED, the L-6 model scores the whole pool and only
+    the top RERANK_CASCADE_TOP_N go to L-12. Final ordering and scores come
+    from L-12 either way.
 
     Args:
         query: The user's query
@@ -39,20 +142,50 @@ def rerank_chunks(
     Returns:
         Reranked list of chunks (top_k), sorted by cross-encoder score
     """
-    if not chunks:
-        return []
-
-    if len(chunks) <= 1:
-        return chunks
+    return (await rerank_chunks_batch([query], [chunks], top_k))[0]
 
-    model = get_cross_encoder()
-
-    # Create query-document pairs for the cross-encoder
-    pairs = [(query, chunk.text_content) for chunk in chunks]
-
-    # Get relevance scores from cross-encoder
-    scores = model.predict(pairs)
 
+async def rerank_chunks_batch(
+    queries: list[str],
+    chunk_lists: list[list[RetrievedChunk]],
+    top_k: int = 8,
+) -> list[list[RetrievedChunk]]:
+    """Rerank candidates for several queries, scoring all pairs together (see rerank_chunks)."""
+    results: list[list[RetrievedChunk]] = [list(chunks) for chunks in chunk_lists]
+
+    # Single candidates are returned as-is
+    to_score = [i for i, chunks in enumerate(chunk_lists) if len(chunks) > 1]
+    if not to_score:
+        return results
+    pools = {i: chunk_lists[i] for i in to_score}
+
+    # Cascade: a fast cross-encoder narrows the pool before the expensive one
+    cascade_size = max(settings.RERANK_CASCADE_TOP_N, top_k)
+    if settings.RERANK_CASCADE_ENABLED:
+        to_prefilter = [i for i in to_score if len(pools[i]) > cascade_size]
+        prefilter_scores = await score_pairs_batch(
+            PREFILTER_CROSS_ENCODER_MODEL,
+            [queries[i] for i in to_prefilter],
+            [pools[i] for i in to_prefilter],
+        )
+        for i, scores in zip(to_prefilter, prefilter_scores, strict=True):
+            survivors = sorted(
+                range(len(pools[i])), key=lambda j: scores[j], reverse=True
+            )[:cascade_size]
+            pools[i] = [pools[i][j] for j in sorted(survivors)]
+
+    all_scores = await score_pairs_batch(
+        CROSS_ENCODER_MODEL, [queries[i] for i in to_score], [pools[i] for i in to_score]
+    )
+    for i, scores in zip(to_score, all_scores, strict=True):
+        results[i] = _top_by_score(pools[i], scores, top_k)
+    return results
+
+
+def _top_by_score(
+    chunks: list[RetrievedChunk], scores: list[float], top_k: int
+) -> list[RetrievedChunk]:
+    """Sort chunks by cross-encoder score and keep top_k with sigmoid-normalized scores."""
     # Pair chunks with their scores and sort
     scored_chunks = list(zip(chunks, scores))
     scored_chunks.sort(key=lambda x: x[1], reverse=True)
@@ -63,18 +196,19 @@ def rerank_chunks(
         # Cross-encoder scores are typically in [-10, 10] range
         # Normalize to [0, 1] for consistency
         normalized_score = 1 / (1 + 2.718281828 ** (-score))  # sigmoid
-        reranked.append(
-            RetrievedChunk(
-                chunk_id=chunk.chunk_id,
-                document_id=chunk.document_id,
-                document_name=chunk.document_name,
-                page_number=chunk.page_number,
-                text_content=chunk.text_content,
-                similarity=normalized_score,
-            )
-        )
+        reranked.append(replace(chunk, similarity=normalized_score))
 
     return reranked
 
 
+def invalidate_rerank_scores(chunk_ids: list[str]) -> None:
+    """Drop cached scores for deleted chunks."""
+    deleted = set(chunk_ids)
+    removed = _score_cache.remove_if(lambda key: key[2] in deleted)
+    if removed:
+        print(f"[RERANKER] Invalidated {removed} cached scores")
+
 
+def get_rerank_cache_stats() -> dict[str, float]:
+    """Hit/miss counters for the cross-encoder score cache."""
+    return _score_cache.stats()
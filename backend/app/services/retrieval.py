@@ -1,13 +1,26 @@
 """Retrieval service for hybrid search (vector + BM25) with query expansion."""
 
-import re
+import asyncio
 from dataclasses import dataclass
+from typing import Any
 
-from rank_bm25 import BM25Okapi
+import numpy as np
+import numpy.typing as npt
+from fastapi.concurrency import run_in_threadpool
 
 from app.config import settings
-from app.core.vector_store import VectorStore
-from app.services.embeddings import embed_text, embed_texts
+from app.core.database import SessionLocal, run_db
+from app.core.vector_store import RRF_MAX_SCORE, TEXT_PAYLOAD_FIELD, SearchFilter, VectorStore
+from app.models.database import DocumentChunk
+from app.services.chunk_store import get_chunk_store
+from app.services.embeddings import embed_queries_async
+from app.services.lexical import (
+    bm25_scores,
+    build_query_sparse_vector,
+    cache_chunk_token_ids,
+    lookup_chunk_token_ids,
+    token_ids,
+)
 from app.services.query_expander import expand_query
 
 
@@ -20,56 +33,138 @@ class RetrievedChunk:
     document_name: str
     page_number: int | None
     text_content: str
-    similarity: float
-
-
-def tokenize(text: str) -> list[str]:
-    """Simple tokenizer for BM25: lowercase, split on non-alphanumeric."""
-    text = text.lower()
-    tokens = re.findall(r"\b[a-z0-9]+\b", text)
-    return tokens
+    similarity: float  # 0-1 relevance: cosine, scaled RRF or reranker score
+    start_char: int | None = None  # Span in the extracted document text (None for older chunks)
+    end_char: int | None = None
 
 
 class RetrieverService:
     """Handles hybrid search with query expansion, vector similarity, and BM25."""
 
-    def __init__(self) -> None:
-        """Initialize retriever service."""
-        self.vector_store = VectorStore()
+    def __init__(self, vector_store: VectorStore) -> None:
+        """Initialize retriever service with the shared vector store."""
+        self.vector_store = vector_store
 
     async def retrieve(
         self,
         query: str,
         top_k: int = 10,
         similarity_threshold: float = 0.30,  # Lower threshold for better recall on statistics
+        search_filter: SearchFilter | None = None,
     ) -> list[RetrievedChunk]:
         """
         Retrieve most relevant document chunks using hybrid search with query expansion.
 
         Strategy:
-        1. Expand query into 2-3 variations (synonyms, related terms)
+        1. Expand query into 2-3 variations (synonyms, related terms), while
+           the original query is already being searched
         2. Fetch candidates from vector search for each query variation
         3. Dedupe and merge results
         4. Score with BM25 using all query variations
         5. Combine scores using Reciprocal Rank Fusion (RRF)
         6. Return top_k results
-        """
-        # Expand query for better recall
-        query_variations = expand_query(query)
-        print(f"[RETRIEVAL] Query variations: {query_variations}")
 
+        On collections with sparse vectors, steps 2-5 run inside Qdrant:
+        each variation is a single dense + lexical prefetch query fused with
+        RRF, so lexical matches come from the whole corpus.
+
+        search_filter scopes every search (dense and lexical) to matching
+        documents inside Qdrant, so BM25 also only sees in-scope chunks.
+        """
         # Get candidates from vector search for each query variation
         candidate_count_per_query = max(top_k * 3, 15)
-        all_results: dict[str, dict] = {}  # chunk_id -> result (dedupe)
-        best_vector_scores: dict[str, float] = {}  # chunk_id -> best vector score
+        hybrid = self.vector_store.hybrid_enabled
+
+        # Query expansion runs concurrently with a speculative search on the original query
+        query_variations, batch_results = await self._search_with_expansion(
+            query,
+            top_k=candidate_count_per_query,
+            # Server-side fusion applies the cosine threshold on the dense prefetch
+            score_threshold=similarity_threshold if hybrid else None,
+            search_filter=search_filter,
+        )
+
+        return await self._rank_candidates(
+            query_variations, batch_results, top_k, similarity_threshold
+        )
+
+    async def retrieve_batch(
+        self,
+        queries: list[str],
+        top_k: int = 10,
+        similarity_threshold: float = 0.30,
+        max_concurrent_expansions: int = 4,
+        search_filters: list[SearchFilter | None] | None = None,
+    ) -> list[list[RetrievedChunk]]:
+        """
+        Retrieve chunks for many queries at once (bulk evaluation, offline jobs).
 
-        # Embed all query variations at once for efficiency
-        query_embeddings = embed_texts(query_variations)
+        Queries are expanded concurrently (at most max_concurrent_expansions
+        LLM calls at a time), every variation is embedded in
+        one call and searched in one batch request, then each query is ranked
+        exactly as retrieve() would rank it. search_filters optionally holds
+        one filter per query.
+        """
+        if not queries:
+            return []
 
-        for q_text, q_embedding in zip(query_variations, query_embeddings):
-            results = self.vector_store.search(
-                query_vector=q_embedding, top_k=candidate_count_per_query
+        candidate_count_per_query = max(top_k * 3, 15)
+        hybrid = self.vector_store.hybrid_enabled
+
+        semaphore = asyncio.Semaphore(max_concurrent_expansions)
+
+        async def expand(query: str) -> list[str]:
+            async with semaphore:
+                return await self._expand_with_timeout(query)
+
+        all_variations = await asyncio.gather(*(expand(query) for query in queries))
+        flat_texts = [text for variations in all_variations for text in variations]
+        flat_filters = (
+            [
+                search_filters[i]
+                for i, variations in enumerate(all_variations)
+                for _ in variations
+            ]
+            if search_filters is not None
+            else None
+        )
+        flat_results = await self._search_texts(
+            flat_texts,
+            top_k=candidate_count_per_query,
+            score_threshold=similarity_threshold if hybrid else None,
+            search_filters=flat_filters,
+        )
+
+        retrieved = []
+        offset = 0
+        for variations in all_variations:
+            batch_results = flat_results[offset:offset + len(variations)]
+            offset += len(variations)
+            retrieved.append(
+                await self._rank_candidates(
+                    variations, batch_results, top_k, similarity_threshold
+                )
             )
+        return retrieved
+
+    async def _rank_candidates(
+        self,
+        query_variations: list[str],
+        batch_results: list[list[dict[str, Any]]],
+        top_k: int,
+        similarity_threshold: float,
+    ) -> list[RetrievedChunk]:
+        """
+        Merge per-variation search results and rank them (server-side or BM25 + RRF).
+
+        Search results carry no chunk text; texts are loaded only for chunks
+        that need tokenizing for BM25 and for the final top_k.
+        """
+        hybrid = self.vector_store.hybrid_enabled
+        all_results: dict[str, dict[str, Any]] = {}  # chunk_id -> result (dedupe)
+        best_vector_scores: dict[str, float] = {}  # chunk_id -> best vector score
+
+        for results in batch_results:
             for r in results:
                 chunk_id = r["id"]
                 # Keep result and track best vector score across queries
@@ -81,94 +176,254 @@ class RetrieverService:
                         best_vector_scores[chunk_id], r["score"]
                     )
 
+        if hybrid:
+            return await self._rank_fused(all_results, best_vector_scores, top_k)
+
         if not all_results:
             print("[RETRIEVAL] No results from vector search")
             return []
 
+        chunk_ids = list(all_results)
+        vector_scores = np.fromiter(
+            (best_vector_scores[cid] for cid in chunk_ids), dtype=np.float64, count=len(chunk_ids)
+        )
+
         # Debug: show top scores before filtering
         top_scores = sorted(best_vector_scores.values(), reverse=True)[:5]
         print(f"[RETRIEVAL] Top 5 vector scores: {top_scores}")
         print(f"[RETRIEVAL] Threshold: {similarity_threshold}")
 
         # Filter by minimum threshold using best score
-        filtered_ids = [
-            cid for cid, score in best_vector_scores.items()
-            if score >= similarity_threshold
-        ]
+        passed = np.flatnonzero(vector_scores >= similarity_threshold)
 
-        if not filtered_ids:
+        if len(passed) == 0:
             print(f"[RETRIEVAL] All {len(all_results)} results filtered out by threshold")
             return []
         
-        print(f"[RETRIEVAL] {len(filtered_ids)} chunks passed threshold")
-
-        # Sort by best vector score for vector ranking
-        filtered_ids.sort(key=lambda x: best_vector_scores[x], reverse=True)
-        vector_results = [all_results[cid] for cid in filtered_ids]
-
-        # Extract texts for BM25
-        candidate_texts = [r["payload"]["text_content"] for r in vector_results]
-        tokenized_corpus = [tokenize(text) for text in candidate_texts]
-
-        # Build BM25 index and score using ALL query variations
-        bm25 = BM25Okapi(tokenized_corpus)
-
-        # Combine BM25 scores from all query variations (take max per doc)
-        combined_bm25_scores = [0.0] * len(vector_results)
-        for q_text in query_variations:
-            query_tokens = tokenize(q_text)
-            scores = bm25.get_scores(query_tokens)
-            for i, score in enumerate(scores):
-                combined_bm25_scores[i] = max(combined_bm25_scores[i], score)
-
-        # Create ranked lists for RRF
-        vector_ranks = {r["id"]: rank for rank, r in enumerate(vector_results)}
-
-        # BM25 ranking (sort by combined score descending)
-        bm25_ranked_indices = sorted(
-            range(len(combined_bm25_scores)),
-            key=lambda i: combined_bm25_scores[i],
-            reverse=True,
-        )
-        bm25_ranks = {
-            vector_results[idx]["id"]: rank
-            for rank, idx in enumerate(bm25_ranked_indices)
-        }
+        print(f"[RETRIEVAL] {len(passed)} chunks passed threshold")
+
+        # Sort by best vector score for vector ranking (stable, like sorted())
+        passed = passed[np.argsort(-vector_scores[passed], kind="stable")]
+        vector_results = [all_results[chunk_ids[i]] for i in passed]
+
+        # BM25 over the candidates using cached token ids, all variations in one pass
+        cached = [lookup_chunk_token_ids(r["id"]) for r in vector_results]
+        untokenized = [
+            r for r, tokens in zip(vector_results, cached, strict=True) if tokens is None
+        ]
+        texts = await self._load_texts(untokenized) if untokenized else {}
+        doc_tokens = [
+            tokens if tokens is not None else self._chunk_token_ids(r["id"], texts)
+            for r, tokens in zip(vector_results, cached, strict=True)
+        ]
+        variation_scores = bm25_scores(doc_tokens, [token_ids(q) for q in query_variations])
+
+        # Combine BM25 scores from all query variations (take max per doc, floor at 0)
+        combined_bm25_scores = np.maximum(variation_scores.max(axis=1), 0.0)
+
+        # Ranks for RRF: vector rank is the position, BM25 rank by combined score descending
+        num_results = len(vector_results)
+        vector_ranks = np.arange(num_results)
+        bm25_ranks = np.empty(num_results, dtype=np.int64)
+        bm25_ranks[np.argsort(-combined_bm25_scores, kind="stable")] = vector_ranks
 
         # Reciprocal Rank Fusion with k=60 (standard parameter)
         rrf_k = 60
-        fused_scores = {}
-        for result in vector_results:
-            doc_id = result["id"]
-            vector_rank = vector_ranks.get(doc_id, len(vector_results))
-            bm25_rank = bm25_ranks.get(doc_id, len(vector_results))
-
-            # RRF formula: sum of 1/(k + rank) for each ranking
-            rrf_score = (1 / (rrf_k + vector_rank)) + (1 / (rrf_k + bm25_rank))
-            fused_scores[doc_id] = rrf_score
+        fused_scores = 1 / (rrf_k + vector_ranks) + 1 / (rrf_k + bm25_ranks)
 
         # Sort by fused score and take top_k
-        sorted_ids = sorted(
-            fused_scores.keys(), key=lambda x: fused_scores[x], reverse=True
+        top_indices = np.argsort(-fused_scores, kind="stable")[:top_k]
+
+        # Use RRF score normalized to 0-1 range for display
+        return await self._to_chunks(
+            [(vector_results[i], min(float(fused_scores[i]) * 30, 1.0)) for i in top_indices]
         )
 
-        # Build final result list
-        id_to_result = {r["id"]: r for r in vector_results}
-        chunks = []
-
-        for doc_id in sorted_ids[:top_k]:
-            result = id_to_result[doc_id]
-            payload = result["payload"]
-            chunks.append(
-                RetrievedChunk(
-                    chunk_id=doc_id,
-                    document_id=payload["document_id"],
-                    document_name=payload["document_name"],
-                    page_number=payload.get("page_number"),
-                    text_content=payload["text_content"],
-                    # Use RRF score normalized to 0-1 range for display
-                    similarity=min(fused_scores[doc_id] * 30, 1.0),
-                )
+    async def _search_with_expansion(
+        self,
+        query: str,
+        top_k: int,
+        score_threshold: float | None,
+        search_filter: SearchFilter | None = None,
+    ) -> tuple[list[str], list[list[dict[str, Any]]]]:
+        """
+        Search the original query while query expansion is still in flight.
+
+        The original query is embedded and searched speculatively; only the
+        alternative phrasings are searched once expansion returns. If expansion
+        takes longer than QUERY_EXPANSION_TIMEOUT_S, retrieval continues with
+        the original query alone.
+
+        Returns (query_variations, one result list per variation).
+        """
+        expansion = asyncio.create_task(self._expand_with_timeout(query))
+
+        try:
+            original_results = await self._search_texts(
+                [query], top_k, score_threshold, [search_filter]
             )
+        except Exception:
+            expansion.cancel()
+            raise
+
+        query_variations = await expansion
+
+        alternatives = query_variations[1:]
+        if not alternatives:
+            return query_variations, original_results
+
+        alternative_results = await self._search_texts(
+            alternatives, top_k, score_threshold, [search_filter] * len(alternatives)
+        )
+        return query_variations, original_results + alternative_results
+
+    async def _expand_with_timeout(self, query: str) -> list[str]:
+        """Expand a query, falling back to the original alone after QUERY_EXPANSION_TIMEOUT_S."""
+        try:
+            query_variations = await asyncio.wait_for(
+                expand_query(query), timeout=settings.QUERY_EXPANSION_TIMEOUT_S
+            )
+        except TimeoutError:
+            print(
+                f"[RETRIEVAL] Query expansion timed out after "
+                f"{settings.QUERY_EXPANSION_TIMEOUT_S}s, using original query only"
+            )
+            query_variations = [query]
+        print(f"[RETRIEVAL] Query variations: {query_variations}")
+        return query_variations
+
+    async def _search_texts(
+        self,
+        texts: list[str],
+        top_k: int,
+        score_threshold: float | None,
+        search_filters: list[SearchFilter | None] | None = None,
+    ) -> list[list[dict[str, Any]]]:
+        """Embed texts and search them in one batch (hybrid when the collection supports it)."""
+        # Embed all texts at once for efficiency
+        embeddings = await embed_queries_async(texts)
+        sparse_vectors = (
+            [build_query_sparse_vector(t) for t in texts]
+            if self.vector_store.hybrid_enabled
+            else None
+        )
+        return await self.vector_store.search_batch(
+            query_vectors=embeddings,
+            top_k=top_k,
+            sparse_vectors=sparse_vectors,
+            score_threshold=score_threshold,
+            search_filters=search_filters,
+        )
 
-        return chunks
+    async def _rank_fused(
+        self,
+        all_results: dict[str, dict[str, Any]],
+        best_fused_scores: dict[str, float],
+        top_k: int,
+    ) -> list[RetrievedChunk]:
+        """Rank candidates by their best Qdrant-fused (dense + sparse RRF) score."""
+        if not all_results:
+            print("[RETRIEVAL] No results from hybrid search")
+            return []
+
+        print(f"[RETRIEVAL] {len(all_results)} chunks from hybrid search")
+
+        sorted_ids = sorted(
+            best_fused_scores.keys(), key=lambda x: best_fused_scores[x], reverse=True
+        )
+
+        # RRF scores are rank-based, not cosine similarity; scale them to 0-1
+        # like the client-side fusion does, so both paths report alike
+        return await self._to_chunks(
+            [
+                (all_results[doc_id], min(best_fused_scores[doc_id] / RRF_MAX_SCORE, 1.0))
+                for doc_id in sorted_ids[:top_k]
+            ]
+        )
+
+    async def _load_texts(self, results: list[dict[str, Any]]) -> dict[str, str]:
+        """
+        Chunk texts for search results, keyed by chunk id.
+
+        Texts come from the local chunk store (read and written in the
+        threadpool - mmap reads, SQLite and fsync). Points ingested before
+        the store existed still have their text in Qdrant; anything neither
+        has (e.g. a chunk store lost with its host) is read from the chunk
+        rows in Postgres. Texts found either way are copied into the store.
+        """
+        texts = {
+            r["id"]: r["payload"][TEXT_PAYLOAD_FIELD]
+            for r in results
+            if TEXT_PAYLOAD_FIELD in r["payload"]
+        }
+        missing = [r["id"] for r in results if r["id"] not in texts]
+        if not missing:
+            return texts
+
+        chunk_store = get_chunk_store()
+        texts.update(await run_in_threadpool(chunk_store.get_many, missing))
+        missing = [chunk_id for chunk_id in missing if chunk_id not in texts]
+        if missing:
+            payloads = await self.vector_store.fetch_payloads(missing, [TEXT_PAYLOAD_FIELD])
+            found = {
+                chunk_id: payload[TEXT_PAYLOAD_FIELD]
+                for chunk_id, payload in payloads.items()
+                if TEXT_PAYLOAD_FIELD in payload
+            }
+            not_in_qdrant = [chunk_id for chunk_id in missing if chunk_id not in found]
+            if not_in_qdrant:
+                found.update(await run_db(_chunk_texts_from_db, not_in_qdrant))
+            await run_in_threadpool(chunk_store.put_many, list(found.items()))
+            texts.update(found)
+            if len(found) < len(missing):
+                print(f"[RETRIEVAL] No text found for {len(missing) - len(found)} chunks")
+        return texts
+
+    @staticmethod
+    def _chunk_token_ids(chunk_id: str, texts: dict[str, str]) -> npt.NDArray[np.int64]:
+        """Tokenize and cache a chunk's text; a chunk whose text didn't load matches nothing."""
+        if chunk_id not in texts:
+            # Not cached, so the next query tries to load the text again
+            return np.zeros(0, dtype=np.int64)
+        return cache_chunk_token_ids(chunk_id, texts[chunk_id])
+
+    async def _to_chunks(self, ranked: list[tuple[dict[str, Any], float]]) -> list[RetrievedChunk]:
+        """Build RetrievedChunks for ranked (result, similarity) pairs, loading their texts."""
+        texts = await self._load_texts([result for result, _ in ranked])
+        return [
+            self._to_chunk(result, similarity, texts[result["id"]])
+            for result, similarity in ranked
+            if result["id"] in texts
+        ]
+
+    @staticmethod
+    def _to_chunk(result: dict[str, Any], similarity: float, text_content: str) -> RetrievedChunk:
+        """Build a RetrievedChunk from a vector store result."""
+        payload = result["payload"]
+        return RetrievedChunk(
+            chunk_id=result["id"],
+            document_id=payload["document_id"],
+            document_name=payload["document_name"],
+            page_number=payload.get("page_number"),
+            text_content=text_content,
+            similarity=similarity,
+            start_char=payload.get("start_char"),
+            end_char=payload.get("end_char"),
+        )
+
+
+def _chunk_texts_from_db(chunk_ids: list[str]) -> dict[str, str]:
+    """Chunk texts from the chunk rows in Postgres, keyed by chunk (point) id."""
+    db = SessionLocal()
+    try:
+        texts: dict[str, str] = {}
+        for start in range(0, len(chunk_ids), 1000):
+            rows = (
+                db.query(DocumentChunk.embedding_id, DocumentChunk.text_content)
+                .filter(DocumentChunk.embedding_id.in_(chunk_ids[start:start + 1000]))
+                .all()
+            )
+            texts.update((chunk_id, text) for chunk_id, text in rows)
+        return texts
+    finally:
+        db.close()
@@ -0,0 +1,107 @@
+"""Small in-process caches shared by the query pipeline."""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def normalize_cache_key(text: str) -> str:
+    """Normalize free text for cache keys (case and whitespace insensitive)."""
+    return re.sub(r"\s+", " ", text.strip().lower())
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache with optional TTL and hit/miss counters.
+
+    Model calls run on executor threads, so every operation takes a lock.
+    Expired entries are dropped lazily when read.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float | None = None) -> None:
+        """Initialize cache with a size bound and optional time-to-live."""
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, stored_at: float) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds
+
+    def get(self, key: K) -> V | None:
+        """Get a value and mark it recently used; counts a hit or a miss."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[0]):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def touch(self, key: K) -> None:
+        """Mark a key recently used without counting a hit or a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+
+    def pop(self, key: K) -> V | None:
+        """Remove a key and return its value if present."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry is not None else None
+
+    def remove_if(self, predicate: Callable[[K], bool]) -> int:
+        """Remove every entry whose key matches the predicate; returns how many."""
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def items(self) -> list[tuple[K, V]]:
+        """Snapshot of live entries (oldest first) without touching LRU order or stats."""
+        with self._lock:
+            expired = [k for k, (stored_at, _) in self._data.items() if self._expired(stored_at)]
+            for k in expired:
+                del self._data[k]
+            return [(k, v) for k, (_, v) in self._data.items()]
+
+    def clear(self) -> None:
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, float]:
+        """Hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._data),
+            "max_size": self.max_size,
+        }
@@ -0,0 +1,35 @@
+"""Apply the vector index settings from config to the existing Qdrant collection.
+
+Usage:
+    python scripts/apply_vector_settings.py
+
+New collections are created with VECTOR_QUANTIZATION, VECTORS_ON_DISK and
+HNSW_M / HNSW_EF_CONSTRUCT. Existing collections keep the settings they
+were created with until this is run. Qdrant rebuilds the index in the
+background and keeps serving searches meanwhile; the collection status
+stays "yellow" until optimization finishes. Search-time settings
+(HNSW_EF_SEARCH, rescoring, oversampling, gRPC) need no migration.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.vector_store import get_vector_store
+
+
+async def main() -> None:
+    """Update the collection and report its status."""
+    vector_store = await get_vector_store()
+    await vector_store.apply_index_settings()
+
+    info = await vector_store.client.get_collection(vector_store.collection_name)
+    print(f"[VECTOR_STORE] Collection status: {info.status}")
+    print(f"[VECTOR_STORE] Quantization: {info.config.quantization_config}")
+    print(f"[VECTOR_STORE] HNSW: {info.config.hnsw_config}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
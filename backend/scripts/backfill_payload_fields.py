@@ -0,0 +1,48 @@
+"""Add filter fields (file_type, uploaded_at) to points ingested before they existed.
+
+Usage:
+    python scripts/backfill_payload_fields.py
+
+Scoped queries filter on these payload fields, so points without them never
+match a file type or upload date filter. Safe to re-run.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+from app.core.database import SessionLocal
+from app.core.vector_store import get_vector_store, payload_timestamp
+from app.models.database import Document
+
+
+async def main() -> None:
+    """Set the filter fields on every document's points."""
+    vector_store = await get_vector_store()
+    db = SessionLocal()
+    try:
+        documents = db.query(Document).all()
+        for document in documents:
+            await vector_store.client.set_payload(
+                collection_name=vector_store.collection_name,
+                payload={
+                    "file_type": document.file_type,
+                    "uploaded_at": payload_timestamp(document.uploaded_at),
+                },
+                points=Filter(
+                    must=[
+                        FieldCondition(key="document_id", match=MatchValue(value=str(document.id)))
+                    ]
+                ),
+            )
+        print(f"[BACKFILL] Updated payload for {len(documents)} documents")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+"""Compare the vectorized BM25 + RRF ranking against the previous rank_bm25 loop.
+
+Usage:
+    python scripts/benchmark_bm25.py [--sizes 100 300 1000] [--repeats 20]
+
+Builds synthetic candidate pools from the sample passages and ranks them
+the way RetrieverService does on collections without sparse vectors, once
+with the previous per-request BM25Okapi implementation and once with
+RetrieverService._rank_candidates (cached token ids, one sparse product for
+all query variations, array-based fusion). Reports per-query latency for
+both and checks that the rankings are identical.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import statistics
+import sys
+import time
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from rank_bm25 import BM25Okapi
+
+from app.services.lexical import cache_chunk_token_ids, tokenize
+from app.services.retrieval import RetrieverService
+from scripts.sample_data import PASSAGES, QUERIES
+
+
+def build_pool(size: int, rng: random.Random) -> list[dict]:
+    """Synthetic vector-search results: passages spliced together, random scores."""
+    words = " ".join(PASSAGES).split()
+    pool = []
+    for i in range(size):
+        length = rng.randint(40, 120)
+        start = rng.randrange(len(words))
+        text = " ".join(words[(start + j) % len(words)] for j in range(length))
+        pool.append(
+            {
+                "id": f"chunk-{size}-{i}",
+                "score": round(rng.uniform(0.3, 0.9), 3),
+                "payload": {
+                    "document_id": "sample",
+                    "document_name": "sample",
+                    "text_content": text,
+                },
+            }
+        )
+    return pool
+
+
+def previous_ranking(pool: list[dict], variations: list[str], top_k: int) -> list[str]:
+    """The previous implementation: tokenize + BM25Okapi per request, Python fusion."""
+    vector_results = sorted(pool, key=lambda r: r["score"], reverse=True)
+
+    tokenized_corpus = [tokenize(r["payload"]["text_content"]) for r in vector_results]
+    bm25 = BM25Okapi(tokenized_corpus)
+
+    combined_bm25_scores = [0.0] * len(vector_results)
+    for q_text in variations:
+        scores = bm25.get_scores(tokenize(q_text))
+        for i, score in enumerate(scores):
+            combined_bm25_scores[i] = max(combined_bm25_scores[i], score)
+
+    vector_ranks = {r["id"]: rank for rank, r in enumerate(vector_results)}
+    bm25_ranked_indices = sorted(
+        range(len(combined_bm25_scores)),
+        key=lambda i: combined_bm25_scores[i],
+        reverse=True,
+    )
+    bm25_ranks = {vector_results[idx]["id"]: rank for rank, idx in enumerate(bm25_ranked_indices)}
+
+    fused_scores = {
+        r["id"]: 1 / (60 + vector_ranks[r["id"]]) + 1 / (60 + bm25_ranks[r["id"]])
+        for r in vector_results
+    }
+    return sorted(fused_scores, key=lambda x: fused_scores[x], reverse=True)[:top_k]
+
+
+def vectorized_ranking(
+    loop: asyncio.AbstractEventLoop,
+    retriever: RetrieverService,
+    pool: list[dict],
+    variations: list[str],
+    top_k: int,
+) -> list[str]:
+    """The current implementation (debug prints suppressed)."""
+    batch_results = [pool]
+    with contextlib.redirect_stdout(io.StringIO()):
+        chunks = loop.run_until_complete(
+            retriever._rank_candidates(variations, batch_results, top_k, 0.0)
+        )
+    return [c.chunk_id for c in chunks]
+
+
+def time_ms(func, repeats: int) -> float:
+    """Median wall time of func() in milliseconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def main() -> None:
+    """Benchmark each pool size and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300, 1000])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    rng = random.Random(0)
+    retriever = RetrieverService(SimpleNamespace(hybrid_enabled=False))
+    # Original query plus two expansion-style variations
+    variations = [QUERIES[1], "Lalitha scholarship fund eligibility", "merit based financial aid"]
+
+    for size in args.sizes:
+        pool = build_pool(size, rng)
+        top_k = size
+
+        expected = previous_ranking(pool, variations, top_k)
+        actual = vectorized_ranking(loop, retriever, pool, variations, top_k)
+        identical = expected == actual
+
+        previous_ms = time_ms(partial(previous_ranking, pool, variations, top_k), args.repeats)
+        # Token ids are normally cached at ingestion; warm them like the ingestion path does
+        for r in pool:
+            cache_chunk_token_ids(r["id"], r["payload"]["text_content"])
+        vectorized_ms = time_ms(
+            partial(vectorized_ranking, loop, retriever, pool, variations, top_k), args.repeats
+        )
+
+        print(
+            f"[BM25] {size:>5} candidates: previous {previous_ms:7.2f} ms, "
+            f"vectorized {vectorized_ms:6.2f} ms ({previous_ms / vectorized_ms:.1f}x), "
+            f"identical ranking: {identical}"
+        )
+
+
+if __name__ == "__main__":
+    main()
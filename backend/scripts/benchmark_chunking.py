@@ -0,0 +1,135 @@
+"""Show that sentence splitting and chunking scale linearly with document size.
+
+Usage:
+    python scripts/benchmark_chunking.py [--sizes-mb 1 2 4 8] [--compare-mb 0.5 1 2]
+
+Builds multi-megabyte TXT-style inputs from the sample passages and times
+DocumentProcessor.chunk_text_by_sentences at CHUNK_SIZE/CHUNK_OVERLAP; with
+linear scaling the time per MB stays flat as the input grows. For the
+smaller --compare-mb sizes it also runs the previous splitter (which
+sliced the rest of the document at every candidate boundary) and checks
+that both produce the same sentences.
+"""
+
+import argparse
+import functools
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services.document_processor import ABBREVIATIONS, DocumentProcessor
+from scripts.sample_data import PASSAGES
+
+
+def build_text(size_bytes: int) -> str:
+    """Sample passages repeated as paragraphs until the text reaches size_bytes."""
+    parts = []
+    total = 0
+    i = 0
+    while total < size_bytes:
+        passage = PASSAGES[i % len(PASSAGES)]
+        parts.append(f"Section {i}. {passage}")
+        total += len(passage) + 16
+        i += 1
+    return "\n\n".join(parts)
+
+
+def previous_is_sentence_boundary(text: str, pos: int) -> bool:
+    """The previous boundary check: copies text[pos:] on every call."""
+    if pos >= len(text):
+        return True
+    remaining = text[pos:]
+    if not remaining or not remaining[0].isspace():
+        return False
+    next_char_idx = 0
+    for i, c in enumerate(remaining):
+        if not c.isspace():
+            next_char_idx = i
+            break
+    else:
+        return False
+    next_char = remaining[next_char_idx]
+    if not (next_char.isupper() or next_char.isdigit() or next_char in '"\'(['):
+        return False
+    word_end = pos - 1
+    if word_end < 0:
+        return True
+    word_start = word_end
+    while word_start > 0 and text[word_start - 1].isalpha():
+        word_start -= 1
+    word = text[word_start:word_end].lower()
+    if word in ABBREVIATIONS:
+        return False
+    if len(word) == 1 and word.isalpha():
+        return False
+    return True
+
+
+def previous_split_into_sentences(text: str) -> list[str]:
+    """The previous splitter: a per-character loop over the quadratic boundary check."""
+    text = re.sub(r"\s+", " ", text.strip())
+    if not text:
+        return []
+    sentences = []
+    current_start = 0
+    for i, char in enumerate(text):
+        if char in ".!?":
+            if previous_is_sentence_boundary(text, i + 1):
+                sentence = text[current_start:i + 1].strip()
+                if sentence:
+                    sentences.append(sentence)
+                current_start = i + 1
+                while current_start < len(text) and text[current_start].isspace():
+                    current_start += 1
+    if current_start < len(text):
+        remaining = text[current_start:].strip()
+        if remaining:
+            sentences.append(remaining)
+    return sentences if sentences else [text]
+
+
+def time_s(func) -> float:
+    """Wall time of one func() call in seconds."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Time each size and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--compare-mb", type=float, nargs="+", default=[0.5, 1, 2])
+    args = parser.parse_args()
+
+    processor = DocumentProcessor.__new__(DocumentProcessor)  # chunking needs no db/vector store
+
+    for size_mb in args.compare_mb:
+        text = build_text(int(size_mb * 1024 * 1024))
+        previous_s = time_s(functools.partial(previous_split_into_sentences, text))
+        current_s = time_s(functools.partial(processor.split_into_sentences, text))
+        identical = previous_split_into_sentences(text) == processor.split_into_sentences(text)
+        print(
+            f"[CHUNKING] split {size_mb:>4} MB: previous {previous_s:7.2f}s, "
+            f"current {current_s:5.2f}s, identical sentences: {identical}"
+        )
+
+    for size_mb in args.sizes_mb:
+        text = build_text(int(size_mb * 1024 * 1024))
+        start = time.perf_counter()
+        chunks = processor.chunk_text_by_sentences(
+            text, settings.CHUNK_SIZE, settings.CHUNK_OVERLAP
+        )
+        elapsed = time.perf_counter() - start
+        print(
+            f"[CHUNKING] chunk {size_mb:>4} MB: {elapsed:6.2f}s ({elapsed / size_mb:.2f} s/MB), "
+            f"{len(chunks)} chunks"
+        )
+
+
+if __name__ == "__main__":
+    main()
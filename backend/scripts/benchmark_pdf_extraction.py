@@ -0,0 +1,65 @@
+"""Time serial vs parallel PDF extraction and check that the output is identical.
+
+Usage:
+    python scripts/benchmark_pdf_extraction.py [PDF ...] [--processes 2 4] [--min-pages 1]
+
+Defaults to every PDF in docs/. For each file, extracts once in-process and
+once per --processes value (page ranges across worker processes), then
+reports wall time and whether text and page breaks match the serial pass.
+Expect a speedup only for PDFs with more pages than PDF_PARALLEL_MIN_PAGES
+and only up to the number of cores.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.pdf_extraction import extract_pdf_text, get_extraction_pool
+
+DOCS_DIR = Path(__file__).resolve().parents[2] / "docs"
+
+
+def main() -> None:
+    """Benchmark each PDF and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", type=Path)
+    parser.add_argument("--processes", type=int, nargs="+", default=[2, os.cpu_count() or 1])
+    parser.add_argument(
+        "--min-pages", type=int, default=1, help="Parallelize PDFs with at least this many pages"
+    )
+    args = parser.parse_args()
+
+    pdfs = args.pdfs or sorted(DOCS_DIR.glob("*.pdf"))
+    process_counts = sorted({p for p in args.processes if p > 1})
+    print(f"[PDF] {os.cpu_count()} cores available")
+
+    # Start the workers up front so spawn time isn't counted against the first file
+    for processes in process_counts:
+        get_extraction_pool(processes).submit(os.getpid).result()
+
+    for pdf in pdfs:
+        start = time.perf_counter()
+        expected = extract_pdf_text(str(pdf), processes=1)
+        serial_s = time.perf_counter() - start
+        report = [f"serial {serial_s:6.2f}s"]
+
+        for processes in process_counts:
+            start = time.perf_counter()
+            actual = extract_pdf_text(
+                str(pdf), processes=processes, min_parallel_pages=args.min_pages
+            )
+            parallel_s = time.perf_counter() - start
+            report.append(
+                f"{processes} procs {parallel_s:6.2f}s ({serial_s / parallel_s:.1f}x, "
+                f"identical: {actual == expected})"
+            )
+
+        print(f"[PDF] {pdf.name} ({len(expected[1])} pages): " + ", ".join(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Compare full L-12 reranking against the L-6 -> L-12 cascade.
+
+Usage:
+    python scripts/benchmark_rerank_cascade.py [--top-n 12] [--top-k 5] [--queries-file queries.txt]
+
+Without --queries-file, the bundled sample queries are reranked against the
+sample passages. With it, candidates for each query (one per line) come from
+live retrieval (CANDIDATE_POOL_SIZE chunks from Qdrant), as in POST /query.
+Reports rerank latency for both modes and the ranking effect of the cascade:
+overlap of the top-k sets and top-1 agreement.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services.reranker import (
+    CROSS_ENCODER_MODEL,
+    PREFILTER_CROSS_ENCODER_MODEL,
+    get_cross_encoder,
+    invalidate_rerank_scores,
+    rerank_chunks,
+)
+from app.services.retrieval import RetrievedChunk
+from scripts.sample_data import PASSAGES, QUERIES
+
+
+async def load_candidates(queries_file: str | None) -> list[tuple[str, list[RetrievedChunk]]]:
+    """Build (query, candidates) pairs from samples or live retrieval."""
+    if queries_file is None:
+        passages = [
+            RetrievedChunk(
+                chunk_id=str(i),
+                document_id="sample",
+                document_name="sample",
+                page_number=None,
+                text_content=text,
+                similarity=0.0,
+            )
+            for i, text in enumerate(PASSAGES)
+        ]
+        return [(query, passages) for query in QUERIES]
+
+    from app.api.query import CANDIDATE_POOL_SIZE
+    from app.core.vector_store import get_vector_store
+    from app.services.retrieval import RetrieverService
+
+    retriever = RetrieverService(await get_vector_store())
+    queries = [q.strip() for q in Path(queries_file).read_text().splitlines() if q.strip()]
+    return [
+        (query, await retriever.retrieve(query=query, top_k=CANDIDATE_POOL_SIZE))
+        for query in queries
+    ]
+
+
+async def timed_rerank(query: str, chunks: list[RetrievedChunk], top_k: int, cascade: bool):
+    """Rerank with a cold score cache and return (ranked chunk ids, seconds)."""
+    settings.RERANK_CASCADE_ENABLED = cascade
+    invalidate_rerank_scores([c.chunk_id for c in chunks])
+    start = time.perf_counter()
+    ranked = await rerank_chunks(query=query, chunks=chunks, top_k=top_k)
+    return [c.chunk_id for c in ranked], time.perf_counter() - start
+
+
+async def main() -> None:
+    """Run both modes over every query and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top-n", type=int, default=settings.RERANK_CASCADE_TOP_N)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries-file")
+    args = parser.parse_args()
+
+    settings.RERANK_CASCADE_TOP_N = args.top_n
+    samples = await load_candidates(args.queries_file)
+
+    # Load both models up front so timings exclude model loading
+    get_cross_encoder(CROSS_ENCODER_MODEL)
+    get_cross_encoder(PREFILTER_CROSS_ENCODER_MODEL)
+
+    full_times, cascade_times, overlaps = [], [], []
+    top1_matches = 0
+    for query, chunks in samples:
+        if not chunks:
+            continue
+        full_ids, full_s = await timed_rerank(query, chunks, args.top_k, cascade=False)
+        cascade_ids, cascade_s = await timed_rerank(query, chunks, args.top_k, cascade=True)
+        full_times.append(full_s)
+        cascade_times.append(cascade_s)
+        overlaps.append(len(set(full_ids) & set(cascade_ids)) / max(len(full_ids), 1))
+        top1_matches += int(full_ids[:1] == cascade_ids[:1])
+
+    if not full_times:
+        print("[CASCADE] No candidates to rerank")
+        return
+
+    full_ms = statistics.mean(full_times) * 1000
+    cascade_ms = statistics.mean(cascade_times) * 1000
+    print(
+        f"[CASCADE] Queries: {len(full_times)}, pool size: {len(samples[0][1])}, "
+        f"top-n: {args.top_n}"
+    )
+    print(f"[CASCADE] Full L-12:  {full_ms:.1f} ms/query")
+    print(f"[CASCADE] Cascade:    {cascade_ms:.1f} ms/query ({full_ms / cascade_ms:.2f}x)")
+    print(f"[CASCADE] Top-{args.top_k} overlap: {statistics.mean(overlaps):.3f}")
+    print(f"[CASCADE] Top-1 agreement: {top1_matches}/{len(full_times)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
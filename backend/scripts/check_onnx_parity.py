@@ -0,0 +1,105 @@
+"""Check the quantized ONNX models against the PyTorch models.
+
+Usage:
+    python scripts/check_onnx_parity.py [--max-cosine-deviation 0.02] [--min-rank-agreement 0.9]
+
+Checks every model scripts/export_onnx_models.py exports: the embedding
+model and both rerankers (L-12 and the L-6 cascade prefilter). Reports the
+max cosine deviation between embeddings, the rank agreement (Spearman) and
+top-1 agreement of each reranker's scores, and the speedup of each backend.
+Exits non-zero if any ONNX model falls outside the thresholds.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import spearmanr
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sentence_transformers import CrossEncoder, SentenceTransformer
+
+from app.config import settings
+from app.services.onnx_inference import OnnxCrossEncoder, OnnxSentenceEncoder
+from app.services.reranker import CROSS_ENCODER_MODEL, PREFILTER_CROSS_ENCODER_MODEL
+from scripts.sample_data import PASSAGES, QUERIES
+
+
+def timed(func, *args):
+    """Run func and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def check_embeddings() -> float:
+    """Return the max cosine deviation (1 - cos) between backends."""
+    texts = QUERIES + PASSAGES
+    torch_model = SentenceTransformer(settings.EMBEDDING_MODEL)
+    onnx_model = OnnxSentenceEncoder(settings.EMBEDDING_MODEL)
+
+    torch_emb, torch_s = timed(torch_model.encode, texts)
+    onnx_emb, onnx_s = timed(onnx_model.encode, texts)
+
+    torch_emb = torch_emb / np.linalg.norm(torch_emb, axis=1, keepdims=True)
+    onnx_emb = onnx_emb / np.linalg.norm(onnx_emb, axis=1, keepdims=True)
+    deviation = float(np.max(1 - np.sum(torch_emb * onnx_emb, axis=1)))
+
+    print(f"[PARITY] Embeddings: max cosine deviation {deviation:.5f}")
+    print(f"[PARITY] Embeddings: torch {torch_s * 1000:.0f}ms, onnx {onnx_s * 1000:.0f}ms")
+    return deviation
+
+
+def check_reranker(model_name: str) -> float:
+    """Return the mean Spearman rank agreement between backends for one cross-encoder."""
+    torch_model = CrossEncoder(model_name)
+    onnx_model = OnnxCrossEncoder(model_name)
+
+    agreements = []
+    top1_matches = 0
+    torch_total = onnx_total = 0.0
+    for query in QUERIES:
+        pairs = [(query, passage) for passage in PASSAGES]
+        torch_scores, torch_s = timed(torch_model.predict, pairs)
+        onnx_scores, onnx_s = timed(onnx_model.predict, pairs)
+        torch_total += torch_s
+        onnx_total += onnx_s
+
+        agreements.append(spearmanr(torch_scores, onnx_scores).statistic)
+        top1_matches += int(np.argmax(torch_scores) == np.argmax(onnx_scores))
+
+    mean_agreement = float(np.mean(agreements))
+    print(
+        f"[PARITY] Reranker {model_name}: mean rank agreement {mean_agreement:.4f} "
+        f"(min {min(agreements):.4f}), top-1 match {top1_matches}/{len(QUERIES)}"
+    )
+    print(
+        f"[PARITY] Reranker {model_name}: torch {torch_total * 1000:.0f}ms, "
+        f"onnx {onnx_total * 1000:.0f}ms"
+    )
+    return mean_agreement
+
+
+def main() -> None:
+    """Run every check and fail if any model is outside its threshold."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-cosine-deviation", type=float, default=0.02)
+    parser.add_argument("--min-rank-agreement", type=float, default=0.9)
+    args = parser.parse_args()
+
+    deviation = check_embeddings()
+    agreements = [
+        check_reranker(model_name)
+        for model_name in (CROSS_ENCODER_MODEL, PREFILTER_CROSS_ENCODER_MODEL)
+    ]
+
+    ok = deviation <= args.max_cosine_deviation and min(agreements) >= args.min_rank_agreement
+    print("[PARITY] PASS" if ok else "[PARITY] FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
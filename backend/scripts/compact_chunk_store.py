@@ -0,0 +1,32 @@
+"""Reclaim the space deleted and replaced chunk texts take up in the chunk store.
+
+Usage:
+    python scripts/compact_chunk_store.py
+
+Deleting a document (or re-processing one) only drops its rows from the
+chunk store index; the text bytes stay in the data file. This copies the
+live texts into a new data file and removes the old one. Uploads and
+queries keep working while it runs, including in other processes sharing
+CHUNK_STORE_DIR. Run it on each host that serves queries.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.chunk_store import get_chunk_store
+
+
+def main() -> None:
+    """Compact the store and report the space reclaimed."""
+    chunk_store = get_chunk_store()
+    size_before, size_after = chunk_store.compact()
+    print(
+        f"[CHUNK_STORE] Compacted {len(chunk_store)} texts: "
+        f"{size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Export the embedding and cross-encoder models to dynamically quantized int8 ONNX.
+
+Usage:
+    pip install "optimum[onnxruntime]"
+    python scripts/export_onnx_models.py [--arch avx512_vnni|avx2|arm64]
+
+Writes ONNX_MODEL_DIR/<model>/model_quantized.onnx plus tokenizer and
+sentence-transformers config files. Set INFERENCE_BACKEND=onnx to use them,
+and run scripts/check_onnx_parity.py first.
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.services.onnx_inference import ONNX_MODEL_FILE, onnx_model_dir
+from app.services.reranker import CROSS_ENCODER_MODEL, PREFILTER_CROSS_ENCODER_MODEL
+
+# Sentence-transformers files needed to reproduce pooling/normalization
+ST_CONFIG_FILES = ["modules.json", "sentence_bert_config.json", "1_Pooling/config.json"]
+
+
+def export_model(model_name: str, task: str, arch: str) -> Path:
+    """Export one model to ONNX and quantize its weights to int8."""
+    try:
+        from huggingface_hub import snapshot_download
+        from optimum.onnxruntime import (
+            ORTModelForFeatureExtraction,
+            ORTModelForSequenceClassification,
+            ORTQuantizer,
+        )
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+    except ImportError:
+        sys.exit('Exporting requires optimum: pip install "optimum[onnxruntime]"')
+
+    model_cls = (
+        ORTModelForFeatureExtraction if task == "feature-extraction"
+        else ORTModelForSequenceClassification
+    )
+    out_dir = onnx_model_dir(model_name)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"[EXPORT] Exporting {model_name} to ONNX")
+        model = model_cls.from_pretrained(model_name, export=True)
+        model.save_pretrained(tmp)
+
+        # Dynamic quantization: int8 weights, activations quantized at runtime
+        qconfig = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+        quantizer = ORTQuantizer.from_pretrained(tmp)
+        quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(out_dir)
+
+    if task == "feature-extraction":
+        snapshot = (
+            Path(model_name) if Path(model_name).is_dir()
+            else Path(snapshot_download(model_name, allow_patterns=ST_CONFIG_FILES))
+        )
+        for name in ST_CONFIG_FILES:
+            if (snapshot / name).exists():
+                (out_dir / name).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy(snapshot / name, out_dir / name)
+
+    print(f"[EXPORT] Wrote {out_dir / ONNX_MODEL_FILE}")
+    return out_dir
+
+
+def main() -> None:
+    """Export the configured embedding model and both rerankers."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--arch",
+        default="avx512_vnni",
+        choices=["avx512_vnni", "avx512", "avx2", "arm64"],
+        help="Target CPU instruction set for the quantized kernels",
+    )
+    args = parser.parse_args()
+
+    export_model(settings.EMBEDDING_MODEL, "feature-extraction", args.arch)
+    export_model(CROSS_ENCODER_MODEL, "text-classification", args.arch)
+    export_model(PREFILTER_CROSS_ENCODER_MODEL, "text-classification", args.arch)
+
+
+if __name__ == "__main__":
+    main()
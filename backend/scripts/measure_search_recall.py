@@ -0,0 +1,96 @@
+"""Measure dense search recall and latency for the current vector index settings.
+
+Usage:
+    python scripts/measure_search_recall.py [--samples 200] [--top-k 30]
+        [--queries-file queries.txt]
+
+Each query is searched twice: with the configured index (HNSW ef,
+quantization + rescoring) and with an exact full scan. Recall@k is the
+share of exact top-k results the indexed search also returns. By default
+the queries are vectors of points sampled from the collection; with
+--queries-file, each line is embedded as a query instead.
+
+Compare runs with different settings, e.g.
+    VECTOR_QUANTIZATION=scalar HNSW_EF_SEARCH=64 python scripts/measure_search_recall.py
+(after scripts/apply_vector_settings.py for index-time settings).
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.config import settings
+from app.core.vector_store import DENSE_VECTOR_NAME, VectorStore, get_vector_store
+from app.services.embeddings import embed_texts
+
+
+async def sample_query_vectors(vector_store: VectorStore, samples: int) -> list[list[float]]:
+    """Dense vectors of the first points in the collection."""
+    records, _ = await vector_store.client.scroll(
+        collection_name=vector_store.collection_name,
+        limit=samples,
+        with_payload=False,
+        with_vectors=True,
+    )
+    return [
+        r.vector[DENSE_VECTOR_NAME] if isinstance(r.vector, dict) else r.vector
+        for r in records
+    ]
+
+
+async def timed_search(
+    vector_store: VectorStore, vector: list[float], top_k: int, exact: bool
+) -> tuple[list[str], float]:
+    """Dense search returning (ids, seconds)."""
+    start = time.perf_counter()
+    results = await vector_store.search(vector, top_k=top_k, exact=exact)
+    return [str(r["id"]) for r in results], time.perf_counter() - start
+
+
+async def main() -> None:
+    """Run indexed and exact searches for every query and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=30)
+    parser.add_argument("--queries-file")
+    args = parser.parse_args()
+
+    vector_store = await get_vector_store()
+    if args.queries_file:
+        queries = [q.strip() for q in Path(args.queries_file).read_text().splitlines() if q.strip()]
+        vectors = embed_texts(queries)
+    else:
+        vectors = await sample_query_vectors(vector_store, args.samples)
+    if not vectors:
+        print("[RECALL] No query vectors (empty collection?)")
+        return
+
+    recalls, indexed_times, exact_times = [], [], []
+    for vector in vectors:
+        exact_ids, exact_s = await timed_search(vector_store, vector, args.top_k, exact=True)
+        indexed_ids, indexed_s = await timed_search(vector_store, vector, args.top_k, exact=False)
+        if exact_ids:
+            recalls.append(len(set(indexed_ids) & set(exact_ids)) / len(exact_ids))
+        indexed_times.append(indexed_s)
+        exact_times.append(exact_s)
+
+    print(
+        f"[RECALL] quantization={settings.VECTOR_QUANTIZATION} "
+        f"rescore={settings.VECTOR_QUANTIZATION_RESCORE} "
+        f"oversampling={settings.VECTOR_QUANTIZATION_OVERSAMPLING} "
+        f"on_disk={settings.VECTORS_ON_DISK} hnsw_ef={settings.HNSW_EF_SEARCH} "
+        f"grpc={settings.VECTOR_DB_PREFER_GRPC}"
+    )
+    print(f"[RECALL] Queries: {len(vectors)}, k={args.top_k}")
+    print(f"[RECALL] Recall@{args.top_k}: {statistics.mean(recalls):.4f} (min {min(recalls):.4f})")
+    print(f"[RECALL] Indexed search: {statistics.median(indexed_times) * 1000:.1f} ms median")
+    print(f"[RECALL] Exact search:   {statistics.median(exact_times) * 1000:.1f} ms median")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Move chunk texts out of Qdrant payloads into the local chunk store.
+
+Usage:
+    python scripts/migrate_chunk_texts.py [--batch-size 256]
+
+Points ingested before the chunk store carry text_content in their payload.
+Retrieval still finds them (and copies texts over as they are read), but
+Qdrant keeps the text in RAM until it is removed. This copies every such
+text into CHUNK_STORE_DIR and then deletes it from the payload. Safe to
+re-run; run it on each host that serves queries.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from qdrant_client.models import Filter, IsEmptyCondition, PayloadField
+
+from app.config import settings
+from app.core.vector_store import TEXT_PAYLOAD_FIELD, get_vector_store
+from app.services.chunk_store import get_chunk_store
+
+
+async def main() -> None:
+    """Copy payload texts to the chunk store in batches, then strip them from Qdrant."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    vector_store = await get_vector_store()
+    chunk_store = get_chunk_store()
+    # Only points that still have text in their payload
+    has_text = Filter(must_not=[IsEmptyCondition(is_empty=PayloadField(key=TEXT_PAYLOAD_FIELD))])
+
+    migrated = 0
+    while True:
+        # Stripped points no longer match, so always read the first page
+        records, _ = await vector_store.client.scroll(
+            collection_name=vector_store.collection_name,
+            scroll_filter=has_text,
+            limit=args.batch_size,
+            with_payload=[TEXT_PAYLOAD_FIELD],
+            with_vectors=False,
+        )
+        if not records:
+            break
+
+        chunk_store.put_many([(str(r.id), r.payload[TEXT_PAYLOAD_FIELD]) for r in records])
+        await vector_store.client.delete_payload(
+            collection_name=vector_store.collection_name,
+            keys=[TEXT_PAYLOAD_FIELD],
+            points=[r.id for r in records],
+        )
+        migrated += len(records)
+        print(f"[MIGRATE] Moved {migrated} chunk texts")
+
+    print(f"[MIGRATE] Done: {migrated} chunk texts moved to {settings.CHUNK_STORE_DIR}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,24 @@
+"""Sample queries and passages for model benchmarks and parity checks."""
+
+QUERIES = [
+    "What is the application deadline for the B.Tech program?",
+    "Who is eligible for the Lalitha scholarship?",
+    "What was the total revenue in 2022-23?",
+    "Which documents are required for admission?",
+    "How is the merit list prepared?",
+]
+
+PASSAGES = [
+    "Applications for the B.Tech programme close on 31 March; late submissions are not considered.",
+    "The Ayyalasomayajula Lalitha Scholarship Fund supports meritorious students "
+    "with financial need.",
+    "Total income for the financial year 2022-23 was reported in the statement "
+    "of income and expenditure.",
+    "Candidates must submit class 10 and 12 mark sheets, a photo ID and a recent photograph.",
+    "The merit list is prepared on the basis of the entrance assessment and interview scores.",
+    "The university campus is located in Mohali, Punjab.",
+    "Scholarship recipients must maintain a minimum CGPA to continue receiving support.",
+    "Fees once paid are refundable only as per the refund policy described in Section 7.",
+    "The research office supports faculty with grant applications and compliance.",
+    "Hostel accommodation is mandatory for all first-year undergraduate students.",
+]
@@ -0,0 +1,95 @@
+"""Shared test fixtures: a SQLite database standing in for Postgres."""
+
+from collections.abc import Generator
+
+import pytest
+import pytest_asyncio
+from qdrant_client import AsyncQdrantClient
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import vector_store as vector_store_module
+from app.core.database import SessionLocal
+from app.core.vector_store import VectorStore
+from app.models.database import Base, Document, User
+from app.services import chunk_store as chunk_store_module
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid(type_, compiler, **kw) -> str:
+    """Store Postgres UUID columns as hex strings on SQLite."""
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def db_engine(tmp_path) -> Generator[Engine, None, None]:
+    """A fresh SQLite database, bound to the app's SessionLocal for the test."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    original_bind = SessionLocal.kw["bind"]
+    SessionLocal.configure(bind=engine)
+    yield engine
+    SessionLocal.configure(bind=original_bind)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine) -> Generator[Session, None, None]:
+    """A session on the test database."""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def user(db) -> User:
+    """An admin user."""
+    user = User(email="admin@example.com", hashed_password="x", role="admin")
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture
+def document(db, user, tmp_path) -> Document:
+    """A pending text document uploaded by the admin user."""
+    path = tmp_path / "handbook.txt"
+    path.write_text("Tuition is due in August. Late fees apply after the first week.")
+    document = Document(
+        filename="handbook.txt",
+        file_size_bytes=path.stat().st_size,
+        file_type="txt",
+        uploaded_by=user.id,
+        storage_path=str(path),
+    )
+    db.add(document)
+    db.commit()
+    return document
+
+
+@pytest.fixture
+def chunk_store_dir(monkeypatch, tmp_path):
+    """Point the chunk store singleton at an empty directory."""
+    path = tmp_path / "chunk_store"
+    monkeypatch.setattr(settings, "CHUNK_STORE_DIR", str(path))
+    monkeypatch.setattr(chunk_store_module, "_chunk_store", None)
+    return path
+
+
+@pytest_asyncio.fixture
+async def vector_store(monkeypatch) -> VectorStore:
+    """A hybrid collection in an in-process Qdrant."""
+    monkeypatch.setattr(
+        vector_store_module, "AsyncQdrantClient", lambda **kwargs: AsyncQdrantClient(":memory:")
+    )
+    store = VectorStore()
+    await store._ensure_collection()
+    return store
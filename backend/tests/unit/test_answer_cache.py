@@ -0,0 +1,78 @@
+"""Tests for the semantic answer cache backends."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.models.schemas import ConfidenceLevel, QueryResponse
+from app.services.answer_cache import CachedAnswer, InMemoryAnswerCache, SQLiteAnswerCache
+
+ANSWER = CachedAnswer(
+    response=QueryResponse(
+        answer="Tuition is due in August.",
+        confidence=ConfidenceLevel.HIGH,
+        sources=[],
+        processing_time_ms=12,
+    ),
+    source_chunks=[("chunk-1", 0.8)],
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryAnswerCache(max_entries=10, ttl_seconds=60, similarity_threshold=0.95)
+    return SQLiteAnswerCache(
+        str(tmp_path / "answers.db"), max_entries=10, ttl_seconds=60, similarity_threshold=0.95
+    )
+
+
+def test_similar_query_hits(cache):
+    cache.store([1.0, 0.0, 0.0], max_chunks=5, answer=ANSWER)
+
+    hit = cache.lookup([0.99, 0.05, 0.0], max_chunks=5)
+    assert hit == ANSWER
+    assert cache.lookup([0.0, 1.0, 0.0], max_chunks=5) is None
+    assert cache.lookup([1.0, 0.0, 0.0], max_chunks=3) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_corpus_change_invalidates_entries(cache):
+    cache.store([1.0, 0.0, 0.0], max_chunks=5, answer=ANSWER)
+    assert cache.bump_corpus_version() == 1
+
+    assert cache.lookup([1.0, 0.0, 0.0], max_chunks=5) is None
+    assert len(cache) == 0
+
+
+def test_sqlite_workers_share_invalidation(tmp_path):
+    path = str(tmp_path / "answers.db")
+    first, second = (
+        SQLiteAnswerCache(path, max_entries=10, ttl_seconds=60, similarity_threshold=0.95)
+        for _ in range(2)
+    )
+    first.store([1.0, 0.0], max_chunks=5, answer=ANSWER)
+    assert second.lookup([1.0, 0.0], max_chunks=5) == ANSWER
+
+    second.bump_corpus_version()
+    assert first.lookup([1.0, 0.0], max_chunks=5) is None
+
+
+def test_sqlite_evicts_least_recently_used(tmp_path):
+    cache = SQLiteAnswerCache(
+        str(tmp_path / "answers.db"), max_entries=2, ttl_seconds=60, similarity_threshold=0.95
+    )
+    for axis in range(3):
+        vector = [0.0, 0.0, 0.0]
+        vector[axis] = 1.0
+        cache.store(vector, max_chunks=5, answer=ANSWER)
+
+    assert len(cache) == 2
+    assert cache.lookup([1.0, 0.0, 0.0], max_chunks=5) is None
+    assert cache.lookup([0.0, 0.0, 1.0], max_chunks=5) == ANSWER
+
+
+def test_unknown_backend_is_rejected_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(ANSWER_CACHE_BACKEND="redis")
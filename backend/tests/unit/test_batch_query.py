@@ -0,0 +1,129 @@
+"""Tests for the batch query endpoint."""
+
+import uuid
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.api import query as query_api
+from app.api.dependencies import get_current_user
+from app.core.database import SessionLocal
+from app.core.vector_store import get_vector_store
+from app.main import app
+from app.models.database import Query as QueryModel
+from app.models.database import QuerySource
+from app.models.schemas import ConfidenceLevel
+from app.services.answer_generator import GeneratedAnswer
+from app.services.retrieval import RetrievedChunk
+
+DOCUMENT_ID = str(uuid.uuid4())
+
+
+def make_chunk(text: str) -> RetrievedChunk:
+    """A retrieved chunk of a single test document."""
+    return RetrievedChunk(
+        chunk_id=str(uuid.uuid4()),
+        document_id=DOCUMENT_ID,
+        document_name="handbook.pdf",
+        page_number=1,
+        text_content=text,
+        similarity=0.9,
+    )
+
+
+class FakeRetriever:
+    """Returns one chunk per query, echoing the query text."""
+
+    def __init__(self, vector_store) -> None:
+        self.vector_store = vector_store
+
+    async def retrieve_batch(self, queries, top_k, max_concurrent_expansions, search_filters):
+        return [[make_chunk(f"About {q}")] for q in queries]
+
+
+class FakeGenerator:
+    """Answers every query except the ones mentioning "outage"."""
+
+    async def generate(self, query, chunks) -> GeneratedAnswer:
+        if "outage" in query:
+            raise RuntimeError("LLM unavailable")
+        return GeneratedAnswer(answer=f"Answer to {query}", confidence=ConfidenceLevel.HIGH)
+
+
+async def identity_rerank(queries, chunk_lists, top_k):
+    return [chunks[:top_k] for chunks in chunk_lists]
+
+
+@pytest.fixture
+def client(monkeypatch, user):
+    monkeypatch.setattr(query_api, "RetrieverService", FakeRetriever)
+    monkeypatch.setattr(query_api, "rerank_chunks_batch", identity_rerank)
+    monkeypatch.setattr(query_api, "AnswerGenerator", FakeGenerator)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_vector_store] = lambda: None
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_failed_answer_only_fails_its_own_result(client, db):
+    queries = ["tuition fees", "library outage", "visa deadlines"]
+    response = await client.post(
+        "/api/v1/query/batch", json={"queries": [{"query": q} for q in queries]}
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["query"] for r in results] == queries
+
+    ok, failed, ok_too = results
+    assert ok["answer"] == "Answer to tuition fees"
+    assert ok["error"] is None
+    assert ok_too["answer"] == "Answer to visa deadlines"
+
+    assert failed["answer"] is None
+    assert failed["confidence"] is None
+    assert failed["error"] == "Answer generation failed: RuntimeError"
+    assert failed["sources"][0]["excerpt"] == "About library outage"
+
+    # Only the generated answers are saved
+    saved = {q.query_text for q in db.query(QueryModel)}
+    assert saved == {"tuition fees", "visa deadlines"}
+
+
+@pytest.mark.asyncio
+async def test_retrieval_only_skips_generation(client, db):
+    response = await client.post(
+        "/api/v1/query/batch",
+        json={"queries": [{"query": "library outage"}], "retrieval_only": True},
+    )
+
+    assert response.status_code == 200
+    (result,) = response.json()["results"]
+    assert result["answer"] is None
+    assert result["error"] is None
+    assert result["sources"][0]["document_id"] == DOCUMENT_ID
+    assert db.query(QueryModel).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_answers_are_saved_in_one_commit(client, db):
+    commits = []
+
+    def count_commit(session) -> None:
+        commits.append(session)
+
+    event.listen(SessionLocal, "after_commit", count_commit)
+    try:
+        response = await client.post(
+            "/api/v1/query/batch",
+            json={"queries": [{"query": f"question {i}"} for i in range(5)]},
+        )
+    finally:
+        event.remove(SessionLocal, "after_commit", count_commit)
+
+    assert response.status_code == 200
+    assert len(commits) == 1
+    assert db.query(QueryModel).count() == 5
+    assert db.query(QuerySource).count() == 5
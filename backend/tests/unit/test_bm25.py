@@ -0,0 +1,45 @@
+"""Tests for the vectorized BM25 scorer."""
+
+import numpy as np
+import pytest
+from rank_bm25 import BM25Okapi
+
+from app.services.lexical import bm25_scores, token_ids, tokenize
+
+DOCUMENTS = [
+    "Tuition is due in August and late fees apply.",
+    "The library opens at eight. The library closes at ten.",
+    "Graduate tuition differs from undergraduate tuition.",
+    "Parking permits are sold by campus security.",
+    "",
+]
+QUERIES = ["tuition fees", "library library hours", "parking", "nothing matches", ""]
+
+
+def test_matches_rank_bm25():
+    reference = BM25Okapi([tokenize(doc) for doc in DOCUMENTS])
+    expected = np.column_stack([reference.get_scores(tokenize(q)) for q in QUERIES])
+
+    scores = bm25_scores([token_ids(doc) for doc in DOCUMENTS], [token_ids(q) for q in QUERIES])
+
+    assert scores.shape == (len(DOCUMENTS), len(QUERIES))
+    np.testing.assert_allclose(scores, expected)
+
+
+def test_empty_pool_scores_zero():
+    assert bm25_scores([], [token_ids("fees")]).shape == (0, 1)
+    assert not bm25_scores([token_ids("")], [token_ids("fees")]).any()
+
+
+def test_token_ids_are_stable():
+    ids = token_ids("Fees, fees and FEES!")
+    assert ids.tolist() == token_ids("fees fees and fees").tolist()
+    assert ids[0] == ids[1] != ids[2]
+
+
+@pytest.mark.parametrize("query", ["tuition", "the library"])
+def test_single_query_matches_batch(query):
+    documents = [token_ids(doc) for doc in DOCUMENTS]
+    single = bm25_scores(documents, [token_ids(query)])
+    batch = bm25_scores(documents, [token_ids(q) for q in [query, "parking"]])
+    np.testing.assert_allclose(single[:, 0], batch[:, 0])
@@ -0,0 +1,106 @@
+"""Tests for the LRU cache and the query expansion and embedding caches."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import embeddings, query_expander
+from app.utils.cache import LRUCache, normalize_cache_key
+
+
+class FakeGroq:
+    """Answers every expansion prompt with the same two alternatives."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content='["tuition deadline", "when fees are due"]')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_lru_evicts_least_recently_used():
+    cache: LRUCache[str, int] = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the oldest
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_touch_refreshes_recency_without_counting():
+    cache: LRUCache[str, int] = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.touch("a")
+    cache.touch("missing")
+    cache.set("c", 3)
+
+    assert [key for key, _ in cache.items()] == ["a", "c"]
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 0
+
+
+def test_lru_expires_entries_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+    cache: LRUCache[str, int] = LRUCache(max_size=10, ttl_seconds=5)
+    cache.set("a", 1)
+
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_zero_size_cache_stores_nothing():
+    cache: LRUCache[str, int] = LRUCache(max_size=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_normalize_cache_key():
+    assert normalize_cache_key("  When is\n Tuition DUE? ") == "when is tuition due?"
+
+
+@pytest.mark.asyncio
+async def test_expansions_are_cached_by_normalized_query(monkeypatch):
+    groq = FakeGroq()
+    monkeypatch.setattr(query_expander, "get_groq_client", lambda: groq)
+    monkeypatch.setattr(query_expander, "_expansion_cache", LRUCache(max_size=10))
+
+    first = await query_expander.expand_query("When is tuition due?")
+    second = await query_expander.expand_query("when is  TUITION due?")
+
+    assert groq.calls == 1
+    assert first[1:] == second[1:] == ["tuition deadline", "when fees are due"]
+    assert second[0] == "when is  TUITION due?"
+
+
+@pytest.mark.asyncio
+async def test_query_embeddings_are_cached(monkeypatch):
+    embedded: list[str] = []
+
+    class FakeBatcher:
+        async def submit(self, texts):
+            embedded.extend(texts)
+            return [[float(len(text))] for text in texts]
+
+    monkeypatch.setattr(embeddings, "_get_query_batcher", FakeBatcher)
+    monkeypatch.setattr(embeddings, "_query_embedding_cache", LRUCache(max_size=10))
+
+    assert await embeddings.embed_queries_async(["fees", "labs"]) == [[4.0], [4.0]]
+    assert await embeddings.embed_queries_async(["labs", " fees ", "parking"]) == [
+        [4.0],
+        [4.0],
+        [7.0],
+    ]
+    assert embedded == ["fees", "labs", "parking"]
@@ -0,0 +1,63 @@
+"""Tests for source offsets of chunks and page attribution."""
+
+import pytest
+
+from app.services.document_processor import DocumentProcessor, NormalizedText
+from app.services.pdf_extraction import PAGE_SEPARATOR
+
+SOURCE = "  Tuition is due\n\nin August.   Late fees\tapply.\n Refunds   close in May.  "
+
+
+@pytest.fixture
+def processor() -> DocumentProcessor:
+    return DocumentProcessor(db=None, document=None, vector_store=None)
+
+
+def test_normalized_text_maps_back_to_source():
+    normalized = NormalizedText(SOURCE)
+    assert normalized.text == "Tuition is due in August. Late fees apply. Refunds close in May."
+
+    for position, char in enumerate(normalized.text):
+        if char != " ":
+            assert SOURCE[normalized.to_source(position)] == char
+    assert normalized.to_source(0) == 2
+    assert normalized.to_source(len(normalized.text) - 1) == SOURCE.rindex(".")
+
+
+def test_chunk_spans_locate_chunks_in_source(processor):
+    text = " ".join(f"Sentence number {i} is here.\n\n  Another  follows {i}." for i in range(40))
+    chunks = processor.chunk_text_with_spans(text, target_chunk_size=120, overlap_size=40)
+
+    assert [c.text for c in chunks] == processor.chunk_text_by_sentences(text, 120, 40)
+    for chunk in chunks:
+        assert " ".join(text[chunk.start_char:chunk.end_char].split()) == chunk.text
+        assert not text[chunk.start_char].isspace()
+        assert not text[chunk.end_char - 1].isspace()
+
+
+def test_page_for_position(processor):
+    page_breaks = [10, 22, 30]  # Pages end at these offsets
+    assert processor._get_page_for_position(0, page_breaks) == 1
+    assert processor._get_page_for_position(9, page_breaks) == 1
+    assert processor._get_page_for_position(12, page_breaks) == 2
+    assert processor._get_page_for_position(29, page_breaks) == 3
+    assert processor._get_page_for_position(29, []) is None
+
+
+def test_chunks_are_attributed_to_their_starting_page(processor):
+    pages = [
+        " ".join(f"Page {page} sentence {i} mentions fees." for i in range(12))
+        for page in range(1, 6)
+    ]
+    text = PAGE_SEPARATOR.join(pages)
+    # Page break offsets as extract_pdf_text reports them (separators included)
+    page_breaks = []
+    for i, page in enumerate(pages):
+        start = page_breaks[-1] + len(PAGE_SEPARATOR) if i else 0
+        page_breaks.append(start + len(page))
+
+    chunks = processor.chunk_text_with_spans(text, target_chunk_size=200, overlap_size=50)
+    assert len(chunks) > len(pages)
+    for chunk in chunks:
+        page = processor._get_page_for_position(chunk.start_char, page_breaks)
+        assert chunk.text.startswith(f"Page {page} ")
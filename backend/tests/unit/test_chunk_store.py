@@ -0,0 +1,56 @@
+"""Tests for the memory-mapped chunk text store."""
+
+from app.services.chunk_store import ChunkStore, texts_file_name
+
+
+def test_put_get_and_delete(tmp_path):
+    store = ChunkStore(str(tmp_path))
+    store.put_many([("a", "Tuition is due."), ("b", "Café opens at 8 ☕"), ("c", "")])
+
+    assert store.get_many(["a", "b", "c", "missing"]) == {
+        "a": "Tuition is due.",
+        "b": "Café opens at 8 ☕",
+        "c": "",
+    }
+    assert store.delete(["a", "missing"]) == 1
+    assert store.get_many(["a", "b"]) == {"b": "Café opens at 8 ☕"}
+    assert len(store) == 2
+
+
+def test_reput_points_id_at_new_text(tmp_path):
+    store = ChunkStore(str(tmp_path))
+    store.put_many([("a", "old text")])
+    store.put_many([("a", "new text")])
+    assert store.get_many(["a"]) == {"a": "new text"}
+
+
+def test_handles_share_one_store(tmp_path):
+    writer, reader = ChunkStore(str(tmp_path)), ChunkStore(str(tmp_path))
+    writer.put_many([("a", "first")])
+    assert reader.get_many(["a"]) == {"a": "first"}
+
+    # The reader's map is remapped once the file has grown
+    writer.put_many([("b", "second")])
+    assert reader.get_many(["a", "b"]) == {"a": "first", "b": "second"}
+
+
+def test_compact_reclaims_deleted_texts(tmp_path):
+    store = ChunkStore(str(tmp_path))
+    other = ChunkStore(str(tmp_path))
+    store.put_many([(str(i), f"chunk {i} " * 20) for i in range(10)])
+    assert other.get_many(["0"])  # Maps the current file
+    store.delete([str(i) for i in range(8)])
+
+    before, after = store.compact()
+
+    assert after < before / 4
+    assert not (tmp_path / texts_file_name(0)).exists()
+    assert (tmp_path / texts_file_name(1)).stat().st_size == after
+    expected = {str(i): f"chunk {i} " * 20 for i in (8, 9)}
+    assert store.get_many(["8", "9"]) == expected
+    assert other.get_many(["8", "9"]) == expected
+
+    # Appends after compaction go to the new file, from any handle
+    other.put_many([("new", "appended")])
+    assert store.get_many(["new", "9"]) == {"new": "appended", "9": expected["9"]}
+    assert ChunkStore(str(tmp_path)).get_many(["new"]) == {"new": "appended"}
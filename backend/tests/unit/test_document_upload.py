@@ -0,0 +1,125 @@
+"""Tests for document uploads (streaming to disk, duplicate detection) and deletion."""
+
+import hashlib
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.api.dependencies import get_current_user
+from app.api.documents import _save_upload
+from app.config import settings
+from app.core.vector_store import get_vector_store
+from app.main import app
+from app.models.database import Document, DocumentChunk, IngestionJob
+from app.services.chunk_store import get_chunk_store
+
+
+class FakeUpload:
+    """Serves content in reads of at most the requested size, like UploadFile."""
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.reads: list[int] = []
+
+    async def read(self, size: int) -> bytes:
+        chunk, self.content = self.content[:size], self.content[size:]
+        self.reads.append(len(chunk))
+        return chunk
+
+
+@pytest.mark.asyncio
+async def test_save_upload_streams_and_hashes(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE_BYTES", 4)
+    content = b"0123456789"
+    upload = FakeUpload(content)
+    path = tmp_path / "doc.txt"
+
+    assert await _save_upload(upload, path, max_bytes=100) == (
+        10,
+        hashlib.sha256(content).hexdigest(),
+    )
+    assert path.read_bytes() == content
+    assert upload.reads == [4, 4, 2, 0]
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.asyncio
+async def test_save_upload_stops_past_max_bytes(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE_BYTES", 4)
+    upload = FakeUpload(b"x" * 1000)
+
+    assert await _save_upload(upload, tmp_path / "doc.txt", max_bytes=10) is None
+    # Stopped at the first chunk over the limit and left no partial file behind
+    assert sum(upload.reads) == 12
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path, user):
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    app.dependency_overrides[get_current_user] = lambda: user
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_identical_reupload_links_to_existing_document(client, db, tmp_path):
+    files = {"file": ("fees.txt", b"Tuition is due in August.")}
+    first = (await client.post("/api/v1/documents/upload", files=files)).json()
+    second = (await client.post("/api/v1/documents/upload", files=files)).json()
+
+    assert first["duplicate"] is False
+    assert first["job_id"] is not None
+    assert second["duplicate"] is True
+    assert second["document_id"] == first["document_id"]
+    assert second["job_id"] is None
+
+    # Nothing new was stored or queued for the duplicate
+    assert db.query(Document).count() == 1
+    assert db.query(IngestionJob).count() == 1
+    assert len(list((tmp_path / "uploads").iterdir())) == 1
+
+
+@pytest.mark.asyncio
+async def test_reupload_of_failed_document_is_ingested_again(client, db):
+    files = {"file": ("fees.txt", b"Tuition is due in August.")}
+    first = (await client.post("/api/v1/documents/upload", files=files)).json()
+    db.query(Document).update({Document.processing_status: "failed"})
+    db.commit()
+
+    second = (await client.post("/api/v1/documents/upload", files=files)).json()
+    assert second["duplicate"] is False
+    assert second["document_id"] != first["document_id"]
+
+
+@pytest.mark.asyncio
+async def test_delete_removes_chunks_texts_and_file(client, db, document, chunk_store_dir):
+    text = "Tuition is due in August."
+    db.add(
+        DocumentChunk(
+            document_id=document.id,
+            chunk_index=0,
+            text_content=text,
+            token_count=6,
+            embedding_id="point-1",
+        )
+    )
+    db.commit()
+    get_chunk_store().put_many([("point-1", text)])
+    storage_path = Path(document.storage_path)
+    deleted: list[str] = []
+
+    class FakeVectorStore:
+        async def delete(self, point_ids):
+            deleted.extend(point_ids)
+
+    app.dependency_overrides[get_vector_store] = FakeVectorStore
+    response = await client.delete(f"/api/v1/documents/{document.id}")
+
+    assert response.status_code == 204
+    assert deleted == ["point-1"]
+    assert get_chunk_store().get_many(["point-1"]) == {}
+    assert not storage_path.exists()
+    assert db.query(Document).count() == 0
+    assert db.query(DocumentChunk).count() == 0
@@ -0,0 +1,93 @@
+"""Tests for reusing stored embeddings of unchanged chunks."""
+
+import pytest
+
+from app.config import settings
+from app.models.database import Document, DocumentChunk
+from app.services import chunk_store, document_processor
+from app.services.document_processor import DocumentProcessor, TextChunk
+from app.services.embeddings import embedding_key
+
+
+class FakeVectorStore:
+    """Keeps points in a dict."""
+
+    hybrid_enabled = True
+
+    def __init__(self) -> None:
+        self.points: dict[str, list[float]] = {}
+
+    async def fetch_vectors(self, point_ids):
+        return {pid: self.points[pid] for pid in point_ids if pid in self.points}
+
+    async def upsert_many(self, point_ids, vectors, payloads, sparse_vectors=None):
+        self.points.update(zip(point_ids, vectors, strict=True))
+
+    async def delete(self, point_ids):
+        for point_id in point_ids:
+            self.points.pop(point_id, None)
+
+
+class FakeEmbedder:
+    """Records which texts were embedded; the vector encodes the text length."""
+
+    def __init__(self) -> None:
+        self.embedded: list[str] = []
+
+    async def __call__(self, texts):
+        self.embedded.extend(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.fixture
+def embedder(monkeypatch, tmp_path) -> FakeEmbedder:
+    embedder = FakeEmbedder()
+    monkeypatch.setattr(document_processor, "embed_texts_async", embedder)
+    monkeypatch.setattr(settings, "CHUNK_STORE_DIR", str(tmp_path / "chunk_store"))
+    monkeypatch.setattr(chunk_store, "_chunk_store", None)
+    return embedder
+
+
+async def ingest(db, document: Document, vector_store, texts: list[str]) -> None:
+    """Run process_document with the extraction step replaced by fixed chunks."""
+    processor = DocumentProcessor(db=db, document=document, vector_store=vector_store)
+    chunks = [
+        TextChunk(text=text, start_char=0, end_char=len(text), token_count=4) for text in texts
+    ]
+    processor._extract_and_chunk = lambda file_path: ([], chunks)
+    await processor.process_document()
+
+
+def test_embedding_key_ignores_whitespace_but_not_backend(monkeypatch):
+    key = embedding_key("Tuition is due  in\nAugust.")
+    assert key == embedding_key("Tuition is due in August.")
+    assert key != embedding_key("Tuition is due in September.")
+
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "onnx")
+    assert embedding_key("Tuition is due in August.") != key
+
+
+@pytest.mark.asyncio
+async def test_unchanged_chunks_reuse_stored_vectors(db, user, document, embedder):
+    vector_store = FakeVectorStore()
+    await ingest(db, document, vector_store, ["Fees are due.", "Labs open at nine."])
+    assert embedder.embedded == ["Fees are due.", "Labs open at nine."]
+
+    # A new version of the file shares one chunk with the first
+    revision = Document(
+        filename="handbook-v2.txt",
+        file_size_bytes=1,
+        file_type="txt",
+        uploaded_by=user.id,
+        storage_path=document.storage_path,
+    )
+    db.add(revision)
+    db.commit()
+    await ingest(db, revision, vector_store, ["Fees are due.", "Labs open at ten."])
+
+    assert embedder.embedded[2:] == ["Labs open at ten."]
+    rows = db.query(DocumentChunk).filter(DocumentChunk.document_id == revision.id).all()
+    assert len(vector_store.points) == 4
+    reused = next(row for row in rows if row.text_content == "Fees are due.")
+    assert reused.embedding_key == embedding_key("Fees are due.")
+    assert vector_store.points[reused.embedding_id] == [13.0, 1.0]
@@ -0,0 +1,60 @@
+"""Tests for BM25 sparse vectors and server-side hybrid fusion."""
+
+import uuid
+import zlib
+
+import pytest
+
+from app.services.chunk_store import get_chunk_store
+from app.services.lexical import build_document_sparse_vector, build_query_sparse_vector
+from app.services.retrieval import RetrieverService
+
+TEXTS = [
+    "Parking permits are issued by campus security.",
+    "The library opens at eight on weekdays.",
+    "Graduate tuition is billed each semester.",
+]
+
+
+def test_document_sparse_vector_saturates_term_frequency():
+    vector = build_document_sparse_vector("fees fees fees due")
+    weights = dict(zip(vector.indices, vector.values, strict=True))
+
+    fees, due = weights[zlib.crc32(b"fees")], weights[zlib.crc32(b"due")]
+    assert set(weights) == {zlib.crc32(b"fees"), zlib.crc32(b"due")}
+    assert due < fees < 3 * due
+    assert build_document_sparse_vector("...").indices == []
+
+
+def test_query_sparse_vector_counts_terms():
+    vector = build_query_sparse_vector("Fees? fees and due")
+    assert dict(zip(vector.indices, vector.values, strict=True)) == {
+        zlib.crc32(b"fees"): 2.0,
+        zlib.crc32(b"and"): 1.0,
+        zlib.crc32(b"due"): 1.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_lexical_match_wins_fusion_with_scaled_scores(vector_store, chunk_store_dir):
+    point_ids = [str(uuid.uuid4()) for _ in TEXTS]
+    # Dense vectors rank the texts in order; only the last one mentions tuition
+    vectors = [[1.0, 0.1 * i] + [0.0] * (vector_store.vector_size - 2) for i in range(3)]
+    await vector_store.upsert_many(
+        point_ids=point_ids,
+        vectors=vectors,
+        payloads=[{"document_id": str(uuid.uuid4()), "document_name": "a.txt"} for _ in TEXTS],
+        sparse_vectors=[build_document_sparse_vector(text) for text in TEXTS],
+    )
+    get_chunk_store().put_many(list(zip(point_ids, TEXTS, strict=True)))
+
+    query = [1.0, 0.0] + [0.0] * (vector_store.vector_size - 2)  # Closest to the first text
+    results = await vector_store.search(
+        query, top_k=3, sparse_vector=build_query_sparse_vector("tuition billing")
+    )
+
+    retriever = RetrieverService(vector_store)
+    chunks = await retriever._rank_candidates(["tuition billing"], [results], 3, 0.0)
+    # Last by dense rank but the only lexical match: 1/4 + 1/2 beats the dense-only 1/2
+    assert [chunk.text_content for chunk in chunks] == [TEXTS[2], TEXTS[0], TEXTS[1]]
+    assert [chunk.similarity for chunk in chunks] == pytest.approx([0.75, 0.5, 1 / 3])
@@ -0,0 +1,100 @@
+"""Tests for micro-batching of inference calls and loading the shared models."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.config import settings
+from app.core.inference import MicroBatcher
+from app.services import embeddings, reranker
+
+
+class RecordingModel:
+    """Doubles each item and records the batches it was called with."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.batches: list[list[int]] = []
+        self.fail = fail
+
+    def __call__(self, items: list[int]) -> list[int]:
+        self.batches.append(list(items))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return [item * 2 for item in items]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=100, max_wait_ms=20)
+
+    results = await asyncio.gather(
+        batcher.submit([1, 2]), batcher.submit([3]), batcher.submit([4, 5, 6])
+    )
+
+    assert results == [[2, 4], [6], [8, 10, 12]]
+    assert model.batches == [[1, 2, 3, 4, 5, 6]]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_runs_without_waiting():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=3, max_wait_ms=60_000)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit([1, 2]), batcher.submit([3])), timeout=5
+    )
+    assert results == [[2, 4], [6]]
+    assert await batcher.submit([]) == []
+
+
+@pytest.mark.asyncio
+async def test_model_error_reaches_every_caller():
+    batcher = MicroBatcher(RecordingModel(fail=True), max_batch_size=100, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        batcher.submit([1]), batcher.submit([2]), return_exceptions=True
+    )
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+@pytest.mark.asyncio
+async def test_running_batches_are_referenced_until_done():
+    batcher = MicroBatcher(RecordingModel(), max_batch_size=1, max_wait_ms=5)
+
+    submitted = asyncio.ensure_future(batcher.submit([1]))
+    await asyncio.sleep(0)
+    assert len(batcher._running) == 1
+
+    assert await submitted == [2]
+    await asyncio.sleep(0)
+    assert batcher._running == set()
+
+
+@pytest.mark.parametrize(
+    ("module", "attribute", "getter"),
+    [
+        (embeddings, "SentenceTransformer", embeddings.get_embedding_model),
+        (reranker, "CrossEncoder", reranker.get_cross_encoder),
+    ],
+)
+def test_concurrent_first_calls_load_the_model_once(monkeypatch, module, attribute, getter):
+    loads: list[str] = []
+
+    def load(model_name):
+        time.sleep(0.05)
+        loads.append(model_name)
+        return object()
+
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "torch")
+    monkeypatch.setattr(module, attribute, load)
+    monkeypatch.setattr(embeddings, "_model", None)
+    monkeypatch.setattr(reranker, "_cross_encoders", {})
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        models = list(pool.map(lambda _: getter(), range(4)))
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
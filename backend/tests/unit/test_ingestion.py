@@ -0,0 +1,181 @@
+"""Tests for the ingestion job queue."""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.config import settings
+from app.core.database import SessionLocal
+from app.models.database import IngestionJob
+from app.services import ingestion
+from app.services.ingestion import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    IngestionWorkerPool,
+    enqueue_document,
+    retry_delay,
+    utcnow,
+)
+
+
+class FakeProcessor:
+    """Stands in for DocumentProcessor; fails while `failures` is positive."""
+
+    failures = 0
+
+    def __init__(self, db, document, vector_store, on_progress) -> None:
+        self.on_progress = on_progress
+
+    async def discard_existing_chunks(self) -> None:
+        pass
+
+    async def process_document(self) -> None:
+        await self.on_progress(0.5, "embedding")
+        if FakeProcessor.failures > 0:
+            FakeProcessor.failures -= 1
+            raise RuntimeError("embedding service down")
+
+
+@pytest.fixture
+def pool(monkeypatch) -> IngestionWorkerPool:
+    async def no_vector_store():
+        return None
+
+    monkeypatch.setattr(ingestion, "DocumentProcessor", FakeProcessor)
+    monkeypatch.setattr(ingestion, "get_vector_store", no_vector_store)
+    FakeProcessor.failures = 0
+    return IngestionWorkerPool(workers=1, poll_interval_s=0.01)
+
+
+@pytest.fixture
+def job(db, document) -> IngestionJob:
+    job = enqueue_document(db, document)
+    db.commit()
+    return job
+
+
+def test_retry_delay_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(settings, "INGESTION_RETRY_BACKOFF_S", 30.0)
+    monkeypatch.setattr(settings, "INGESTION_RETRY_MAX_BACKOFF_S", 100.0)
+
+    delays = [retry_delay(attempts).total_seconds() for attempts in range(5)]
+    assert delays == [30.0, 30.0, 60.0, 100.0, 100.0]
+
+
+def test_claim_takes_a_lease(pool, db, job, document):
+    assert pool._claim() == job.id
+    db.refresh(job)
+    db.refresh(document)
+    assert job.status == JOB_RUNNING
+    assert job.attempts == 1
+    assert job.lease_expires_at > utcnow()
+    assert document.processing_status == "processing"
+
+    # Leased jobs and jobs waiting out their backoff are not claimed
+    assert pool._claim() is None
+
+
+def test_claim_skips_jobs_until_run_after(pool, db, job):
+    job.run_after = utcnow() + timedelta(minutes=5)
+    db.commit()
+    assert pool._claim() is None
+
+
+def test_expired_lease_is_reclaimed(pool, db, job):
+    pool._claim()
+    job.lease_expires_at = utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    assert pool._claim() == job.id
+    db.refresh(job)
+    assert job.attempts == 2
+
+
+def test_expired_lease_on_last_attempt_fails_the_job(pool, db, job, document):
+    job.status = JOB_RUNNING
+    job.attempts = job.max_attempts
+    job.lease_expires_at = utcnow() - timedelta(seconds=1)
+    db.commit()
+
+    assert pool._claim() is None
+    db.refresh(job)
+    db.refresh(document)
+    assert job.status == JOB_FAILED
+    assert job.error == "Worker stopped responding"
+    assert document.processing_status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_run_records_progress_and_success(pool, db, job, document):
+    job_id = pool._claim()
+    await pool._run(job_id)
+
+    db.refresh(job)
+    db.refresh(document)
+    assert job.status == JOB_SUCCEEDED
+    assert job.progress == 1.0
+    assert job.lease_expires_at is None
+    assert document.processing_status == "processed"
+
+
+@pytest.mark.asyncio
+async def test_failure_is_retried_with_backoff(pool, db, job, document):
+    FakeProcessor.failures = 1
+    await pool._run(pool._claim())
+
+    db.refresh(job)
+    db.refresh(document)
+    assert job.status == JOB_QUEUED
+    assert job.error == "RuntimeError: embedding service down"
+    assert job.run_after > utcnow() + retry_delay(1) - timedelta(seconds=5)
+    assert document.processing_status == "pending"
+
+    # Once the backoff has passed, the next attempt succeeds
+    job.run_after = utcnow()
+    db.commit()
+    await pool._run(pool._claim())
+    db.refresh(job)
+    assert job.status == JOB_SUCCEEDED
+    assert job.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_failure_on_last_attempt_fails_the_document(pool, db, job, document):
+    FakeProcessor.failures = job.max_attempts
+    for _ in range(job.max_attempts):
+        job.run_after = utcnow()
+        db.commit()
+        await pool._run(pool._claim())
+        db.refresh(job)
+
+    db.refresh(document)
+    assert job.status == JOB_FAILED
+    assert job.attempts == job.max_attempts
+    assert document.processing_status == "failed"
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_renews_the_lease_without_progress(pool, db, job, monkeypatch):
+    leases = []
+
+    class SlowProcessor(FakeProcessor):
+        """A long extraction step that never reports progress."""
+
+        async def process_document(self) -> None:
+            for _ in range(3):
+                await asyncio.sleep(0.1)
+                session = SessionLocal()
+                leases.append(session.get(IngestionJob, job.id).lease_expires_at)
+                session.close()
+
+    monkeypatch.setattr(ingestion, "DocumentProcessor", SlowProcessor)
+    monkeypatch.setattr(settings, "INGESTION_JOB_LEASE_S", 0.15)
+    await pool._run(pool._claim())
+
+    assert leases[-1] > leases[0]
+    db.refresh(job)
+    assert job.status == JOB_SUCCEEDED
+    assert job.lease_expires_at is None
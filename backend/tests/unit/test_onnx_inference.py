@@ -0,0 +1,130 @@
+"""Tests for selecting the ONNX Runtime backend and its model wrappers."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings, settings
+from app.services import embeddings, onnx_inference, reranker
+from app.services.onnx_inference import OnnxCrossEncoder, OnnxSentenceEncoder, onnx_model_dir
+
+
+@pytest.fixture
+def onnx_backend(monkeypatch, tmp_path) -> Path:
+    """INFERENCE_BACKEND=onnx with nothing exported yet."""
+    monkeypatch.setattr(settings, "INFERENCE_BACKEND", "onnx")
+    monkeypatch.setattr(settings, "ONNX_MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(reranker, "_cross_encoders", {})
+    monkeypatch.setattr(embeddings, "_model", None)
+    return tmp_path
+
+
+def test_unknown_backend_is_rejected_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(INFERENCE_BACKEND="onxx")
+
+
+def test_model_dir_per_model_name(onnx_backend):
+    assert onnx_model_dir("cross-encoder/ms-marco-MiniLM-L-6-v2") == (
+        onnx_backend / "cross-encoder__ms-marco-MiniLM-L-6-v2"
+    )
+
+
+def test_getters_load_the_onnx_export(onnx_backend):
+    with pytest.raises(FileNotFoundError, match="export_onnx_models.py"):
+        reranker.get_cross_encoder(reranker.PREFILTER_CROSS_ENCODER_MODEL)
+    with pytest.raises(FileNotFoundError, match="export_onnx_models.py"):
+        embeddings.get_embedding_model()
+
+
+class FakeTokenizer:
+    """Returns fixed encodings and records what it was asked to tokenize."""
+
+    def __init__(self, encoded: dict[str, np.ndarray]) -> None:
+        self.encoded = encoded
+        self.calls: list[tuple] = []
+
+    def __call__(self, *texts, **kwargs):
+        self.calls.append(texts)
+        return self.encoded
+
+
+class FakeSession:
+    """Stands in for ort.InferenceSession: returns queued outputs, records the inputs."""
+
+    def __init__(self, outputs: list[np.ndarray]) -> None:
+        self.outputs = outputs
+        self.inputs: list[dict[str, np.ndarray]] = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, output_names, inputs):
+        self.inputs.append(inputs)
+        return [self.outputs.pop(0)]
+
+
+@pytest.fixture
+def fake_runtime(monkeypatch, onnx_backend):
+    """Route the ONNX classes' session and tokenizer loading to fakes set on the returned dict."""
+    fakes: dict = {}
+    monkeypatch.setattr(onnx_inference, "_create_session", lambda model_dir: fakes["session"])
+    monkeypatch.setattr(
+        onnx_inference,
+        "AutoTokenizer",
+        SimpleNamespace(from_pretrained=lambda path: fakes["tokenizer"]),
+    )
+    return fakes
+
+
+def test_sentence_encoder_mean_pools_over_the_mask_and_normalizes(fake_runtime):
+    fake_runtime["tokenizer"] = FakeTokenizer(
+        {
+            "input_ids": np.array([[1, 2, 0], [3, 0, 0]]),
+            "attention_mask": np.array([[1, 1, 0], [1, 0, 0]]),
+            "token_type_ids": np.zeros((2, 3), dtype=np.int64),
+        }
+    )
+    token_embeddings = np.array(
+        [
+            [[3.0, 0.0], [1.0, 4.0], [100.0, 100.0]],  # Last token is padding
+            [[0.0, 5.0], [9.0, 9.0], [9.0, 9.0]],
+        ],
+        dtype=np.float32,
+    )
+    fake_runtime["session"] = FakeSession([token_embeddings])
+
+    encoder = OnnxSentenceEncoder("sentence-transformers/all-MiniLM-L6-v2")
+    vectors = encoder.encode(["Tuition is due.", "Fees."])
+
+    # Means [2, 2] and [0, 5], scaled to unit length
+    np.testing.assert_allclose(vectors, [[2**-0.5, 2**-0.5], [0.0, 1.0]], rtol=1e-6)
+    assert vectors.dtype == np.float32
+    # Only inputs the model declares are passed to the session
+    assert set(fake_runtime["session"].inputs[0]) == {"input_ids", "attention_mask"}
+
+
+def test_cross_encoder_returns_first_logit_per_pair(fake_runtime):
+    fake_runtime["tokenizer"] = FakeTokenizer(
+        {"input_ids": np.array([[1, 2]]), "attention_mask": np.array([[1, 1]])}
+    )
+    # One (batch, 1) logits array and one flat array, one pair per batch
+    fake_runtime["session"] = FakeSession(
+        [np.array([[2.5]], dtype=np.float32), np.array([-1.25], dtype=np.float32)]
+    )
+
+    cross_encoder = OnnxCrossEncoder(reranker.PREFILTER_CROSS_ENCODER_MODEL)
+    scores = cross_encoder.predict(
+        [("when is tuition due", "Tuition is due in August."), ("parking", "Labs open.")],
+        batch_size=1,
+    )
+
+    np.testing.assert_array_equal(scores, np.array([2.5, -1.25], dtype=np.float32))
+    assert fake_runtime["tokenizer"].calls == [
+        (["when is tuition due"], ["Tuition is due in August."]),
+        (["parking"], ["Labs open."]),
+    ]
+    assert cross_encoder.predict([]).shape == (0,)
@@ -0,0 +1,119 @@
+"""Tests for PDF extraction: table exclusion and the parallel page pool."""
+
+import pytest
+
+from app.services import pdf_extraction
+from app.services.pdf_extraction import (
+    chars_in_bboxes,
+    extract_pdf_text,
+    extraction_processes,
+    format_table,
+    get_extraction_pool,
+)
+
+
+def text_ops(x: int, y: int, text: str) -> str:
+    return f"BT /F1 12 Tf {x} {y} Td ({text}) Tj ET\n"
+
+
+# A 2x2 ruled table below a line of body text
+TABLE_PAGE = (
+    text_ops(72, 720, "Fees are listed below.")
+    + "72 600 m 372 600 l S 72 640 m 372 640 l S 72 680 m 372 680 l S\n"
+    + "72 600 m 72 680 l S 222 600 m 222 680 l S 372 600 m 372 680 l S\n"
+    + text_ops(80, 655, "Item")
+    + text_ops(230, 655, "Cost")
+    + text_ops(80, 615, "Parking")
+    + text_ops(230, 615, "40")
+)
+
+
+def write_pdf(path, pages: list[str]) -> str:
+    """Write a minimal PDF with one Helvetica content stream per page."""
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] "
+        f"/Count {len(pages)} >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, content in zip(page_ids, pages, strict=True):
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects[page_id + 1] = f"<< /Length {len(content)} >>\nstream\n{content}endstream"
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number in sorted(objects):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{objects[number]}\nendobj\n".encode()
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n".encode()
+    data += f"startxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_table_text_is_not_duplicated(tmp_path):
+    text, page_breaks = extract_pdf_text(write_pdf(tmp_path / "fees.pdf", [TABLE_PAGE]))
+
+    assert text == "Fees are listed below.\n\n| Item | Cost |\n|---|---|\n| Parking | 40 |"
+    assert page_breaks == [len(text)]
+
+
+def test_pages_without_ruling_lines_skip_table_detection(tmp_path, monkeypatch):
+    def fail(self, *args, **kwargs):
+        raise AssertionError("find_tables called on a page without edges")
+
+    monkeypatch.setattr("pdfplumber.page.Page.find_tables", fail)
+    path = write_pdf(tmp_path / "plain.pdf", [text_ops(72, 720, "Labs open at nine.")])
+    assert extract_pdf_text(path) == ("Labs open at nine.", [18])
+
+
+def test_parallel_extraction_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_extraction, "_extraction_pools", {})
+    pages = [text_ops(72, 720, f"Page {i} text.") for i in range(6)] + [TABLE_PAGE]
+    path = write_pdf(tmp_path / "handbook.pdf", pages)
+
+    serial = extract_pdf_text(path)
+    parallel = extract_pdf_text(path, processes=2, min_parallel_pages=2)
+
+    assert parallel == serial
+    assert len(serial[1]) == len(pages)
+    pool = pdf_extraction._extraction_pools[2]
+    assert get_extraction_pool(2) is pool
+    pool.shutdown()
+
+
+@pytest.mark.parametrize(("cores", "expected"), [(1, 1), (2, 1), (6, 3), (32, 4)])
+def test_automatic_process_count_leaves_cores_free(monkeypatch, cores, expected):
+    monkeypatch.setattr(pdf_extraction.os, "cpu_count", lambda: cores)
+    assert extraction_processes(0) == expected
+    assert extraction_processes(12) == 12
+
+
+def test_chars_in_bboxes_uses_char_centers():
+    chars = [
+        {"x0": 10, "x1": 20, "top": 10, "bottom": 20},  # Center (15, 15): inside
+        {"x0": 25, "x1": 45, "top": 10, "bottom": 20},  # Center (35, 15): outside
+        {"x0": 95, "x1": 105, "top": 95, "bottom": 105},  # Center (100, 100): second box
+    ]
+    mask = chars_in_bboxes(chars, [(0, 0, 30, 30), (90, 90, 110, 110)])
+    assert mask.tolist() == [True, False, True]
+    assert chars_in_bboxes([], [(0, 0, 1, 1)]).shape == (0,)
+
+
+@pytest.mark.parametrize(
+    ("table", "expected"),
+    [
+        ([["Item", None], [" Fee ", 40], [None, ""]], "| Item |  |\n|---|---|\n| Fee | 40 |"),
+        ([[None, ""]], ""),
+        ([], ""),
+    ],
+)
+def test_format_table(table, expected):
+    assert format_table(table) == expected
@@ -0,0 +1,110 @@
+"""Tests for the SSE streaming query endpoint."""
+
+import json
+import uuid
+
+import httpx
+import pytest
+
+from app.api import query as query_api
+from app.api.dependencies import get_current_user
+from app.core.vector_store import get_vector_store
+from app.main import app
+from app.models.database import Query as QueryModel
+from app.models.schemas import ConfidenceLevel
+from app.services.retrieval import RetrievedChunk
+
+CHUNK = RetrievedChunk(
+    chunk_id=str(uuid.uuid4()),
+    document_id=str(uuid.uuid4()),
+    document_name="handbook.pdf",
+    page_number=2,
+    text_content="Tuition is due in August.",
+    similarity=0.8,
+)
+
+
+class FakeGenerator:
+    """Streams a fixed answer in two deltas."""
+
+    async def stream(self, query, chunks):
+        for delta in ["Tuition is due ", "in August."]:
+            yield delta
+
+    def score_answer(self, answer, chunks) -> ConfidenceLevel:
+        return ConfidenceLevel.HIGH
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    """(event, data) pairs of an SSE body."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append((event_line.removeprefix("event: "), json.loads(data_line[6:])))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch, user):
+    async def retrieve_and_rerank(request, vector_store):
+        return [CHUNK] if "tuition" in request.query else []
+
+    monkeypatch.setattr(query_api, "_retrieve_and_rerank", retrieve_and_rerank)
+    monkeypatch.setattr(query_api, "_answer_cache_for", lambda request: None)
+    monkeypatch.setattr(query_api, "AnswerGenerator", FakeGenerator)
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_vector_store] = lambda: None
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_sources_stream_before_tokens(client, db):
+    response = await client.post("/api/v1/query/stream", json={"query": "When is tuition due?"})
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["sources", "token", "token", "done"]
+
+    sources = events[0][1]
+    assert sources["sources"][0]["excerpt"] == CHUNK.text_content
+    assert sources["avg_similarity"] == pytest.approx(0.8)
+    assert "".join(data["text"] for event, data in events if event == "token") == (
+        "Tuition is due in August."
+    )
+    assert events[-1][1]["confidence"] == "high"
+
+    saved = db.query(QueryModel).one()
+    assert saved.answer_text == "Tuition is due in August."
+    assert saved.num_chunks_retrieved == 1
+
+
+@pytest.mark.asyncio
+async def test_no_sources_streams_fallback_answer(client):
+    response = await client.post("/api/v1/query/stream", json={"query": "parking"})
+
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["sources", "token", "done"]
+    assert events[0][1]["sources"] == []
+    assert events[1][1]["text"] == query_api.NO_SOURCES_ANSWER
+    assert events[2][1]["confidence"] == "low"
+
+
+@pytest.mark.asyncio
+async def test_llm_failure_ends_the_stream_with_an_error(client, db, monkeypatch):
+    class FailingGenerator(FakeGenerator):
+        async def stream(self, query, chunks):
+            yield "Tuition is due "
+            raise RuntimeError("Groq connection reset")
+
+    monkeypatch.setattr(query_api, "AnswerGenerator", FailingGenerator)
+    response = await client.post("/api/v1/query/stream", json={"query": "When is tuition due?"})
+
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["sources", "token", "error"]
+    assert events[-1][1]["error"] == "Answer generation failed: RuntimeError"
+
+    saved = db.query(QueryModel).one()
+    assert saved.answer_text.startswith("Tuition is due ")
+    assert "Answer generation failed: RuntimeError" in saved.answer_text
+    assert saved.confidence_level == "low"
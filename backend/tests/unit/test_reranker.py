@@ -0,0 +1,94 @@
+"""Tests for cross-encoder reranking: score caching and the L-6 -> L-12 cascade."""
+
+import pytest
+
+from app.config import settings
+from app.services import reranker
+from app.services.reranker import (
+    CROSS_ENCODER_MODEL,
+    PREFILTER_CROSS_ENCODER_MODEL,
+    invalidate_rerank_scores,
+    rerank_chunks,
+)
+from app.services.retrieval import RetrievedChunk
+from app.utils.cache import LRUCache
+
+
+def make_chunk(chunk_id: str, relevance: int) -> RetrievedChunk:
+    """A chunk whose text carries the score the fake models give it."""
+    return RetrievedChunk(
+        chunk_id=chunk_id,
+        document_id="doc",
+        document_name="handbook.pdf",
+        page_number=None,
+        text_content=str(relevance),
+        similarity=0.5,
+    )
+
+
+class FakeBatcher:
+    """Scores a pair by the number in the chunk text and records what it scored."""
+
+    def __init__(self, scored: list[tuple[str, str, str]], model_name: str) -> None:
+        self.scored = scored
+        self.model_name = model_name
+
+    async def submit(self, pairs):
+        self.scored.extend((self.model_name, query, text) for query, text in pairs)
+        return [float(text) for _, text in pairs]
+
+
+@pytest.fixture
+def scored(monkeypatch) -> list[tuple[str, str, str]]:
+    scored: list[tuple[str, str, str]] = []
+    monkeypatch.setattr(reranker, "_get_batcher", lambda name: FakeBatcher(scored, name))
+    monkeypatch.setattr(reranker, "_score_cache", LRUCache(max_size=100))
+    return scored
+
+
+@pytest.mark.asyncio
+async def test_scores_are_reused_for_repeat_queries(scored):
+    chunks = [make_chunk("a", 1), make_chunk("b", 3)]
+    first = await rerank_chunks("When is tuition due?", chunks, top_k=2)
+    assert [c.chunk_id for c in first] == ["b", "a"]
+    assert len(scored) == 2
+
+    # Same question, different casing, one new candidate: only it is scored
+    more = [*chunks, make_chunk("c", 2)]
+    second = await rerank_chunks("when is TUITION due?", more, top_k=3)
+    assert [c.chunk_id for c in second] == ["b", "c", "a"]
+    assert scored[2:] == [(CROSS_ENCODER_MODEL, "when is TUITION due?", "2")]
+
+
+@pytest.mark.asyncio
+async def test_deleted_chunks_are_rescored(scored):
+    chunks = [make_chunk("a", 1), make_chunk("b", 3)]
+    await rerank_chunks("fees", chunks)
+    invalidate_rerank_scores(["a"])
+    await rerank_chunks("fees", chunks)
+
+    assert [text for _, _, text in scored] == ["1", "3", "1"]
+
+
+@pytest.mark.asyncio
+async def test_cascade_scores_only_survivors_with_l12(monkeypatch, scored):
+    monkeypatch.setattr(settings, "RERANK_CASCADE_ENABLED", True)
+    monkeypatch.setattr(settings, "RERANK_CASCADE_TOP_N", 3)
+    chunks = [make_chunk(str(i), relevance) for i, relevance in enumerate([5, 1, 9, 2, 7, 3])]
+
+    reranked = await rerank_chunks("fees", chunks, top_k=2)
+
+    prefiltered = [text for model, _, text in scored if model == PREFILTER_CROSS_ENCODER_MODEL]
+    final = [text for model, _, text in scored if model == CROSS_ENCODER_MODEL]
+    assert prefiltered == ["5", "1", "9", "2", "7", "3"]
+    assert final == ["5", "9", "7"]  # Top 3 by L-6, in candidate order
+    assert [c.text_content for c in reranked] == ["9", "7"]
+
+
+@pytest.mark.asyncio
+async def test_cascade_skips_prefilter_for_small_pools(monkeypatch, scored):
+    monkeypatch.setattr(settings, "RERANK_CASCADE_ENABLED", True)
+    monkeypatch.setattr(settings, "RERANK_CASCADE_TOP_N", 3)
+
+    await rerank_chunks("fees", [make_chunk("a", 1), make_chunk("b", 2)])
+    assert {model for model, _, _ in scored} == {CROSS_ENCODER_MODEL}
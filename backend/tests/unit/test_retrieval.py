@@ -0,0 +1,139 @@
+"""Tests for query expansion overlapping the first search and loading chunk texts."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.config import settings
+from app.models.database import DocumentChunk
+from app.services import retrieval
+from app.services.lexical import lookup_chunk_token_ids
+from app.services.retrieval import RetrieverService
+
+
+class RecordingRetriever(RetrieverService):
+    """Records searches (and what had happened by then) instead of querying Qdrant."""
+
+    def __init__(self) -> None:
+        super().__init__(vector_store=None)
+        self.events: list[str] = []
+
+    async def _search_texts(self, queries, top_k, score_threshold, search_filters):
+        self.events.append(f"search {queries}")
+        return [[{"id": query}] for query in queries]
+
+
+@pytest.fixture
+def slow_expansion(monkeypatch) -> list[str]:
+    events: list[str] = []
+
+    async def expand_query(query: str) -> list[str]:
+        events.append("expansion started")
+        await asyncio.sleep(0.05)
+        events.append("expansion done")
+        return [query, f"{query} alternative"]
+
+    monkeypatch.setattr(retrieval, "expand_query", expand_query)
+    return events
+
+
+@pytest.mark.asyncio
+async def test_original_query_is_searched_during_expansion(slow_expansion):
+    retriever = RecordingRetriever()
+    retriever.events = slow_expansion
+
+    variations, results = await retriever._search_with_expansion("fees", 5, None)
+
+    assert variations == ["fees", "fees alternative"]
+    assert results == [[{"id": "fees"}], [{"id": "fees alternative"}]]
+    # The original query didn't wait for expansion; the alternative had to
+    assert slow_expansion.index("search ['fees']") < slow_expansion.index("expansion done")
+    assert slow_expansion[-1] == "search ['fees alternative']"
+
+
+@pytest.mark.asyncio
+async def test_slow_expansion_falls_back_to_original_query(monkeypatch, slow_expansion):
+    monkeypatch.setattr(settings, "QUERY_EXPANSION_TIMEOUT_S", 0.01)
+    retriever = RecordingRetriever()
+
+    variations, results = await retriever._search_with_expansion("fees", 5, None)
+
+    assert variations == ["fees"]
+    assert results == [[{"id": "fees"}]]
+    assert retriever.events == ["search ['fees']"]
+
+
+@pytest.mark.asyncio
+async def test_chunk_store_io_runs_off_the_event_loop(monkeypatch):
+    loop_thread = threading.get_ident()
+    calls: list[tuple[str, bool]] = []
+
+    class RecordingStore:
+        def get_many(self, chunk_ids):
+            calls.append(("get_many", threading.get_ident() == loop_thread))
+            return {"stored": "Tuition is due in August."}
+
+        def put_many(self, items):
+            calls.append(("put_many", threading.get_ident() == loop_thread))
+
+    class LegacyVectorStore:
+        async def fetch_payloads(self, chunk_ids, fields):
+            return {chunk_id: {fields[0]: "Labs open at nine."} for chunk_id in chunk_ids}
+
+    monkeypatch.setattr(retrieval, "get_chunk_store", RecordingStore)
+    retriever = RetrieverService(vector_store=LegacyVectorStore())
+
+    texts = await retriever._load_texts(
+        [{"id": "stored", "payload": {}}, {"id": "legacy", "payload": {}}]
+    )
+
+    assert texts == {"stored": "Tuition is due in August.", "legacy": "Labs open at nine."}
+    assert calls == [("get_many", False), ("put_many", False)]
+
+
+@pytest.mark.asyncio
+async def test_texts_missing_from_both_stores_come_from_postgres(monkeypatch, db, document):
+    db.add(
+        DocumentChunk(
+            document_id=document.id,
+            chunk_index=0,
+            text_content="Late fees apply after the first week.",
+            token_count=8,
+            embedding_id="lost",
+        )
+    )
+    db.commit()
+    stored: list[tuple[str, str]] = []
+
+    class EmptyStore:
+        def get_many(self, chunk_ids):
+            return {}
+
+        def put_many(self, items):
+            stored.extend(items)
+
+    class TextlessVectorStore:
+        async def fetch_payloads(self, chunk_ids, fields):
+            return {chunk_id: {} for chunk_id in chunk_ids}
+
+    monkeypatch.setattr(retrieval, "get_chunk_store", EmptyStore)
+    retriever = RetrieverService(vector_store=TextlessVectorStore())
+
+    texts = await retriever._load_texts(
+        [{"id": "lost", "payload": {}}, {"id": "unknown", "payload": {}}]
+    )
+
+    assert texts == {"lost": "Late fees apply after the first week."}
+    assert stored == [("lost", "Late fees apply after the first week.")]
+
+
+def test_chunks_whose_text_did_not_load_are_not_cached_as_empty():
+    texts = {"loaded-chunk": "Tuition is due in August."}
+
+    assert RetrieverService._chunk_token_ids("unloaded-chunk", texts).size == 0
+    assert lookup_chunk_token_ids("unloaded-chunk") is None
+
+    tokens = RetrieverService._chunk_token_ids("loaded-chunk", texts)
+    assert tokens.size == 5
+    assert lookup_chunk_token_ids("loaded-chunk") is tokens
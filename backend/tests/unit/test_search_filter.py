@@ -0,0 +1,45 @@
+"""Tests for search filter construction."""
+
+import uuid
+from datetime import UTC, datetime
+
+from app.api.query import _search_filter
+from app.core.vector_store import SearchFilter, payload_timestamp
+from app.models.schemas import QueryRequest
+
+
+def test_empty_filter_does_not_filter():
+    assert SearchFilter().to_qdrant() is None
+    assert SearchFilter(document_ids=[], file_types=[]).to_qdrant() is None
+
+
+def test_filter_conditions():
+    after = datetime(2024, 1, 1, tzinfo=UTC)
+    qdrant_filter = SearchFilter(
+        document_ids=["a", "b"], file_types=["pdf"], uploaded_after=after
+    ).to_qdrant()
+
+    by_key = {condition.key: condition for condition in qdrant_filter.must}
+    assert by_key["document_id"].match.any == ["a", "b"]
+    assert by_key["file_type"].match.any == ["pdf"]
+    assert by_key["uploaded_at"].range.gte == after
+    assert by_key["uploaded_at"].range.lte is None
+
+
+def test_request_scope_becomes_filter():
+    doc_id = uuid.uuid4()
+    request = QueryRequest(query="fees", document_ids=[doc_id], file_types=[".PDF", "docx"])
+
+    search_filter = _search_filter(request)
+    assert search_filter.document_ids == [str(doc_id)]
+    assert search_filter.file_types == ["pdf", "docx"]
+
+
+def test_unscoped_request_has_no_filter():
+    assert _search_filter(QueryRequest(query="fees")) is None
+
+
+def test_payload_timestamp_treats_naive_as_utc():
+    aware = datetime(2024, 5, 1, 12, 30, tzinfo=UTC)
+    assert payload_timestamp(aware.replace(tzinfo=None)) == "2024-05-01T12:30:00+00:00"
+    assert payload_timestamp(aware) == "2024-05-01T12:30:00+00:00"
@@ -0,0 +1,45 @@
+"""Tests for the linear-time sentence splitter."""
+
+import pytest
+
+from app.services.document_processor import DocumentProcessor, is_sentence_boundary
+from scripts.benchmark_chunking import build_text, previous_split_into_sentences
+
+TEXTS = [
+    "",
+    "   ",
+    "No punctuation at all",
+    "One sentence.",
+    "First sentence. Second one! Third? Fourth",
+    "Dr. Smith met Prof. Jones at 9 a.m. on Monday. They discussed fees.",
+    "J. R. R. Tolkien wrote books. So did C. S. Lewis.",
+    'He said "Stop." Then left. (See below.) 42 people agreed.',
+    "Version 2.0 shipped.Next release soon. lowercase after. Done.",
+    "Trailing whitespace.   \n\n  Across\tlines.  ",
+    "Ends with abbreviation etc.",
+    "...Ellipsis first... Then more.",
+]
+
+
+@pytest.fixture
+def processor() -> DocumentProcessor:
+    return DocumentProcessor(db=None, document=None, vector_store=None)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_matches_previous_splitter(processor, text):
+    assert processor.split_into_sentences(text) == previous_split_into_sentences(text)
+
+
+def test_matches_previous_splitter_on_long_text(processor):
+    text = build_text(200_000)
+    assert processor.split_into_sentences(text) == previous_split_into_sentences(text)
+
+
+def test_boundary_rules():
+    text = "Dr. Who. A. Next. see"
+    assert not is_sentence_boundary(text, text.index("Dr.") + 3)  # Abbreviation
+    assert is_sentence_boundary(text, text.index("Who.") + 4)
+    assert not is_sentence_boundary(text, text.index("A.") + 2)  # Initial
+    assert not is_sentence_boundary(text, text.index("Next.") + 5)  # Lowercase follows
+    assert is_sentence_boundary(text, len(text))
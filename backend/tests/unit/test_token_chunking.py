@@ -0,0 +1,124 @@
+"""Tests for chunking sized by the embedding tokenizer."""
+
+import re
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.services.document_processor import DocumentProcessor
+
+
+class FakeTokenizer:
+    """Splits words into pieces of up to 4 characters, like a subword tokenizer."""
+
+    def __call__(self, texts, add_special_tokens=True, return_offsets_mapping=False):
+        offsets = [
+            [
+                (match.start() + i, min(match.start() + i + 4, match.end()))
+                for match in re.finditer(r"\S+", text)
+                for i in range(0, len(match.group()), 4)
+            ]
+            for text in texts
+        ]
+        encoding = {"input_ids": [list(range(len(o))) for o in offsets]}
+        if return_offsets_mapping:
+            encoding["offset_mapping"] = offsets
+        return encoding
+
+    def count(self, text: str) -> int:
+        return len(self([text])["input_ids"][0])
+
+
+@pytest.fixture
+def processor() -> DocumentProcessor:
+    return DocumentProcessor(db=None, document=None, vector_store=None)
+
+
+def test_chunks_fill_but_never_exceed_the_window(processor):
+    tokenizer = FakeTokenizer()
+    text = " ".join(f"Sentence {i} about tuition deadlines." for i in range(30))
+
+    chunks = processor.chunk_text_by_tokens(text, tokenizer, max_tokens=25, overlap_tokens=10)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.token_count == tokenizer.count(chunk.text) <= 25
+        assert text[chunk.start_char:chunk.end_char] == chunk.text
+    # Every sentence is covered, and neighbours share their overlap
+    assert chunks[0].text.startswith("Sentence 0 ")
+    assert chunks[-1].text.endswith("Sentence 29 about tuition deadlines.")
+    for previous, chunk in zip(chunks, chunks[1:], strict=False):
+        assert chunk.start_char < previous.end_char
+
+
+def test_long_sentence_is_cut_at_word_boundaries(processor):
+    tokenizer = FakeTokenizer()
+    words = ["international", "undergraduate", "scholarship", "applications"] * 5
+    text = " ".join(words) + "."
+
+    chunks = processor.chunk_text_by_tokens(text, tokenizer, max_tokens=10, overlap_tokens=0)
+
+    assert " ".join(chunk.text for chunk in chunks) == text
+    for chunk in chunks:
+        assert chunk.token_count == tokenizer.count(chunk.text) <= 10
+        assert text[chunk.start_char - 1:chunk.start_char] in ("", " ")
+        assert text[chunk.end_char:chunk.end_char + 1] in ("", " ")
+
+
+def test_token_windows_back_off_to_word_ends():
+    # Tokens: "the" | "big" | "inter" "nation" "al" | "fees"
+    offsets = [(0, 3), (4, 7), (8, 13), (13, 19), (19, 21), (22, 26)]
+    assert DocumentProcessor._token_windows(offsets, 4) == [(0, 1), (2, 5)]
+    # A single word longer than the window is cut mid-word rather than looping
+    assert DocumentProcessor._token_windows(offsets[2:5], 2) == [(0, 1), (2, 2)]
+
+
+def test_empty_text_has_no_chunks(processor):
+    assert processor.chunk_text_by_tokens("   ", FakeTokenizer(), 10, 2) == []
+
+
+def test_unknown_chunking_mode_is_rejected_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(CHUNKING_MODE="token")
+
+
+def test_chunking_and_encoding_can_share_the_model_tokenizer(monkeypatch, tmp_path):
+    from transformers import BertTokenizerFast
+
+    from app.core.inference import get_inference_executor, get_ingestion_executor
+    from app.services import embeddings
+
+    words = "tuition is due in august late fees apply after the first week".split()
+    vocab = tmp_path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", ".", *words]))
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab))
+
+    class Model:
+        """Stands in for SentenceTransformer: encode() pads and truncates."""
+
+        max_seq_length = 16
+
+        def __init__(self) -> None:
+            self.tokenizer = tokenizer
+
+        def encode(self, texts, **kwargs):
+            return self.tokenizer(texts, padding=True, truncation=True, max_length=16)
+
+    monkeypatch.setattr(embeddings, "_model", Model())
+    text = " ".join(f"Tuition is due in August {i}. Late fees apply." for i in range(20))
+    processor = DocumentProcessor(db=None, document=None, vector_store=None)
+
+    def chunk() -> None:
+        for _ in range(20):
+            processor.chunk_text_by_tokens(text, embeddings.get_embedding_tokenizer(), 12, 4)
+
+    def encode() -> None:
+        for _ in range(20):
+            embeddings.get_embedding_model().encode(text.split(". "))
+
+    # Chunking on the ingestion pool while queries encode on the inference pool
+    futures = [get_ingestion_executor().submit(chunk) for _ in range(2)]
+    futures += [get_inference_executor().submit(encode) for _ in range(2)]
+    for future in futures:
+        future.result()
@@ -0,0 +1,155 @@
+"""Tests for the Qdrant vector store wrapper."""
+
+import asyncio
+import uuid
+
+import pytest
+from pydantic import ValidationError
+from qdrant_client.models import BinaryQuantization, ScalarQuantization
+
+from app.config import Settings, settings
+from app.core import vector_store as vector_store_module
+from app.core.vector_store import VectorStore, get_vector_store
+from app.services.lexical import build_document_sparse_vector, build_query_sparse_vector
+
+TEXTS = ["Tuition is due in August.", "Labs open at nine.", "Parking permits cost extra."]
+
+
+def unit_vector(size: int, axis: int) -> list[float]:
+    """A dense vector pointing mostly along one axis (no two equally far from another)."""
+    vector = [0.0] * size
+    vector[:4] = [0.1, 0.2, 0.3, 0.4]
+    vector[axis] = 1.0
+    return vector
+
+
+async def add_points(vector_store) -> list[str]:
+    """Store TEXTS, each embedded along its own axis."""
+    point_ids = [str(uuid.uuid4()) for _ in TEXTS]
+    await vector_store.upsert_many(
+        point_ids=point_ids,
+        vectors=[unit_vector(vector_store.vector_size, i) for i in range(len(TEXTS))],
+        payloads=[{"document_id": str(uuid.uuid4())} for _ in TEXTS],
+        sparse_vectors=[build_document_sparse_vector(text) for text in TEXTS],
+    )
+    return point_ids
+
+
+@pytest.mark.asyncio
+async def test_search_batch_matches_single_searches(vector_store):
+    await add_points(vector_store)
+    queries = [unit_vector(vector_store.vector_size, i) for i in range(len(TEXTS))]
+    sparse = [build_query_sparse_vector(text) for text in ["tuition", "labs nine", "permits"]]
+
+    batched = await vector_store.search_batch(queries, top_k=2, sparse_vectors=sparse)
+    single = [
+        await vector_store.search(query, top_k=2, sparse_vector=sparse_vector)
+        for query, sparse_vector in zip(queries, sparse, strict=True)
+    ]
+    assert batched == single
+    assert await vector_store.search_batch([]) == []
+
+
+@pytest.fixture
+def fresh_singleton(monkeypatch):
+    """Start without a shared store; count collection checks, failing while `failures` > 0."""
+    calls = {"ensure": 0, "failures": 0}
+
+    async def ensure_collection(self):
+        calls["ensure"] += 1
+        await asyncio.sleep(0.01)
+        if calls["failures"] > 0:
+            calls["failures"] -= 1
+            raise ConnectionError("Qdrant unreachable")
+
+    monkeypatch.setattr(vector_store_module, "_vector_store", None)
+    monkeypatch.setattr(vector_store_module, "_vector_store_lock", asyncio.Lock())
+    monkeypatch.setattr(VectorStore, "_ensure_collection", ensure_collection)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_calls_initialize_once(fresh_singleton):
+    stores = await asyncio.gather(*(get_vector_store() for _ in range(5)))
+    assert fresh_singleton["ensure"] == 1
+    assert all(store is stores[0] for store in stores)
+
+
+@pytest.mark.asyncio
+async def test_failed_initialization_is_not_cached(fresh_singleton):
+    fresh_singleton["failures"] = 1
+    with pytest.raises(ConnectionError):
+        await get_vector_store()
+    assert vector_store_module._vector_store is None
+
+    store = await get_vector_store()
+    assert fresh_singleton["ensure"] == 2
+    assert await get_vector_store() is store
+
+
+def test_unknown_quantization_is_rejected_at_startup():
+    with pytest.raises(ValidationError):
+        Settings(VECTOR_QUANTIZATION="int4")
+
+
+@pytest.mark.parametrize(
+    ("mode", "config_type"),
+    [("none", type(None)), ("scalar", ScalarQuantization), ("binary", BinaryQuantization)],
+)
+def test_quantization_config_follows_settings(monkeypatch, mode, config_type):
+    monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", mode)
+    monkeypatch.setattr(settings, "HNSW_EF_SEARCH", None)
+
+    assert isinstance(VectorStore._quantization_config(), config_type)
+    params = VectorStore._search_params()
+    if mode == "none":
+        assert params is None
+    else:
+        assert params.quantization.rescore == settings.VECTOR_QUANTIZATION_RESCORE
+        assert params.quantization.oversampling == settings.VECTOR_QUANTIZATION_OVERSAMPLING
+    assert VectorStore._search_params(exact=True).exact
+
+
+@pytest.mark.asyncio
+async def test_scalar_quantized_collection_searches(monkeypatch, vector_store):
+    monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", "scalar")
+    monkeypatch.setattr(vector_store, "collection_name", "quantized")
+    await vector_store._ensure_collection()
+    point_ids = await add_points(vector_store)
+
+    results = await vector_store.search(unit_vector(vector_store.vector_size, 1), top_k=1)
+    assert results[0]["id"] == point_ids[1]
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_sends_batches(monkeypatch, vector_store):
+    calls = []
+    upsert = vector_store.client.upsert
+
+    async def recording_upsert(**kwargs):
+        calls.append((len(kwargs["points"]), kwargs["wait"]))
+        return await upsert(**kwargs)
+
+    monkeypatch.setattr(vector_store.client, "upsert", recording_upsert)
+    point_ids = [str(uuid.uuid4()) for _ in range(5)]
+    await vector_store.upsert_many(
+        point_ids=point_ids,
+        vectors=[unit_vector(vector_store.vector_size, i) for i in range(5)],
+        payloads=[{"document_id": "doc"} for _ in range(5)],
+        batch_size=2,
+        wait=False,
+    )
+
+    assert calls == [(2, False), (2, False), (1, False)]
+    stored = await vector_store.client.retrieve(vector_store.collection_name, ids=point_ids)
+    assert len(stored) == 5
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_rejects_mismatched_lengths(vector_store):
+    with pytest.raises(ValueError):
+        await vector_store.upsert_many(
+            point_ids=[str(uuid.uuid4()), str(uuid.uuid4())],
+            vectors=[unit_vector(vector_store.vector_size, 0)],
+            payloads=[{}, {}],
+        )